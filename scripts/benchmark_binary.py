@@ -0,0 +1,107 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import json
+import random
+import time
+
+from compas.utilities import DataEncoder
+from compas.utilities import DataDecoder
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import FormDiagram
+from compas_ags.diagrams import ForceDiagram
+
+random.seed(0)
+
+SIZES = [10, 20, 30]
+REPEAT = 7
+
+# ==============================================================================
+# Grid diagrams
+# ==============================================================================
+
+
+def grid_lines(n):
+    """The lines of an n x n grid of unit squares, with a leaf on every side of every boundary node."""
+    lines = []
+    for i in range(n + 1):
+        for j in range(n):
+            lines.append([[j, i, 0], [j + 1, i, 0]])
+            lines.append([[i, j, 0], [i, j + 1, 0]])
+    for i in range(n + 1):
+        lines.append([[i, 0, 0], [i, -1, 0]])
+        lines.append([[i, n, 0], [i, n + 1, 0]])
+        lines.append([[0, i, 0], [-1, i, 0]])
+        lines.append([[n, i, 0], [n + 1, i, 0]])
+    return lines
+
+
+def solved(form):
+    """Move the vertices randomly and set random values for the force densities, forces, lengths and angles."""
+    for vertex in form.vertices():
+        form.vertex_attributes(vertex, 'xy', [random.random() + value for value in form.vertex_attributes(vertex, 'xy')])
+    for edge in form.edges():
+        form.edge_attributes(edge, ['q', 'f', 'l', 'a'], [random.random() for _ in range(4)])
+    return form
+
+
+def timed(func, *args):
+    best = None
+    for _ in range(REPEAT):
+        t0 = time.time()
+        result = func(*args)
+        t = time.time() - t0
+        best = t if best is None else min(best, t)
+    return result, best
+
+
+def to_json(diagram):
+    return json.dumps(diagram.data, cls=DataEncoder)
+
+
+def from_json(cls, data):
+    return cls.from_data(json.loads(data, cls=DataDecoder))
+
+
+def to_bytes_cold(diagram):
+    # the topology has to be packed again
+    diagram.invalidate()
+    return diagram.to_bytes()
+
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# the drawn diagrams are the diagrams as constructed from the lines
+# in the solved diagrams, all edges of the form diagram have values for q, f, l and a
+# the size of the JSON data is the size of the JSON string of Diagram.data
+# the cold writes pack the topology, the warm writes reuse the packed topology of the unmodified topology
+# the times are the best of several runs, in milliseconds
+
+print('{:<6} {:<7} {:>6} {:>9} {:>9} {:>5} {:>7} {:>7} {:>7} {:>5} {:>5} {:>7} {:>7} {:>5}'.format(
+    'name', 'state', 'edges', 'json [B]', 'bin [B]', 'size',
+    'json w', 'cold w', 'warm w', 'cold', 'warm', 'json r', 'bin r', 'read'))
+
+for n in SIZES:
+    for state in ('drawn', 'solved'):
+        form = FormDiagram.from_graph(FormGraph.from_lines(grid_lines(n)))
+        if state == 'solved':
+            solved(form)
+        force = ForceDiagram.from_formdiagram(form)
+
+        for name, diagram in (('form', form), ('force', force)):
+            cls = type(diagram)
+            data, t_json_w = timed(to_json, diagram)
+            binary, t_cold_w = timed(to_bytes_cold, diagram)
+            binary, t_warm_w = timed(diagram.to_bytes)
+            loaded, t_json_r = timed(from_json, cls, data)
+            copy, t_bytes_r = timed(cls.from_bytes, binary)
+            assert copy.data == loaded.data
+
+            print('{:<6} {:<7} {:>6} {:>9} {:>9} {:>5.2f} {:>7.2f} {:>7.2f} {:>7.2f} {:>5.2f} {:>5.2f} {:>7.2f} {:>7.2f} {:>5.2f}'.format(
+                name, state, diagram.number_of_edges(), len(data), len(binary), len(data) / len(binary),
+                1e3 * t_json_w, 1e3 * t_cold_w, 1e3 * t_warm_w, t_json_w / t_cold_w, t_json_w / t_warm_w,
+                1e3 * t_json_r, 1e3 * t_bytes_r, t_json_r / t_bytes_r))
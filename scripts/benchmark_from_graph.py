@@ -0,0 +1,101 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import time
+
+from compas.datastructures import network_find_cycles
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import FormDiagram
+from compas_ags.diagrams import graph_remove_degree2_nodes
+from compas_ags.diagrams import graph_find_cycles
+
+HERE = os.path.dirname(__file__)
+DATA = os.path.join(HERE, '../data')
+FILES = ['gs_form_force.obj', 'gs_truss.obj', 'fink.obj', 'funicular.obj', 'spiderweb.obj']
+SCALES = [1, 4, 8, 16]
+
+# ==============================================================================
+# Scaled versions of the drawings
+# ==============================================================================
+
+
+def tiled_lines(graph, n):
+    """The lines of a graph repeated on an n x n grid."""
+    lines = [graph.edge_coordinates(u, v) for u, v in graph.edges()]
+    xs = [point[0] for line in lines for point in line]
+    ys = [point[1] for line in lines for point in line]
+    dx = 1.5 * (max(xs) - min(xs))
+    dy = 1.5 * (max(ys) - min(ys))
+    tiled = []
+    for i in range(n):
+        for j in range(n):
+            for a, b in lines:
+                tiled.append([[a[0] + i * dx, a[1] + j * dy, a[2]], [b[0] + i * dx, b[1] + j * dy, b[2]]])
+    return tiled
+
+
+def split_lines(lines, every=10):
+    """The lines with every n-th line split in two, which adds nodes with two neighbors."""
+    split = []
+    for index, (a, b) in enumerate(lines):
+        if index % every:
+            split.append([a, b])
+            continue
+        m = [0.5 * (a[0] + b[0]), 0.5 * (a[1] + b[1]), 0.5 * (a[2] + b[2])]
+        split.append([a, m])
+        split.append([m, b])
+    return split
+
+
+def faces_reference(graph):
+    for node in list(graph.nodes()):
+        if graph.degree(node) == 2:
+            graph.delete_node(node)
+    return network_find_cycles(graph, breakpoints=graph.leaves())
+
+
+def faces_fast(graph):
+    graph_remove_degree2_nodes(graph)
+    return graph_find_cycles(graph, breakpoints=graph.leaves())
+
+
+def timed(func, *args):
+    t0 = time.time()
+    result = func(*args)
+    return result, time.time() - t0
+
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# the faces are compared with the original implementation:
+# the removal of the nodes with two neighbors one by one with graph.delete_node,
+# followed by compas.datastructures.network_find_cycles
+# from_graph is only timed for the drawings without split lines,
+# since the removal of the nodes of the split lines breaks up the drawings
+
+print('{:<20} {:>6} {:>6} {:>8} {:>12} {:>12} {:>8} {:>12}'.format('file', 'scale', 'split', 'lines', 'reference', 'fast', 'speedup', 'from_graph'))
+
+for name in FILES:
+    graph = FormGraph.from_obj(os.path.join(DATA, 'paper', name))
+
+    for n in SCALES:
+        for split in (False, True):
+            lines = tiled_lines(graph, n)
+            if split:
+                lines = split_lines(lines)
+
+            reference, t_reference = timed(faces_reference, FormGraph.from_lines(lines))
+            fast, t_fast = timed(faces_fast, FormGraph.from_lines(lines))
+            assert fast == reference
+
+            t_form = float('nan')
+            if not split:
+                form, t_form = timed(FormDiagram.from_graph, FormGraph.from_lines(lines))
+
+            print('{:<20} {:>6} {:>6} {:>8} {:>12.4f} {:>12.4f} {:>8.1f} {:>12.4f}'.format(
+                name, n, 'yes' if split else 'no', len(lines), t_reference, t_fast, t_reference / max(t_fast, 1e-9), t_form))
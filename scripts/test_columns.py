@@ -0,0 +1,102 @@
+import compas_ags
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import FormDiagram
+from compas_ags.diagrams import ForceDiagram
+from compas_ags.ags import graphstatics
+from compas_ags.ags import loadpath
+from compas_ags.ags import DiagramSession
+from compas_ags.ags import session_update_form
+
+# ==============================================================================
+# Solve the same problems with and without attribute columns
+# and compare the results
+# ==============================================================================
+
+FORM_VERTEX = ['x', 'y']
+FORM_EDGE = ['q', 'f', 'l', 'a']
+FORCE_VERTEX = ['x', 'y']
+FORCE_EDGE = ['l', 'a']
+
+
+def attach(form, force):
+    form.attach_columns(vertex=FORM_VERTEX, edge=FORM_EDGE)
+    force.attach_columns(vertex=FORCE_VERTEX, edge=FORCE_EDGE)
+
+
+def results(form, force):
+    form.detach_columns()
+    force.detach_columns()
+    return [
+        form.vertices_attributes('xy'),
+        form.edges_attributes(FORM_EDGE),
+        force.vertices_attributes('xy'),
+        force.edges_attributes(FORCE_EDGE),
+    ]
+
+
+def compare(a, b, tol=1e-9):
+    for x, y in zip(a, b):
+        if isinstance(x, (list, tuple)):
+            compare(x, y, tol)
+        elif x is None or y is None:
+            assert x is None and y is None, (x, y)
+        else:
+            assert abs(x - y) < tol, (x, y)
+
+
+def truss():
+    graph = FormGraph.from_obj(compas_ags.get('paper/gs_form_force.obj'))
+    form = FormDiagram.from_graph(graph)
+    force = ForceDiagram.from_formdiagram(form)
+    left = next(form.vertices_where({'x': 0.0, 'y': 0.0}))
+    right = next(form.vertices_where({'x': 6.0, 'y': 0.0}))
+    form.vertices_attribute('is_fixed', True, keys=[left, right])
+    form.edge_force(1, -10.0)
+    return form, force
+
+
+def graphstatics_solve(columns):
+    form, force = truss()
+    if columns:
+        attach(form, force)
+    graphstatics.form_update_q_from_qind(form)
+    graphstatics.force_update_from_form(force, form)
+    force.vertex_attribute(2, 'x', force.vertex_attribute(2, 'x') + 1.0)
+    graphstatics.form_update_from_force(form, force)
+    return results(form, force)
+
+
+def session_solve(columns):
+    form, force = truss()
+    graphstatics.form_update_q_from_qind(form)
+    graphstatics.force_update_from_form(force, form)
+    if columns:
+        attach(form, force)
+    force.vertex_attribute(2, 'x', force.vertex_attribute(2, 'x') + 1.0)
+    session_update_form(DiagramSession(form, force))
+    return results(form, force)
+
+
+def loadpath_solve(columns):
+    nodes = [[float(i), 0.0, 0.0] for i in range(7)] + [[float(i), -1.0, 0.0] for i in range(7)] + [[float(i), 1.0, 0.0] for i in range(1, 6)]
+    edges = [(i, i + 1) for i in range(6)] + [(i, i + 7) for i in range(7)]
+    edges += [(0, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 6)] + [(i, i + 13) for i in range(1, 6)]
+    form = FormDiagram.from_graph(FormGraph.from_nodes_and_edges(nodes, edges))
+    force = ForceDiagram.from_formdiagram(form)
+    for edge in [(8, 1), (9, 2), (10, 3), (11, 4), (12, 5)]:
+        form.edge_attribute(edge, 'is_ind', True)
+        form.edge_attribute(edge, 'q', 1.0)
+    graphstatics.form_update_q_from_qind(form)
+    graphstatics.force_update_from_form(force, form)
+    force.vertices_attribute('is_param', True, keys=[7, 8, 9, 10, 11, 12])
+    form.vertices_attribute('is_fixed', True, keys=[0, 1, 2, 3, 4, 5, 6])
+    if columns:
+        attach(form, force)
+    loadpath.optimise_loadpath(form, force)
+    return results(form, force)
+
+
+for solve in (graphstatics_solve, session_solve, loadpath_solve):
+    compare(solve(False), solve(True), 1e-6 if solve is loadpath_solve else 1e-9)
+    print(solve.__name__, 'ok')
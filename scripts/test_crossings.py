@@ -0,0 +1,90 @@
+import os
+import random
+
+import compas_ags
+
+from compas.geometry import is_intersection_segment_segment_xy
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import graph_find_crossings
+
+# ==============================================================================
+# Compare the crossings with a pairwise test of all edges
+# ==============================================================================
+
+
+def brute_force(graph):
+    edges = list(graph.edges())
+    crossings = []
+    for i, (u1, v1) in enumerate(edges):
+        a = graph.edge_coordinates(u1, v1)
+        for j in range(i + 1, len(edges)):
+            u2, v2 = edges[j]
+            if u1 == u2 or v1 == v2 or u1 == v2 or u2 == v1:
+                continue
+            b = graph.edge_coordinates(u2, v2)
+            if is_intersection_segment_segment_xy(a, b) or is_intersection_segment_segment_xy(b, a):
+                crossings.append((edges[i], edges[j]))
+    return crossings
+
+
+def from_points(points, number_of_edges):
+    graph = FormGraph()
+    for node, (x, y) in enumerate(points):
+        graph.add_node(node, x=x, y=y, z=0.0)
+    while graph.number_of_edges() < number_of_edges:
+        u, v = random.sample(range(len(points)), 2)
+        if not graph.has_edge(u, v, directed=False):
+            graph.add_edge(u, v)
+    return graph
+
+
+def check(graph):
+    crossings = graph_find_crossings(graph)
+    assert crossings == brute_force(graph)
+    first = graph_find_crossings(graph, first=True)
+    assert len(first) == min(1, len(crossings)) and set(first) <= set(crossings)
+    assert graph.is_crossed() == bool(crossings)
+    return len(crossings)
+
+
+random.seed(0)
+total = 0
+
+# random points
+
+for _ in range(30):
+    points = [(random.random(), random.random()) for _ in range(random.randint(4, 40))]
+    total += check(from_points(points, len(points)))
+
+# colinear points, on a horizontal line and on a diagonal
+
+for _ in range(10):
+    points = [(random.randint(0, 10), 0.0) for _ in range(15)]
+    total += check(from_points(points, 12))
+    points = [(float(x), float(x)) for x in range(15)]
+    total += check(from_points(points, 12))
+
+# coincident points, including drawings in which all points coincide
+
+for _ in range(10):
+    points = [(random.randint(0, 3), random.randint(0, 3)) for _ in range(20)]
+    total += check(from_points(points, 25))
+    total += check(from_points([(1.0, 1.0)] * 6, 8))
+
+assert total
+
+# the drawings of the paper
+
+for name in sorted(os.listdir(os.path.dirname(compas_ags.get('paper/spiderweb.obj')))):
+    if name.endswith('.obj') and name != 'spiderweb.obj':
+        check(FormGraph.from_obj(compas_ags.get('paper/' + name)))
+
+# two radial edges of the spiderweb are nearly colinear and far apart
+# and are not reported as crossing
+
+spiderweb = FormGraph.from_obj(compas_ags.get('paper/spiderweb.obj'))
+assert graph_find_crossings(spiderweb) == []
+assert not spiderweb.is_crossed()
+
+print('crossings ok', total)
@@ -0,0 +1,63 @@
+import os
+
+import compas_ags
+
+from compas.datastructures import network_find_cycles
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import graph_remove_degree2_nodes
+from compas_ags.diagrams import graph_find_cycles
+
+# ==============================================================================
+# Compare the faces with the faces found by network_find_cycles
+# ==============================================================================
+
+
+def split_lines(lines, every=10):
+    # every n-th line split in two, which adds nodes with two neighbors
+    split = []
+    for index, (a, b) in enumerate(lines):
+        if index % every:
+            split.append([a, b])
+            continue
+        m = [0.5 * (a[0] + b[0]), 0.5 * (a[1] + b[1]), 0.5 * (a[2] + b[2])]
+        split.append([a, m])
+        split.append([m, b])
+    return split
+
+
+def faces_reference(lines):
+    graph = FormGraph.from_lines(lines)
+    for node in list(graph.nodes()):
+        if graph.degree(node) == 2:
+            graph.delete_node(node)
+    return network_find_cycles(graph, breakpoints=graph.leaves())
+
+
+def faces_fast(lines):
+    graph = FormGraph.from_lines(lines)
+    graph_remove_degree2_nodes(graph)
+    edges = sorted(graph.edges())
+    faces = graph_find_cycles(graph, breakpoints=graph.leaves())
+    assert sorted(graph.edges()) == edges
+    nodes = list(graph.nodes())
+    indices = graph_find_cycles(graph, breakpoints=graph.leaves(), indices=True)
+    assert [[nodes[index] for index in face] for face in indices] == faces
+    return faces
+
+
+HERE = os.path.dirname(compas_ags.get('paper/gs_form_force.obj'))
+
+count = 0
+for name in sorted(os.listdir(HERE)):
+    if not name.endswith('.obj'):
+        continue
+    graph = FormGraph.from_obj(os.path.join(HERE, name))
+    lines = [graph.edge_coordinates(u, v) for u, v in graph.edges()]
+    for split in (False, True):
+        if split:
+            lines = split_lines(lines)
+        assert faces_fast(lines) == faces_reference(lines), (name, split)
+        count += 1
+
+print('faces ok', count)
@@ -0,0 +1,81 @@
+import threading
+
+import compas_ags
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import FormDiagram
+from compas_ags.utilities import History
+from compas_ags.utilities import diagram_snapshot
+
+# ==============================================================================
+# Errors on the background thread of the history
+# ==============================================================================
+
+
+class FailingDB(dict):
+
+    def __init__(self):
+        super(FailingDB, self).__init__()
+        self.fail = False
+
+    def __setitem__(self, key, value):
+        if self.fail:
+            raise IOError('No space left on device')
+        super(FailingDB, self).__setitem__(key, value)
+
+
+graph = FormGraph.from_obj(compas_ags.get('paper/gs_form_force.obj'))
+form = FormDiagram.from_graph(graph)
+
+
+def state(x):
+    form.vertex_attribute(0, 'x', x)
+    return {'form': {'object': {'visible': True}, 'diagram': diagram_snapshot(form)}}
+
+
+for writebehind in (False, True):
+    db = FailingDB()
+    history = History(db, writebehind=writebehind)
+    for x in range(4):
+        history.submit(state(float(x)))
+    history.flush()
+    assert history.undo() and history.undo()
+    entries = list(history.entries)
+    keys = set(db)
+
+    # a failed write keeps the redo tail and is reported by flush
+
+    db.fail = True
+    try:
+        history.submit(state(10.0))
+        history.flush()
+    except IOError:
+        pass
+    else:
+        raise AssertionError('The error was not raised.')
+    assert history.entries == entries and set(db) == keys
+    assert history.can_redo()
+    history.flush()
+
+    # a state that cannot be pickled is not recorded either
+
+    db.fail = False
+    unpicklable = state(11.0)
+    unpicklable['form']['object']['lock'] = threading.Lock()
+    try:
+        history.submit(unpicklable)
+        history.flush()
+    except Exception:
+        pass
+    else:
+        raise AssertionError('The error was not raised.')
+    assert history.entries == entries and set(db) == keys
+
+    # the next state is recorded normally and discards the redo tail
+
+    history.submit(state(12.0))
+    history.flush()
+    assert len(history.entries) == len(entries) - 1 and not history.can_redo()
+    history.close()
+
+print('history ok')
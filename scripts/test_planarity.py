@@ -0,0 +1,84 @@
+import random
+
+import networkx as nx
+
+from compas_ags.diagrams import FormGraph
+from compas_ags.diagrams import graph_is_planar
+
+# ==============================================================================
+# Compare the planarity test with networkx
+# ==============================================================================
+
+
+def from_edges(edges):
+    graph = FormGraph()
+    for u, v in edges:
+        for node in (u, v):
+            if not graph.has_node(node):
+                graph.add_node(node, x=random.random(), y=random.random(), z=0.0)
+        graph.add_edge(u, v)
+    return graph
+
+
+def check(edges, expected=None):
+    planar = nx.check_planarity(nx.Graph(edges))[0]
+    if expected is not None:
+        assert planar == expected
+    assert graph_is_planar(from_edges(edges)) == planar, edges
+    return planar
+
+
+k4 = [(u, v) for u in range(4) for v in range(u + 1, 4)]
+k5 = [(u, v) for u in range(5) for v in range(u + 1, 5)]
+k33 = [(u, v) for u in range(3) for v in range(3, 6)]
+
+check(k4, True)
+check(k5, False)
+check(k33, False)
+
+# a subdivision of K3,3 is not planar either
+
+check([(u, 10 + i) for i, (u, v) in enumerate(k33)] + [(10 + i, v) for i, (u, v) in enumerate(k33)], False)
+
+# a 30 x 30 grid, with and without one diagonal too many
+
+n = 30
+grid = [(i * n + j, i * n + j + 1) for i in range(n) for j in range(n - 1)]
+grid += [(i * n + j, (i + 1) * n + j) for i in range(n - 1) for j in range(n)]
+check(grid, True)
+check(grid + [(0, n * n - 1)], True)
+check(grid + [(0, n * n - 1), (n - 1, n * (n - 1))], False)
+
+# random graphs around the threshold of planarity
+
+random.seed(0)
+counts = {True: 0, False: 0}
+for _ in range(500):
+    nodes = random.randint(5, 30)
+    edges = set()
+    for _ in range(random.randint(nodes, 3 * nodes)):
+        u, v = random.sample(range(nodes), 2)
+        edges.add((u, v))
+    counts[check(sorted(edges))] += 1
+assert counts[True] and counts[False]
+
+# ==============================================================================
+# Cache invalidation
+# ==============================================================================
+
+graph = from_edges(k5)
+assert not graph.is_planar()
+
+graph.delete_edge(0, 1)
+assert graph.is_planar()
+
+graph.add_edge(0, 1)
+assert not graph.is_planar()
+
+graph.data = from_edges(k4).data
+assert graph.is_planar()
+
+graph.data = from_edges(k33).data
+assert not graph.is_planar()
+
+print('planarity ok', counts)
@@ -42,13 +42,50 @@ Load Path
     compute_internal_work_compression
     optimise_loadpath
 
+
+Registry
+========
+
+.. autosummary::
+    :toctree: generated/
+
+    register_diagrams_proxy
+    release_diagrams_proxy
+    preload_modules_proxy
+    registered_diagrams
+    flatten_xy
+    diagram_set_xy
+    form_set_arrays
+    DiagramSession
+    registered_session
+    evict_idle_sessions
+
+
+Session
+=======
+
+.. autosummary::
+    :toctree: generated/
+
+    session_update_q
+    session_update_force
+    session_update_form
+    session_compute_loadpath
+    session_update_q_proxy
+    session_update_force_proxy
+    session_update_form_proxy
+    session_compute_loadpath_proxy
+
 """
 from __future__ import absolute_import
 
 import compas
 
+from .registry import *  # noqa: F401 F403
+
 if not compas.IPY:
     from .core import *  # noqa: F401 F403
+    from .session import *  # noqa: F401 F403
     from .graphstatics import *  # noqa: F401 F403
     from .loadpath import *  # noqa: F401 F403
     from .constraints import *  # noqa: F401 F403
@@ -114,12 +114,8 @@ class ConstraintsCollection(object):
         return lines
 
     def constrain_dependent_leaf_edges_lengths(self):
-        leaves = self.form.leaves()
-        dependent_leaf_edges = []
-        for i, (u, v) in enumerate(self.form.edges()):
-            if u in leaves or v in leaves:
-                if not self.form.edge_attribute((u, v), 'is_ind'):
-                    dependent_leaf_edges.append((u, v))
+        ind = self.form.ind_set()
+        dependent_leaf_edges = [edge for edge in self.form.leaf_edges() if edge not in ind]
         for edge in dependent_leaf_edges:
             self.add_constraint(LengthFix(self.form, edge))
 
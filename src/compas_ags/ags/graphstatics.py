@@ -28,6 +28,13 @@ from compas_ags.ags.core import update_q_from_qind
 from compas_ags.ags.core import update_form_from_force
 from compas_ags.ags.core import get_jacobian_and_residual
 
+from compas_ags.ags.registry import registered_session
+from compas_ags.ags.registry import diagram_set_xy
+
+from compas_ags.ags.session import session_update_q
+from compas_ags.ags.session import session_update_force
+from compas_ags.ags.session import session_update_form
+
 from compas_ags.exceptions import SolutionError
 
 
@@ -43,6 +50,10 @@ __all__ = [
     'form_update_from_force_proxy',
     'form_update_from_force_newton_proxy',
     'force_update_from_form_proxy',
+
+    'form_update_q_from_qind_array_proxy',
+    'form_update_from_force_array_proxy',
+    'force_update_from_form_array_proxy',
 ]
 
 
@@ -81,6 +92,82 @@ def form_update_from_force_newton_proxy(forcedata, formdata, *args, **kwargs):
     return force.to_data()
 
 
+# ==============================================================================
+# array proxy
+# ==============================================================================
+
+
+def form_update_q_from_qind_array_proxy(key, xy, q, ind=None):
+    """Update the force densities of a registered form diagram using flat arrays.
+
+    Parameters
+    ----------
+    key : str
+        The key of the registered diagrams.
+    xy : list
+        The coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    q : list
+        The force densities of the edges of the form diagram.
+    ind : list, optional
+        The indices of the independent edges.
+        If not provided, the independent edges of the registered form diagram are used.
+
+    Returns
+    -------
+    tuple
+        The force densities, forces and lengths of the edges.
+    """
+    session = registered_session(key)
+    return session_update_q(session, xy=xy, q=q, ind=ind)
+
+
+def form_update_from_force_array_proxy(key, xy, _xy, kmax=100):
+    """Update the geometry of a registered form diagram using flat arrays.
+
+    Parameters
+    ----------
+    key : str
+        The key of the registered diagrams.
+    xy : list
+        The coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    _xy : list
+        The coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+    kmax : int, optional
+        Maximum number of iterations.
+        Default is ``100``.
+
+    Returns
+    -------
+    tuple
+        The coordinates of the vertices of the form diagram,
+        and the force densities, forces, lengths and angle deviations of its edges.
+    """
+    session = registered_session(key)
+    diagram_set_xy(session.form, xy)
+    return session_update_form(session, _xy=_xy, kmax=kmax)
+
+
+def force_update_from_form_array_proxy(key, xy, q):
+    """Update the geometry of a registered force diagram using flat arrays.
+
+    Parameters
+    ----------
+    key : str
+        The key of the registered diagrams.
+    xy : list
+        The coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    q : list
+        The force densities of the edges of the form diagram.
+
+    Returns
+    -------
+    list
+        The coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+    """
+    session = registered_session(key)
+    return session_update_force(session, xy=xy, q=q)
+
+
 # ==============================================================================
 # analysis form diagram
 # ==============================================================================
@@ -227,10 +314,9 @@ def form_update_q_from_qind(form):
     free = list(set(range(vcount)) - set(fixed))
     ind = [edge_index[edge] for edge in form.ind()]
     dep = list(set(range(ecount)) - set(ind))
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
     xy = array(form.xy(), dtype=float64).reshape((-1, 2))
-    q = array(form.q(), dtype=float64).reshape((-1, 1))
-    C = connectivity_matrix(edges, 'csr')
+    q = form.edges_array('q').reshape((-1, 1))
+    C = form.topology().connectivity_matrix('csr')
     E = equilibrium_matrix(C, xy, free, 'csr')
 
     update_q_from_qind(E, q, dep, ind)
@@ -239,9 +325,9 @@ def form_update_q_from_qind(form):
     lengths = normrow(uv)
     forces = q * lengths
 
-    for edge in form.edges():
-        index = edge_index[edge]
-        form.edge_attributes(edge, ['q', 'f', 'l'], [q[index, 0], forces[index, 0], lengths[index, 0]])
+    form.edges_array_update('q', q)
+    form.edges_array_update('f', forces)
+    form.edges_array_update('l', lengths)
 
 
 def form_update_from_force(form, force, kmax=100):
@@ -291,8 +377,7 @@ def form_update_from_force(form, force, kmax=100):
     ij_e.update({(vertex_index[v], vertex_index[u]): edge_index[u, v] for u, v in edge_index})
 
     xy = array(form.xy(), dtype=float64)
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
     # --------------------------------------------------------------------------
     # constraints
     # --------------------------------------------------------------------------
@@ -305,8 +390,7 @@ def form_update_from_force(form, force, kmax=100):
     # force diagram
     # --------------------------------------------------------------------------
     _vertex_index = force.vertex_index()
-    _edge_index = force.edge_index(form)
-    _edge_index.update({(v, u): _edge_index[u, v] for u, v in _edge_index})
+    _inverse = force.edge_permutation(form)[1]
 
     _xy = array(force.xy(), dtype=float64)
     _edges = force.ordered_edges(form)
@@ -330,27 +414,21 @@ def form_update_from_force(form, force, kmax=100):
     # --------------------------------------------------------------------------
     # update form diagram
     # --------------------------------------------------------------------------
-    for vertex, attr in form.vertices(True):
+    for vertex in form.vertices():
         index = vertex_index[vertex]
-        attr['x'] = xy[index, 0]
-        attr['y'] = xy[index, 1]
-    for edge, attr in form.edges(True):
+        form.vertex_attributes(vertex, 'xy', [xy[index, 0], xy[index, 1]])
+    for edge in form.edges():
         index = edge_index[edge]
-        attr['l'] = lengths[index, 0]
-        attr['a'] = angles[index]
         if angles[index] < 90:
-            attr['f'] = forces[index, 0]
-            attr['q'] = q[index, 0]
+            f, fq = forces[index, 0], q[index, 0]
         else:
-            attr['f'] = - forces[index, 0]
-            attr['q'] = - q[index, 0]
+            f, fq = - forces[index, 0], - q[index, 0]
+        form.edge_attributes(edge, ['l', 'a', 'f', 'q'], [lengths[index, 0], angles[index], f, fq])
     # --------------------------------------------------------------------------
     # update force diagram
     # --------------------------------------------------------------------------
-    for edge, attr in force.edges(True):
-        index = _edge_index[edge]
-        attr['a'] = angles[index]
-        attr['l'] = forces[index, 0]
+    for edge, index in zip(force.edges(), _inverse.tolist()):
+        force.edge_attributes(edge, ['a', 'l'], [angles[index], forces[index, 0]])
 
 
 def form_update_from_force_newton(form, force, constraints=None, tol=1e-10, max_iter=20):
@@ -455,11 +533,8 @@ def force_update_from_form(force, form):
     # --------------------------------------------------------------------------
     # form diagram
     # --------------------------------------------------------------------------
-    vertex_index = form.vertex_index()
-
     xy = array(form.xy(), dtype=float64)
-    edges = [[vertex_index[u], vertex_index[v]] for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
     Q = diags([form.q()], [0])
     uv = C.dot(xy)
     # --------------------------------------------------------------------------
@@ -480,10 +555,9 @@ def force_update_from_form(force, form):
     # --------------------------------------------------------------------------
     # update force diagram
     # --------------------------------------------------------------------------
-    for vertex, attr in force.vertices(True):
+    for vertex in force.vertices():
         index = _vertex_index[vertex]
-        attr['x'] = _xy[index, 0]
-        attr['y'] = _xy[index, 1]
+        force.vertex_attributes(vertex, 'xy', [_xy[index, 0], _xy[index, 1]])
 
 
 # ==============================================================================
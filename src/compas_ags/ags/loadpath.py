@@ -17,6 +17,13 @@ from compas_ags.diagrams import ForceDiagram
 
 from compas_ags.ags.core import update_form_from_force
 
+from compas_ags.ags.registry import registered_session
+from compas_ags.ags.registry import registered_diagrams
+from compas_ags.ags.registry import diagram_set_xy
+from compas_ags.ags.registry import form_set_arrays
+
+from compas_ags.ags.session import session_compute_loadpath
+
 
 __all__ = [
     'compute_loadpath',
@@ -29,6 +36,10 @@ __all__ = [
     'compute_loadpath_proxy',
     'compute_loadpath_tension_proxy',
     'compute_loadpath_compression_proxy',
+
+    'compute_loadpath_array_proxy',
+    'compute_loadpath_tension_array_proxy',
+    'compute_loadpath_compression_array_proxy',
 ]
 
 
@@ -53,6 +64,76 @@ def compute_loadpath_compression_proxy(formdata, forcedata, *args, **kwargs):
     return lp
 
 
+def compute_loadpath_array_proxy(key, xy, _xy):
+    """Compute the internal work of registered diagrams using flat coordinate arrays.
+
+    Parameters
+    ----------
+    key : str
+        The key of the registered diagrams.
+    xy : list
+        The coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    _xy : list
+        The coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+
+    Returns
+    -------
+    float
+    """
+    session = registered_session(key)
+    diagram_set_xy(session.form, xy)
+    diagram_set_xy(session.force, _xy)
+    return session_compute_loadpath(session)
+
+
+def compute_loadpath_tension_array_proxy(key, xy, q, _xy):
+    """Compute the internal work of the tensile forces of registered diagrams using flat arrays.
+
+    Parameters
+    ----------
+    key : str
+        The key of the registered diagrams.
+    xy : list
+        The coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    q : list
+        The force densities of the edges of the form diagram.
+    _xy : list
+        The coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+
+    Returns
+    -------
+    float
+    """
+    form, force = registered_diagrams(key)
+    form_set_arrays(form, xy=xy, q=q)
+    diagram_set_xy(force, _xy)
+    return compute_internal_work_tension(form, force)
+
+
+def compute_loadpath_compression_array_proxy(key, xy, q, _xy):
+    """Compute the internal work of the compressive forces of registered diagrams using flat arrays.
+
+    Parameters
+    ----------
+    key : str
+        The key of the registered diagrams.
+    xy : list
+        The coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    q : list
+        The force densities of the edges of the form diagram.
+    _xy : list
+        The coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+
+    Returns
+    -------
+    float
+    """
+    form, force = registered_diagrams(key)
+    form_set_arrays(form, xy=xy, q=q)
+    diagram_set_xy(force, _xy)
+    return compute_internal_work_compression(form, force)
+
+
 def compute_loadpath(form, force):
     """Compute the internal work of a structure.
 
@@ -95,10 +176,8 @@ def compute_external_work(form, force):
     >>>
 
     """
-    vertex_index = form.vertex_index()
     xy = array(form.xy(), dtype=float64)
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
 
     _vertex_index = force.vertex_index()
     _xy = force.xy()
@@ -106,7 +185,7 @@ def compute_external_work(form, force):
     _edges[:] = [(_vertex_index[u], _vertex_index[v]) for u, v in _edges]
     _C = connectivity_matrix(_edges, 'csr')
 
-    leaves = set(form.leaves())
+    leaves = form.leaf_set()
     external = [i for i, (u, v) in enumerate(form.edges()) if u in leaves or v in leaves]
 
     lengths = normrow(C.dot(xy))
@@ -135,10 +214,8 @@ def compute_internal_work(form, force):
     >>>
 
     """
-    vertex_index = form.vertex_index()
     xy = array(form.xy(), dtype=float64)
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
 
     _vertex_index = force.vertex_index()
     _xy = force.xy()
@@ -146,7 +223,7 @@ def compute_internal_work(form, force):
     _edges[:] = [(_vertex_index[u], _vertex_index[v]) for u, v in _edges]
     _C = connectivity_matrix(_edges, 'csr')
 
-    leaves = set(form.leaves())
+    leaves = form.leaf_set()
     internal = [i for i, (u, v) in enumerate(form.edges()) if u not in leaves and v not in leaves]
 
     lengths = normrow(C.dot(xy))
@@ -175,10 +252,8 @@ def compute_internal_work_tension(form, force):
     >>>
 
     """
-    vertex_index = form.vertex_index()
     xy = array(form.xy(), dtype=float64)
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
     q = array(form.q(), dtype=float64).reshape((-1, 1))
 
     _vertex_index = force.vertex_index()
@@ -187,7 +262,7 @@ def compute_internal_work_tension(form, force):
     _edges[:] = [(_vertex_index[u], _vertex_index[v]) for u, v in _edges]
     _C = connectivity_matrix(_edges, 'csr')
 
-    leaves = set(form.leaves())
+    leaves = form.leaf_set()
     internal = [i for i, (u, v) in enumerate(form.edges()) if u not in leaves and v not in leaves]
     tension = [i for i in internal if q[i, 0] > 0]
 
@@ -217,10 +292,8 @@ def compute_internal_work_compression(form, force):
     >>>
 
     """
-    vertex_index = form.vertex_index()
     xy = array(form.xy(), dtype=float64)
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
     q = array(form.q(), dtype=float64).reshape((-1, 1))
 
     _vertex_index = force.vertex_index()
@@ -229,7 +302,7 @@ def compute_internal_work_compression(form, force):
     _edges[:] = [(_vertex_index[u], _vertex_index[v]) for u, v in _edges]
     _C = connectivity_matrix(_edges, 'csr')
 
-    leaves = set(form.leaves())
+    leaves = form.leaf_set()
     internal = [i for i, (u, v) in enumerate(form.edges()) if u not in leaves and v not in leaves]
     compression = [i for i in internal if q[i, 0] < 0]
 
@@ -283,30 +356,30 @@ def optimise_loadpath(form, force, algo='COBYLA'):
     ij_e.update({(vertex_index[v], vertex_index[u]): edge_index[u, v] for u, v in edge_index})
 
     xy = array(form.xy(), dtype=float64)
-    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
-    C = connectivity_matrix(edges, 'csr')
+    C = form.topology().connectivity_matrix('csr')
 
     leaves = [vertex_index[key] for key in form.leaves()]
     fixed = [vertex_index[key] for key in form.fixed()]
     free = list(set(range(form.number_of_vertices())) - set(fixed) - set(leaves))
+    fixed_x = [vertex_index[key] for key in form.fixed_x()]
+    fixed_y = [vertex_index[key] for key in form.fixed_y()]
     internal = [i for i, (u, v) in enumerate(form.edges()) if vertex_index[u] not in leaves and vertex_index[v] not in leaves]
 
     _vertex_index = force.vertex_index()
-    _edge_index = force.edge_index(form)
-    _edge_index.update({(v, u): _edge_index[u, v] for u, v in _edge_index})
+    _inverse = force.edge_permutation(form)[1]
 
     _xy = array(force.xy(), dtype=float64)
     _edges = force.ordered_edges(form)
     _edges[:] = [(_vertex_index[u], _vertex_index[v]) for u, v in _edges]
     _C = connectivity_matrix(_edges, 'csr')
 
-    _free = [key for key, attr in force.vertices(True) if attr['is_param']]
+    _free = [key for key in force.vertices() if force.vertex_attribute(key, 'is_param')]
     _free = [_vertex_index[key] for key in _free]
 
     def objfunc(_x):
         _xy[_free, 0] = _x
 
-        update_form_from_force(xy, _xy, free, leaves, i_j, ij_e, _C)
+        update_form_from_force(xy, _xy, free, fixed_x, fixed_y, leaves, i_j, ij_e, _C)
 
         length = normrow(C.dot(xy))
         force = normrow(_C.dot(_xy))
@@ -326,31 +399,24 @@ def optimise_loadpath(form, force, algo='COBYLA'):
     forces = normrow(_uv)
     q = forces / lengths
 
-    for vertex, attr in form.vertices(True):
+    for vertex in form.vertices():
         index = vertex_index[vertex]
-        attr['x'] = xy[index, 0]
-        attr['y'] = xy[index, 1]
+        form.vertex_attributes(vertex, 'xy', [xy[index, 0], xy[index, 1]])
 
-    for edge, attr in form.edges(True):
+    for edge in form.edges():
         index = edge_index[edge]
-        attr['l'] = lengths[index, 0]
-        attr['a'] = angles[index]
         if (angles[index] - 3.14159) ** 2 < 0.25 * 3.14159:
-            attr['f'] = - forces[index, 0]
-            attr['q'] = - q[index, 0]
+            f, fq = - forces[index, 0], - q[index, 0]
         else:
-            attr['f'] = forces[index, 0]
-            attr['q'] = q[index, 0]
+            f, fq = forces[index, 0], q[index, 0]
+        form.edge_attributes(edge, ['l', 'a', 'f', 'q'], [lengths[index, 0], angles[index], f, fq])
 
-    for vertex, attr in force.vertices(True):
+    for vertex in force.vertices():
         index = _vertex_index[vertex]
-        attr['x'] = _xy[index, 0]
-        attr['y'] = _xy[index, 1]
+        force.vertex_attributes(vertex, 'xy', [_xy[index, 0], _xy[index, 1]])
 
-    for edge, attr in force.edges(True):
-        index = _edge_index[edge]
-        attr['a'] = angles[index]
-        attr['l'] = forces[index, 0]
+    for edge, index in zip(force.edges(), _inverse.tolist()):
+        force.edge_attributes(edge, ['a', 'l'], [angles[index], forces[index, 0]])
 
 
 # ==============================================================================
@@ -0,0 +1,306 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import importlib
+
+from time import time
+from uuid import uuid4
+
+from compas_ags.diagrams import FormDiagram
+from compas_ags.diagrams import ForceDiagram
+
+
+__all__ = [
+    'DiagramSession',
+    'registered_session',
+    'registered_diagrams',
+    'evict_idle_sessions',
+    'flatten_xy',
+    'diagram_set_xy',
+    'form_set_arrays',
+
+    'register_diagrams_proxy',
+    'release_diagrams_proxy',
+    'preload_modules_proxy',
+]
+
+
+REGISTRY = {}
+
+TIMEOUT = 30 * 60
+
+
+class DiagramSession(object):
+    """A pair of form and force diagrams kept resident on the server under a key.
+
+    Parameters
+    ----------
+    form : :class:`compas_ags.diagrams.FormDiagram`
+        The form diagram.
+    force : :class:`compas_ags.diagrams.ForceDiagram`, optional
+        The force diagram.
+
+    Attributes
+    ----------
+    cache : dict
+        Compiled data of the diagrams, such as index maps, matrices and factorisations.
+        The data is compiled on demand by the session functions in :mod:`compas_ags.ags.session`.
+    accessed : float
+        The time of the last access to the session.
+    """
+
+    def __init__(self, form, force=None):
+        self.form = form
+        self.force = force
+        self.cache = {}
+        self.accessed = time()
+
+    def touch(self):
+        """Mark the session as accessed."""
+        self.accessed = time()
+
+    def invalidate(self, *names):
+        """Invalidate compiled data.
+
+        Parameters
+        ----------
+        names : str, optional
+            The names of the compiled data to invalidate.
+            If no names are provided, all compiled data is invalidated.
+        """
+        if not names:
+            self.cache.clear()
+            return
+        for name in names:
+            self.cache.pop(name, None)
+
+
+# ==============================================================================
+# proxy
+# ==============================================================================
+
+
+def register_diagrams_proxy(formdata, forcedata=None):
+    """Register the topology of a form diagram, and optionally its force diagram, with the server.
+
+    Parameters
+    ----------
+    formdata : dict
+        The data of the form diagram.
+    forcedata : dict, optional
+        The data of the corresponding force diagram.
+
+    Returns
+    -------
+    str
+        The key under which the diagrams are registered.
+        The key is used by the ``*_array_proxy`` and ``session_*_proxy`` functions to identify the diagrams.
+
+    Notes
+    -----
+    The registered diagrams are used as a template by the array-based proxy functions.
+    Only coordinates, force densities and the selection of independent edges are exchanged
+    with every call. Any other change to the diagrams (topology, fixed vertices, ...)
+    requires the diagrams to be registered again.
+
+    Sessions that are not accessed for longer than ``TIMEOUT`` seconds are evicted automatically.
+    """
+    form = FormDiagram.from_data(formdata)
+    force = None
+    if forcedata:
+        force = ForceDiagram.from_data(forcedata)
+        force.dual = form
+        form.dual = force
+    key = uuid4().hex
+    REGISTRY[key] = DiagramSession(form, force)
+    return key
+
+
+def release_diagrams_proxy(key):
+    """Release diagrams registered with the server.
+
+    Parameters
+    ----------
+    key : str
+        The key under which the diagrams are registered.
+
+    Returns
+    -------
+    bool
+        True if diagrams were registered under the key.
+        False otherwise.
+    """
+    return REGISTRY.pop(key, None) is not None
+
+
+def preload_modules_proxy(modules):
+    """Import modules on the server, such that the first calls to their functions are not delayed.
+
+    Parameters
+    ----------
+    modules : list of str
+        The names of the modules.
+
+    Returns
+    -------
+    dict
+        Per module, the time it took to import it, in seconds.
+        Modules that were already imported take no time.
+    """
+    timings = {}
+    for name in modules:
+        t0 = time()
+        importlib.import_module(name)
+        timings[name] = time() - t0
+    return timings
+
+
+# ==============================================================================
+# helpers
+# ==============================================================================
+
+
+def evict_idle_sessions(timeout=None):
+    """Release all sessions that have not been accessed for a given time.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        The maximum idle time in seconds.
+        Default is ``TIMEOUT``.
+
+    Returns
+    -------
+    list
+        The keys of the evicted sessions.
+    """
+    if timeout is None:
+        timeout = TIMEOUT
+    now = time()
+    keys = [key for key, session in REGISTRY.items() if now - session.accessed > timeout]
+    for key in keys:
+        del REGISTRY[key]
+    return keys
+
+
+def registered_session(key):
+    """Retrieve the session registered under a key.
+
+    Parameters
+    ----------
+    key : str
+        The key under which the diagrams are registered.
+
+    Returns
+    -------
+    :class:`DiagramSession`
+
+    Raises
+    ------
+    KeyError
+        If no diagrams are registered under the key.
+        This is also the case if the session was released, or evicted after being idle for too long.
+    """
+    evict_idle_sessions()
+    if key not in REGISTRY:
+        raise KeyError('No diagrams are registered under this key: {}'.format(key))
+    session = REGISTRY[key]
+    session.touch()
+    return session
+
+
+def registered_diagrams(key):
+    """Retrieve the diagrams registered under a key.
+
+    Parameters
+    ----------
+    key : str
+        The key under which the diagrams are registered.
+
+    Returns
+    -------
+    tuple
+        The form diagram and the force diagram.
+        The force diagram is ``None`` if none was registered.
+
+    Raises
+    ------
+    KeyError
+        If no diagrams are registered under the key.
+    """
+    session = registered_session(key)
+    return session.form, session.force
+
+
+def flatten_xy(diagram):
+    """Get the XY coordinates of the vertices of a diagram as a flat list.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+
+    Returns
+    -------
+    list
+        The coordinates in the order of the vertices of the diagram: ``[x0, y0, x1, y1, ...]``.
+    """
+    return [c for xy in diagram.vertices_attributes('xy') for c in xy]
+
+
+def diagram_set_xy(diagram, xy):
+    """Set the XY coordinates of the vertices of a diagram from a flat list.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+    xy : list
+        The coordinates in the order of the vertices of the diagram: ``[x0, y0, x1, y1, ...]``.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    The coordinates are set with the attribute methods of the diagram,
+    such that they are stored in the attached columns, if any (see :meth:`compas_ags.diagrams.Diagram.attach_columns`).
+    """
+    for index, vertex in enumerate(diagram.vertices()):
+        diagram.vertex_attributes(vertex, 'xy', [float(xy[2 * index]), float(xy[2 * index + 1])])
+
+
+def form_set_arrays(form, xy=None, q=None, ind=None):
+    """Update a form diagram with the values of flat arrays.
+
+    Parameters
+    ----------
+    form : :class:`compas_ags.diagrams.FormDiagram`
+    xy : list, optional
+        The coordinates of the vertices: ``[x0, y0, x1, y1, ...]``.
+    q : list, optional
+        The force densities of the edges.
+    ind : list, optional
+        The indices of the independent edges.
+
+    Returns
+    -------
+    None
+    """
+    if xy is not None:
+        diagram_set_xy(form, xy)
+    if q is not None:
+        for edge, value in zip(form.edges(), q):
+            form.edge_attribute(edge, 'q', float(value))
+    if ind is not None:
+        ind = set(ind)
+        for index, edge in enumerate(form.edges()):
+            form.edge_attribute(edge, 'is_ind', index in ind)
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,342 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from numpy import array
+from numpy import float64
+
+from scipy.sparse import diags
+from scipy.sparse.linalg import splu
+
+from compas.geometry import angle_vectors_xy
+
+from compas.numerical import connectivity_matrix
+from compas.numerical import equilibrium_matrix
+from compas.numerical import normrow
+
+from compas_ags.ags.core import update_q_from_qind
+from compas_ags.ags.core import update_form_from_force
+
+from compas_ags.ags.registry import registered_session
+from compas_ags.ags.registry import flatten_xy
+from compas_ags.ags.registry import diagram_set_xy
+
+
+__all__ = [
+    'session_update_q',
+    'session_update_force',
+    'session_update_form',
+    'session_compute_loadpath',
+
+    'session_update_q_proxy',
+    'session_update_force_proxy',
+    'session_update_form_proxy',
+    'session_compute_loadpath_proxy',
+]
+
+
+# ==============================================================================
+# proxy
+# ==============================================================================
+
+
+def session_update_q_proxy(key, xy=None, q=None, ind=None):
+    session = registered_session(key)
+    return session_update_q(session, xy=xy, q=q, ind=ind)
+
+
+def session_update_force_proxy(key, xy=None, q=None, _xy=None):
+    session = registered_session(key)
+    return session_update_force(session, xy=xy, q=q, _xy=_xy)
+
+
+def session_update_form_proxy(key, _xy=None, kmax=100, xy=None):
+    session = registered_session(key)
+    return session_update_form(session, _xy=_xy, kmax=kmax, xy=xy)
+
+
+def session_compute_loadpath_proxy(key):
+    session = registered_session(key)
+    return session_compute_loadpath(session)
+
+
+# ==============================================================================
+# compilation
+# ==============================================================================
+
+
+def _compiled_form(session):
+    """Compile the index maps and matrices of the form diagram of a session."""
+    if 'form' in session.cache:
+        return session.cache['form']
+    form = session.form
+    vertex_index = form.vertex_index()
+    edge_index = form.edge_index()
+    vcount = form.number_of_vertices()
+    edges = [(vertex_index[u], vertex_index[v]) for u, v in form.edges()]
+    leaves = [vertex_index[vertex] for vertex in form.leaves()]
+    fixed = [vertex_index[vertex] for vertex in form.fixed()]
+    i_j = {index: [vertex_index[nbr] for nbr in form.vertex_neighbors(vertex)] for index, vertex in enumerate(form.vertices())}
+    ij_e = {(vertex_index[u], vertex_index[v]): edge_index[u, v] for u, v in edge_index}
+    ij_e.update({(vertex_index[v], vertex_index[u]): edge_index[u, v] for u, v in edge_index})
+    _leaves = set(leaves)
+    compiled = {
+        'edges': list(form.edges()),
+        'C': form.topology().connectivity_matrix('csr'),
+        'leaves': leaves,
+        'unsupported': list(set(range(vcount)) - set(leaves)),
+        'free': list(set(range(vcount)) - set(fixed) - set(leaves)),
+        'fixed_x': [vertex_index[vertex] for vertex in form.fixed_x()],
+        'fixed_y': [vertex_index[vertex] for vertex in form.fixed_y()],
+        'internal': [index for index, (i, j) in enumerate(edges) if i not in _leaves and j not in _leaves],
+        'i_j': i_j,
+        'ij_e': ij_e,
+    }
+    session.cache['form'] = compiled
+    return compiled
+
+
+def _compiled_ind(session):
+    """Compile the indices of the independent and dependent edges of the form diagram of a session."""
+    if 'ind' in session.cache:
+        return session.cache['ind']
+    form = session.form
+    edge_index = form.edge_index()
+    ind = [edge_index[edge] for edge in form.ind()]
+    dep = list(set(range(form.number_of_edges())) - set(ind))
+    compiled = {'ind': ind, 'dep': dep}
+    session.cache['ind'] = compiled
+    return compiled
+
+
+def _compiled_force(session):
+    """Compile the index maps, matrices and factorisations of the force diagram of a session."""
+    if 'force' in session.cache:
+        return session.cache['force']
+    form = session.form
+    force = session.force
+    if force is None:
+        raise ValueError('No force diagram is registered with this session.')
+    _vertex_index = force.vertex_index()
+    _edges = [(_vertex_index[u], _vertex_index[v]) for u, v in force.ordered_edges(form)]
+    _C = connectivity_matrix(_edges, 'csr')
+    _Ct = _C.transpose()
+    _L = _Ct.dot(_C)
+    _known = [_vertex_index[force.anchor()]]
+    _unknown = list(set(range(force.number_of_vertices())) - set(_known))
+    compiled = {
+        'edges': list(force.edges()),
+        'inverse': force.edge_permutation(form)[1].tolist(),
+        'C': _C,
+        'Ct': _Ct,
+        'known': _known,
+        'unknown': _unknown,
+        'L12': _L[_unknown, :][:, _known],
+        'L11': splu(_L[_unknown, :][:, _unknown].tocsc()),
+    }
+    session.cache['force'] = compiled
+    return compiled
+
+
+# ==============================================================================
+# operations
+# ==============================================================================
+
+
+def session_update_q(session, xy=None, q=None, ind=None):
+    """Update the force densities of the dependent edges of the form diagram of a session.
+
+    Parameters
+    ----------
+    session : :class:`compas_ags.ags.DiagramSession`
+        The session.
+    xy : list, optional
+        New coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    q : list, optional
+        New force densities of the edges of the form diagram.
+    ind : list, optional
+        New indices of the independent edges of the form diagram.
+
+    Returns
+    -------
+    tuple
+        The force densities, forces and lengths of the edges.
+
+    Notes
+    -----
+    This is equivalent to :func:`compas_ags.ags.form_update_q_from_qind`,
+    but reuses the compiled data of the session.
+    """
+    form = session.form
+    if xy is not None:
+        diagram_set_xy(form, xy)
+    if ind is not None:
+        ind = set(ind)
+        for index, edge in enumerate(form.edges()):
+            form.edge_attribute(edge, 'is_ind', index in ind)
+        session.invalidate('ind')
+    compiled = _compiled_form(session)
+    edges = compiled['edges']
+    if q is not None:
+        for edge, value in zip(edges, q):
+            form.edge_attribute(edge, 'q', float(value))
+    compiled_ind = _compiled_ind(session)
+
+    C = compiled['C']
+    xy = array(form.xy(), dtype=float64).reshape((-1, 2))
+    q = array(form.q(), dtype=float64).reshape((-1, 1))
+    E = equilibrium_matrix(C, xy, compiled['unsupported'], 'csr')
+
+    update_q_from_qind(E, q, compiled_ind['dep'], compiled_ind['ind'])
+
+    lengths = normrow(C.dot(xy))
+    forces = q * lengths
+
+    for index, edge in enumerate(edges):
+        form.edge_attributes(edge, ['q', 'f', 'l'], [q[index, 0], forces[index, 0], lengths[index, 0]])
+    return q[:, 0].tolist(), forces[:, 0].tolist(), lengths[:, 0].tolist()
+
+
+def session_update_force(session, xy=None, q=None, _xy=None):
+    """Update the force diagram of a session after modifying the form diagram.
+
+    Parameters
+    ----------
+    session : :class:`compas_ags.ags.DiagramSession`
+        The session.
+    xy : list, optional
+        New coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``.
+    q : list, optional
+        New force densities of the edges of the form diagram.
+    _xy : list, optional
+        New coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+        Only the coordinates of the anchor of the force diagram affect the result.
+
+    Returns
+    -------
+    list
+        The coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+
+    Notes
+    -----
+    This is equivalent to :func:`compas_ags.ags.force_update_from_form`,
+    but reuses the factorisation of the Laplacian of the force diagram stored in the session.
+    """
+    form = session.form
+    force = session.force
+    if xy is not None:
+        diagram_set_xy(form, xy)
+    if _xy is not None:
+        diagram_set_xy(force, _xy)
+    compiled = _compiled_form(session)
+    if q is not None:
+        for edge, value in zip(compiled['edges'], q):
+            form.edge_attribute(edge, 'q', float(value))
+    _compiled = _compiled_force(session)
+
+    xy = array(form.xy(), dtype=float64)
+    Q = diags([form.q()], [0])
+    uv = compiled['C'].dot(xy)
+
+    _known = _compiled['known']
+    _unknown = _compiled['unknown']
+    _xy = array(force.xy(), dtype=float64)
+    b = _compiled['Ct'].dot(Q).dot(uv)
+    b = b[_unknown] - _compiled['L12'].dot(_xy[_known])
+    _xy[_unknown] = _compiled['L11'].solve(b)
+
+    diagram_set_xy(force, _xy.flatten())
+    return _xy.flatten().tolist()
+
+
+def session_update_form(session, _xy=None, kmax=100, xy=None):
+    """Update the form diagram of a session after modifying the force diagram.
+
+    Parameters
+    ----------
+    session : :class:`compas_ags.ags.DiagramSession`
+        The session.
+    _xy : list, optional
+        New coordinates of the vertices of the force diagram: ``[x0, y0, x1, y1, ...]``.
+    kmax : int, optional
+        Maximum number of iterations.
+        Default is ``100``.
+    xy : list, optional
+        New coordinates of the vertices of the form diagram: ``[x0, y0, x1, y1, ...]``,
+        used as the starting point of the update and for the locations of the fixed vertices.
+
+    Returns
+    -------
+    tuple
+        The coordinates of the vertices of the form diagram,
+        and the force densities, forces, lengths and angle deviations of its edges.
+
+    Notes
+    -----
+    This is equivalent to :func:`compas_ags.ags.form_update_from_force`,
+    but reuses the compiled data of the session.
+    """
+    form = session.form
+    force = session.force
+    if xy is not None:
+        diagram_set_xy(form, xy)
+    if _xy is not None:
+        diagram_set_xy(force, _xy)
+    compiled = _compiled_form(session)
+    _compiled = _compiled_force(session)
+
+    C = compiled['C']
+    _C = _compiled['C']
+    xy = array(form.xy(), dtype=float64)
+    _xy = array(force.xy(), dtype=float64)
+
+    update_form_from_force(xy, _xy, compiled['free'], compiled['fixed_x'], compiled['fixed_y'], compiled['leaves'], compiled['i_j'], compiled['ij_e'], _C, kmax=kmax)
+
+    uv = C.dot(xy)
+    _uv = _C.dot(_xy)
+    angles = [angle_vectors_xy(a, b, deg=True) for a, b in zip(uv, _uv)]
+    lengths = normrow(uv)
+    forces = normrow(_uv)
+    q = forces / lengths
+
+    diagram_set_xy(form, xy.flatten())
+    for index, edge in enumerate(compiled['edges']):
+        if angles[index] < 90:
+            f, fq = forces[index, 0], q[index, 0]
+        else:
+            f, fq = - forces[index, 0], - q[index, 0]
+        form.edge_attributes(edge, ['l', 'a', 'f', 'q'], [lengths[index, 0], angles[index], f, fq])
+    for edge, index in zip(_compiled['edges'], _compiled['inverse']):
+        force.edge_attributes(edge, ['a', 'l'], [angles[index], forces[index, 0]])
+    return flatten_xy(form), form.edges_attribute('q'), form.edges_attribute('f'), form.edges_attribute('l'), form.edges_attribute('a')
+
+
+def session_compute_loadpath(session):
+    """Compute the internal work of the diagrams of a session.
+
+    Parameters
+    ----------
+    session : :class:`compas_ags.ags.DiagramSession`
+        The session.
+
+    Returns
+    -------
+    float
+        The internal work done by the structure.
+    """
+    compiled = _compiled_form(session)
+    _compiled = _compiled_force(session)
+    xy = array(session.form.xy(), dtype=float64)
+    _xy = array(session.force.xy(), dtype=float64)
+    internal = compiled['internal']
+    lengths = normrow(compiled['C'].dot(xy))
+    forces = normrow(_compiled['C'].dot(_xy))
+    return float(lengths[internal].T.dot(forces[internal])[0, 0])
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
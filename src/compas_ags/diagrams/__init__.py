@@ -13,6 +13,39 @@ Graphs
 
     FormGraph
 
+Faces
+=====
+
+.. autosummary::
+    :toctree: generated/
+
+    graph_remove_degree2_nodes
+    graph_find_cycles
+
+Crossings
+=========
+
+.. autosummary::
+    :toctree: generated/
+
+    graph_find_crossings
+
+Planarity
+=========
+
+.. autosummary::
+    :toctree: generated/
+
+    graph_is_planar
+
+Duality
+=======
+
+.. autosummary::
+    :toctree: generated/
+
+    diagram_dual
+
 Diagrams
 ========
 
@@ -23,11 +56,49 @@ Diagrams
     FormDiagram
     ForceDiagram
 
+Columns
+=======
+
+.. autosummary::
+    :toctree: generated/
+
+    ColumnStore
+
+Topology
+========
+
+.. autosummary::
+    :toctree: generated/
+
+    CompactTopology
+
+Serialisation
+=============
+
+.. autosummary::
+    :toctree: generated/
+
+    pack_diagram
+    unpack_diagram
+    pack_sections
+    unpack_sections
+    diagram_to_sections
+    diagram_from_sections
+    pack_topology
+    unpack_topology
+
 """
 from __future__ import absolute_import
 
+from .crossings import *  # noqa: F401 F403
+from .planarity import *  # noqa: F401 F403
 from .formgraph import *  # noqa: F401 F403
+from .faces import *  # noqa: F401 F403
+from .binary import *  # noqa: F401 F403
+from .columns import *  # noqa: F401 F403
+from .topology import *  # noqa: F401 F403
 from .diagram import *  # noqa: F401 F403
+from .dual import *  # noqa: F401 F403
 from .formdiagram import *  # noqa: F401 F403
 from .forcediagram import *  # noqa: F401 F403
 
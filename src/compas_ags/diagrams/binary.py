@@ -0,0 +1,609 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import sys
+import json
+import zlib
+import struct
+
+from array import array
+from itertools import chain
+
+from compas.utilities import DataEncoder
+from compas.utilities import DataDecoder
+
+
+__all__ = [
+    'BINARY_MAGIC',
+    'BINARY_VERSION',
+    'pack_diagram',
+    'unpack_diagram',
+    'pack_sections',
+    'unpack_sections',
+    'diagram_to_sections',
+    'diagram_from_sections',
+    'pack_topology',
+    'unpack_topology',
+]
+
+
+BINARY_MAGIC = b'AGSD'
+
+BINARY_VERSION = 2
+
+SECTIONS = ('META', 'TOPO', 'VXYZ', 'VATT', 'EATT', 'FATT')
+
+GEOMETRY = ('x', 'y', 'z')
+
+INT32_MIN = -2 ** 31
+
+INT32_MAX = 2 ** 31 - 1
+
+BIGENDIAN = sys.byteorder == 'big'
+
+HEADER = struct.Struct('<4sHH')
+
+SECTION = struct.Struct('<4sI')
+
+SECTION2 = struct.Struct('<4sBI')
+
+COUNT = struct.Struct('<I')
+
+COLUMN = struct.Struct('<1sBI')
+
+
+# ==============================================================================
+# arrays
+# ==============================================================================
+
+
+def _array_to_bytes(typecode, values):
+    a = array(typecode, values)
+    if BIGENDIAN:
+        a.byteswap()
+    try:
+        return a.tobytes()
+    except AttributeError:
+        return a.tostring()
+
+
+def _array_from_bytes(typecode, data):
+    a = array(typecode)
+    try:
+        a.frombytes(data)
+    except AttributeError:
+        a.fromstring(data)
+    if BIGENDIAN:
+        a.byteswap()
+    return a
+
+
+class _Reader(object):
+    """Sequential reader of a bytes buffer."""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, size):
+        start = self.offset
+        self.offset += size
+        if self.offset > len(self.data):
+            raise ValueError('The binary data is truncated.')
+        return self.data[start:self.offset]
+
+    def unpack(self, fmt):
+        return fmt.unpack(self.read(fmt.size))
+
+    def count(self):
+        return self.unpack(COUNT)[0]
+
+
+def _pack_ints(values):
+    """Pack a list of integers into an array of the smallest sufficient width."""
+    typecode = 'i'
+    if values:
+        low, high = min(values), max(values)
+        if -2 ** 7 <= low and high < 2 ** 7:
+            typecode = 'b'
+        elif -2 ** 15 <= low and high < 2 ** 15:
+            typecode = 'h'
+    return COUNT.pack(len(values)) + typecode.encode('ascii') + _array_to_bytes(typecode, values)
+
+
+def _unpack_ints(reader):
+    n = reader.count()
+    typecode = reader.read(1).decode('ascii')
+    size = array(typecode).itemsize
+    return _array_from_bytes(typecode, reader.read(size * n)).tolist()
+
+
+def _pack_strings(values):
+    return _pack_bytes('\n'.join(values).encode('utf-8'))
+
+
+def _unpack_strings(reader):
+    data = _unpack_bytes(reader).decode('utf-8')
+    return data.split('\n') if data else []
+
+
+def _pack_bytes(data):
+    return COUNT.pack(len(data)) + data
+
+
+def _unpack_bytes(reader):
+    return reader.read(reader.count())
+
+
+# ==============================================================================
+# attribute tables
+# ==============================================================================
+
+
+def _column_type(values):
+    """Identify the most compact exact representation of a column of values."""
+    types = set(map(type, values))
+    if types == set([bool]):
+        return b'b'
+    if all(issubclass(t, float) for t in types):
+        return b'd'
+    if all(issubclass(t, int) and t is not bool for t in types):
+        if all(INT32_MIN <= value <= INT32_MAX for value in values):
+            return b'i'
+    return b'j'
+
+
+def _pack_table(dicts, include=None, exclude=None):
+    """Pack a list of attribute dicts into typed columns.
+
+    Every column stores the values of the elements that have the attribute,
+    and a presence mask if not all elements have it.
+    """
+    n = len(dicts)
+    exclude = set(exclude or [])
+    names = [name for name in dict.fromkeys(chain.from_iterable(dicts)) if name not in exclude and (include is None or name in include)]
+    parts = [COUNT.pack(n), COUNT.pack(len(names))]
+    for name in names:
+        try:
+            values = [attr[name] for attr in dicts]
+        except KeyError:
+            mask = [name in attr for attr in dicts]
+            values = [attr[name] for attr in dicts if name in attr]
+            masked = True
+        else:
+            masked = False
+        typecode = _column_type(values)
+        if typecode == b'b':
+            payload = _array_to_bytes('b', values)
+        elif typecode == b'd':
+            payload = _array_to_bytes('d', values)
+        elif typecode == b'i':
+            payload = _array_to_bytes('i', values)
+        else:
+            payload = json.dumps(values, cls=DataEncoder).encode('utf-8')
+        label = name.encode('utf-8')
+        parts.append(COUNT.pack(len(label)))
+        parts.append(label)
+        parts.append(COLUMN.pack(typecode, int(masked), len(payload)))
+        if masked:
+            parts.append(_array_to_bytes('b', mask))
+        parts.append(payload)
+    return b''.join(parts)
+
+
+def _unpack_table(data, dicts=None):
+    """Unpack typed columns into a list of attribute dicts."""
+    reader = _Reader(data)
+    n = reader.count()
+    names = []
+    columns = []
+    masked = []
+    for _ in range(reader.count()):
+        name = reader.read(reader.count()).decode('utf-8')
+        typecode, hasmask, size = reader.unpack(COLUMN)
+        mask = _array_from_bytes('b', reader.read(n)) if hasmask else None
+        payload = reader.read(size)
+        if typecode == b'b':
+            values = [bool(value) for value in _array_from_bytes('b', payload)]
+        elif typecode == b'd':
+            values = _array_from_bytes('d', payload).tolist()
+        elif typecode == b'i':
+            values = _array_from_bytes('i', payload).tolist()
+        elif typecode == b'j':
+            values = json.loads(payload.decode('utf-8'), cls=DataDecoder)
+        else:
+            raise ValueError('Unknown column type: {}'.format(typecode))
+        if hasmask:
+            masked.append((name, mask, values))
+        else:
+            names.append(name)
+            columns.append(values)
+    if dicts is None:
+        if columns:
+            dicts = [dict(zip(names, row)) for row in zip(*columns)]
+        else:
+            dicts = [{} for _ in range(n)]
+    elif columns:
+        for attr, row in zip(dicts, zip(*columns)):
+            attr.update(zip(names, row))
+    for name, mask, values in masked:
+        targets = [attr for attr, present in zip(dicts, mask) if present]
+        for attr, value in zip(targets, values):
+            attr[name] = value
+    return dicts
+
+
+# ==============================================================================
+# sections
+# ==============================================================================
+
+
+def pack_topology(diagram, attributes=True):
+    """Pack the topology of a diagram into a binary buffer.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    attributes : bool, optional
+        If True, include the keys of the edge and face attribute dicts.
+        Default is ``True``.
+
+    Returns
+    -------
+    bytes
+        The vertex, face and halfedge keys as integer arrays,
+        and optionally the keys of the edge and face attribute dicts.
+        Two diagrams have the same topology if they have the same buffer.
+
+    Notes
+    -----
+    The faces of the halfedges are only stored if they cannot be reconstructed from the vertex cycles of the faces,
+    for example, if a face has the same halfedge more than once.
+    The keys of the edge attribute dicts are stored as pairs of vertex keys,
+    unless a key does not have the form ``'u-v'``.
+
+    The packed vertex, face and halfedge keys are cached on the diagram (see :meth:`compas_ags.diagrams.Diagram.view`)
+    and only packed again after the topology was modified.
+    The keys of the attribute dicts are packed every time.
+    """
+    topology = diagram.view('binary_topology', lambda: _pack_halfedges(diagram), attributes=())
+    faces = []
+    edges = []
+    strings = []
+    if attributes:
+        faces = list(diagram.facedata)
+        edges = _edge_pairs(diagram.edgedata)
+        if edges is None:
+            edges = []
+            strings = list(diagram.edgedata)
+    return b''.join([topology, _pack_ints(faces), _pack_ints(edges), _pack_strings(strings)])
+
+
+def _pack_halfedges(diagram):
+    # the vertex, face and halfedge keys
+    halfedge = diagram.halfedge
+    nbrs = list(chain.from_iterable(halfedge.values()))
+    hfaces = list(chain.from_iterable(map(dict.values, halfedge.values())))
+    if _derived_halfedge_faces(diagram, len(hfaces) - hfaces.count(None)):
+        hfaces = []
+    else:
+        hfaces = [-1 if face is None else face for face in hfaces]
+    return b''.join([
+        _pack_ints(list(diagram.vertex)),
+        _pack_ints(list(diagram.face)),
+        _pack_ints(list(map(len, diagram.face.values()))),
+        _pack_ints(list(chain.from_iterable(diagram.face.values()))),
+        _pack_ints(list(halfedge)),
+        _pack_ints(list(map(len, halfedge.values()))),
+        _pack_ints(nbrs),
+        _pack_ints(hfaces),
+    ])
+
+
+def _derived_halfedge_faces(diagram, count):
+    # the faces of the halfedges follow from the vertex cycles of the faces
+    # if every halfedge of a face cycle points to the face, and no other halfedge points to a face
+    # count is the number of halfedges that point to a face
+    halfedge = diagram.halfedge
+    try:
+        for face, vertices in diagram.face.items():
+            u = vertices[-1]
+            for v in vertices:
+                if halfedge[u].get(v) != face:
+                    return False
+                u = v
+            count -= len(vertices)
+    except KeyError:
+        return False
+    return count == 0
+
+
+def _edge_pairs(keys):
+    # the keys of the edge attribute dicts as a flat list of vertex keys
+    # or None if not all keys have the form 'u-v'
+    # with only digits and a dash, JSON only accepts the keys if the numbers have no leading zeros
+    keys = list(keys)
+    if not keys:
+        return []
+    text = '-'.join(keys)
+    if not text.replace('-', '').isdigit():
+        return None
+    try:
+        pairs = json.loads('[' + text.replace('-', ',') + ']')
+    except ValueError:
+        return None
+    if len(pairs) != 2 * len(keys):
+        return None
+    return pairs
+
+
+def unpack_topology(diagram, data, version=BINARY_VERSION):
+    """Replace the topology of a diagram by the topology in a binary buffer.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    data : bytes
+        The buffer produced by :func:`pack_topology`.
+    version : int, optional
+        The version of the format of the buffer.
+        Default is the current version, :data:`BINARY_VERSION`.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    All vertex, edge and face attribute dicts of the diagram are replaced by empty dicts.
+    """
+    reader = _Reader(data)
+    vertices = _unpack_ints(reader)
+    faces = _unpack_ints(reader)
+    degrees = _unpack_ints(reader)
+    fvertices = _unpack_ints(reader)
+    halfedge = _unpack_ints(reader)
+    hdegree = _unpack_ints(reader)
+    nbrs = _unpack_ints(reader)
+    hfaces = _unpack_ints(reader)
+    facedata = _unpack_ints(reader)
+    if version < 2:
+        edges = _unpack_strings(reader)
+    else:
+        pairs = _unpack_ints(reader)
+        edges = _unpack_strings(reader)
+        if not edges:
+            edges = ['{}-{}'.format(u, v) for u, v in zip(pairs[::2], pairs[1::2])]
+    diagram.vertex = {vertex: {} for vertex in vertices}
+    diagram.face = {}
+    i = 0
+    for face, degree in zip(faces, degrees):
+        diagram.face[face] = fvertices[i:i + degree]
+        i += degree
+    diagram.halfedge = {}
+    i = 0
+    if hfaces or not nbrs:
+        hfaces = [None if face == -1 else face for face in hfaces]
+        for u, degree in zip(halfedge, hdegree):
+            diagram.halfedge[u] = dict(zip(nbrs[i:i + degree], hfaces[i:i + degree]))
+            i += degree
+    else:
+        for u, degree in zip(halfedge, hdegree):
+            diagram.halfedge[u] = dict.fromkeys(nbrs[i:i + degree])
+            i += degree
+        for face, vertices in diagram.face.items():
+            for u, v in zip(vertices, vertices[1:] + vertices[:1]):
+                diagram.halfedge[u][v] = face
+    diagram.facedata = {face: {} for face in facedata}
+    diagram.edgedata = {edge: {} for edge in edges}
+    diagram.invalidate()
+
+
+def diagram_to_sections(diagram):
+    """Convert the data of a diagram into binary sections.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+
+    Returns
+    -------
+    list
+        Pairs of section names and section payloads.
+
+    Notes
+    -----
+    The sections are
+
+    * ``META``: the version of the format, and the diagram attributes and default attributes as JSON,
+    * ``TOPO``: the vertex, face and halfedge keys as integer arrays, and the edge keys (see :func:`pack_topology`),
+    * ``VXYZ``: the coordinates of the vertices,
+    * ``VATT``: the other vertex attributes,
+    * ``EATT``: the edge attributes,
+    * ``FATT``: the face attributes.
+
+    """
+    diagram.flush_columns()
+    meta = {
+        'version': BINARY_VERSION,
+        'datatype': diagram.dtype,
+        'attributes': diagram.attributes,
+        'dva': diagram.default_vertex_attributes,
+        'dea': diagram.default_edge_attributes,
+        'dfa': diagram.default_face_attributes,
+        'max_vertex': diagram._max_vertex,
+        'max_face': diagram._max_face,
+    }
+    vertexdata = list(diagram.vertex.values())
+    return [
+        ('META', json.dumps(meta, cls=DataEncoder).encode('utf-8')),
+        ('TOPO', pack_topology(diagram)),
+        ('VXYZ', _pack_table(vertexdata, include=GEOMETRY)),
+        ('VATT', _pack_table(vertexdata, exclude=GEOMETRY)),
+        ('EATT', _pack_table(list(diagram.edgedata.values()))),
+        ('FATT', _pack_table(list(diagram.facedata.values()))),
+    ]
+
+
+def diagram_from_sections(diagram, sections):
+    """Replace the data of a diagram by the data in binary sections.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    sections : dict
+        The section payloads per section name.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Sections without a format version in the ``META`` section were written with version 1 of the format.
+    """
+    for name in SECTIONS:
+        if name not in sections:
+            raise ValueError('The binary data has no {} section.'.format(name))
+    meta = json.loads(sections['META'].decode('utf-8'), cls=DataDecoder)
+    diagram.attributes.update(meta['attributes'])
+    diagram.default_vertex_attributes.update(meta['dva'])
+    diagram.default_edge_attributes.update(meta['dea'])
+    diagram.default_face_attributes.update(meta['dfa'])
+    unpack_topology(diagram, sections['TOPO'], meta.get('version', 1))
+    vertexdata = list(diagram.vertex.values())
+    _unpack_table(sections['VXYZ'], vertexdata)
+    _unpack_table(sections['VATT'], vertexdata)
+    _unpack_table(sections['EATT'], list(diagram.edgedata.values()))
+    _unpack_table(sections['FATT'], list(diagram.facedata.values()))
+    diagram._max_vertex = meta['max_vertex']
+    diagram._max_face = meta['max_face']
+    diagram.invalidate()
+
+
+# ==============================================================================
+# packing
+# ==============================================================================
+
+
+def pack_sections(sections, compress=None):
+    """Pack binary sections into a single buffer with a versioned header.
+
+    Parameters
+    ----------
+    sections : list
+        Pairs of section names and section payloads.
+    compress : list, optional
+        The names of the sections of which the payloads are compressed with ``zlib``.
+        Payloads that do not become smaller are stored as they are.
+        Default is ``None``, in which case no payloads are compressed.
+
+    Returns
+    -------
+    bytes
+    """
+    parts = [HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(sections))]
+    for name, payload in sections:
+        compressed = False
+        if compress and name in compress:
+            data = zlib.compress(payload, 1)
+            if len(data) < len(payload):
+                payload = data
+                compressed = True
+        parts.append(SECTION2.pack(name.encode('ascii'), int(compressed), len(payload)))
+        parts.append(payload)
+    return b''.join(parts)
+
+
+def unpack_sections(data):
+    """Unpack a buffer with a versioned header into binary sections.
+
+    Parameters
+    ----------
+    data : bytes
+        The buffer.
+
+    Returns
+    -------
+    dict
+        The section payloads per section name.
+
+    Raises
+    ------
+    ValueError
+        If the buffer does not contain diagram data,
+        or if it was written with a newer version of the format.
+    """
+    reader = _Reader(data)
+    magic, version, count = reader.unpack(HEADER)
+    if magic != BINARY_MAGIC:
+        raise ValueError('The binary data is not a diagram.')
+    if version > BINARY_VERSION:
+        raise ValueError('The binary data was written with a newer version of the format: {}'.format(version))
+    sections = {}
+    for _ in range(count):
+        if version < 2:
+            name, size = reader.unpack(SECTION)
+            compressed = False
+        else:
+            name, compressed, size = reader.unpack(SECTION2)
+        payload = reader.read(size)
+        if compressed:
+            payload = zlib.decompress(payload)
+        sections[name.decode('ascii')] = payload
+    return sections
+
+
+def pack_diagram(diagram):
+    """Pack the data of a diagram into a compact binary buffer.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+
+    Returns
+    -------
+    bytes
+
+    Notes
+    -----
+    The topology is stored as arrays of integers.
+    The attributes are stored per attribute as typed columns of booleans, integers or floats,
+    with a presence mask if not all elements have the attribute.
+    Attributes with values of other or mixed types are stored as JSON.
+    The topology section is compressed with ``zlib`` at the fastest level.
+    The attribute sections are not compressed,
+    since columns of floats, such as coordinates and forces, hardly become smaller.
+    """
+    return pack_sections(diagram_to_sections(diagram), compress=['TOPO'])
+
+
+def unpack_diagram(diagram, data):
+    """Replace the data of a diagram by the data in a compact binary buffer.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    data : bytes
+        The buffer.
+
+    Returns
+    -------
+    None
+    """
+    diagram_from_sections(diagram, unpack_sections(data))
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
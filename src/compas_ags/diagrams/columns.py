@@ -0,0 +1,154 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+
+__all__ = ['ColumnStore']
+
+
+def _edge_key(edge):
+    return "-".join(map(str, sorted(edge)))
+
+
+class ColumnStore(object):
+    """Typed columns with the values of attributes of the vertices and edges of a diagram.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    vertex : list of str, optional
+        The names of the vertex attributes stored in columns.
+    edge : list of str, optional
+        The names of the edge attributes stored in columns.
+    dtypes : dict, optional
+        The type of the values per attribute name.
+        The default type is ``float``.
+
+    Attributes
+    ----------
+    vertices : list
+        The identifiers of the vertices, in the order of the rows of the vertex columns.
+    edges : list
+        The identifiers of the edges, in the order of the rows of the edge columns.
+    vertex : dict
+        A :class:`numpy.ndarray` per vertex attribute name.
+    edge : dict
+        A :class:`numpy.ndarray` per edge attribute name.
+
+    Notes
+    -----
+    The values of the attributes are moved out of the attribute dicts of the diagram into the columns,
+    and are written back by :meth:`flush`.
+    Column stores are created with :meth:`compas_ags.diagrams.Diagram.attach_columns`,
+    which routes the attribute methods of the diagram to the columns.
+    """
+
+    def __init__(self, diagram, vertex=None, edge=None, dtypes=None):
+        from numpy import array
+
+        dtypes = dtypes or {}
+        self.diagram = diagram
+        self.vertices = list(diagram.vertices())
+        self.edges = list(diagram.edges())
+        self.vertex_index = {key: index for index, key in enumerate(self.vertices)}
+        self.edge_index = {}
+        for index, (u, v) in enumerate(self.edges):
+            self.edge_index[u, v] = index
+            self.edge_index[v, u] = index
+        self.vertex = {}
+        for name in vertex or []:
+            default = diagram.default_vertex_attributes.get(name)
+            values = [diagram.vertex[key].pop(name, default) for key in self.vertices]
+            self.vertex[name] = array(values, dtype=dtypes.get(name, float))
+        self.edge = {}
+        for name in edge or []:
+            default = diagram.default_edge_attributes.get(name)
+            values = []
+            for edge in self.edges:
+                attr = diagram.edgedata.get(_edge_key(edge))
+                values.append(attr.pop(name, default) if attr else default)
+            self.edge[name] = array(values, dtype=dtypes.get(name, float))
+
+    def vertex_attribute(self, key, name, value=None):
+        """Get or set the value of an attribute of a vertex in a column.
+
+        Parameters
+        ----------
+        key : int
+            The identifier of the vertex.
+        name : str
+            The name of the attribute.
+        value : object, optional
+            The new value.
+
+        Returns
+        -------
+        object or None
+            The value, or None if the method is used as a setter.
+        """
+        column = self.vertex[name]
+        index = self.vertex_index[key]
+        if value is None:
+            return column[index].item()
+        column[index] = value
+
+    def edge_index_of(self, edge):
+        """The row of an edge in the edge columns.
+
+        Parameters
+        ----------
+        edge : tuple
+            The identifier of the edge, in either orientation.
+
+        Returns
+        -------
+        int or None
+            None if the edge has no row.
+        """
+        u, v = edge
+        return self.edge_index.get((u, v))
+
+    def edge_attribute(self, index, name, value=None):
+        """Get or set the value of an attribute of an edge in a column.
+
+        Parameters
+        ----------
+        index : int
+            The row of the edge (see :meth:`edge_index_of`).
+        name : str
+            The name of the attribute.
+        value : object, optional
+            The new value.
+
+        Returns
+        -------
+        object or None
+            The value, or None if the method is used as a setter.
+        """
+        column = self.edge[name]
+        if value is None:
+            return column[index].item()
+        column[index] = value
+
+    def flush(self):
+        """Write the values of the columns to the attribute dicts of the diagram."""
+        vertex = self.diagram.vertex
+        for name, column in self.vertex.items():
+            for key, value in zip(self.vertices, column.tolist()):
+                vertex[key][name] = value
+        edgedata = self.diagram.edgedata
+        keys = [_edge_key(edge) for edge in self.edges]
+        for name, column in self.edge.items():
+            for key, value in zip(keys, column.tolist()):
+                if key not in edgedata:
+                    edgedata[key] = {}
+                edgedata[key][name] = value
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
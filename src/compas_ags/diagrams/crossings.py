@@ -0,0 +1,85 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from itertools import islice
+
+from compas.geometry import is_intersection_segment_segment_xy
+
+
+__all__ = ['graph_find_crossings']
+
+
+def graph_find_crossings(graph, first=False):
+    """Find the pairs of crossing edges of a graph in the XY plane.
+
+    Parameters
+    ----------
+    graph : :class:`compas_ags.diagrams.FormGraph`
+        The graph.
+    first : bool, optional
+        If True, stop at the first pair of crossing edges.
+        Default is ``False``.
+
+    Returns
+    -------
+    list
+        The pairs of crossing edges, as pairs of edge identifiers in the orientation of ``graph.edges()``.
+        The pairs are sorted by the position of their edges in ``graph.edges()``.
+
+    Notes
+    -----
+    Two edges cross under the same conditions as in :func:`compas.datastructures.network_is_crossed`:
+    edges that share a node never cross,
+    and the edges are tested with :func:`compas.geometry.is_intersection_segment_segment_xy`, in both orders.
+
+    The edges are inserted in a uniform grid (:class:`compas_ags.utilities.UniformGrid`)
+    with on average one node per cell,
+    and only pairs of edges that have a cell in common are tested.
+    For drawings with edges of similar length the cost is close to linear in the number of edges and crossings,
+    instead of quadratic.
+    Edges that are far apart are never tested,
+    such that (nearly) colinear edges are no longer reported as crossing because of round-off errors,
+    as :func:`compas.datastructures.network_is_crossed` does, for example, for two of the radial edges of ``spiderweb.obj``.
+    """
+    from compas_ags.utilities import UniformGrid
+
+    edges = list(graph.edges())
+    xyz = {node: graph.node_coordinates(node) for node in graph.nodes()}
+    segments = [(xyz[u], xyz[v]) for u, v in edges]
+    grid = UniformGrid.from_points(xyz.values())
+    for index, (a, b) in enumerate(segments):
+        grid.insert_segment(index, a, b)
+
+    crossings = _crossings(edges, segments, grid.cells)
+    if first:
+        crossings = list(islice(crossings, 1))
+    else:
+        crossings = sorted(crossings)
+    return [(edges[i], edges[j]) for i, j in crossings]
+
+
+def _crossings(edges, segments, cells):
+    # the pairs of indices of crossing edges with a cell in common
+    tested = set()
+    for items in cells.values():
+        for n, i in enumerate(items):
+            u1, v1 = edges[i]
+            for j in items[n + 1:]:
+                pair = (i, j) if i < j else (j, i)
+                if pair in tested:
+                    continue
+                tested.add(pair)
+                u2, v2 = edges[j]
+                if u1 == u2 or v1 == v2 or u1 == v2 or u2 == v1:
+                    continue
+                if is_intersection_segment_segment_xy(segments[i], segments[j]) or is_intersection_segment_segment_xy(segments[j], segments[i]):
+                    yield pair
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -4,6 +4,11 @@ from __future__ import division
 
 from compas.datastructures import Mesh
 
+from compas_ags.diagrams.binary import pack_diagram
+from compas_ags.diagrams.binary import unpack_diagram
+from compas_ags.diagrams.columns import ColumnStore
+from compas_ags.diagrams.topology import CompactTopology
+
 
 __all__ = ['Diagram']
 
@@ -15,13 +20,56 @@ class Diagram(Mesh):
     ----------
     dual : :class:`compas_ags.diagrams.Diagram`
         The dual diagram of this diagram.
+    version : int
+        A counter that is incremented by every modification of the topology or the attributes of the diagram.
+    topology_version : int
+        A counter that is incremented by every modification of the topology of the diagram.
+    columns : :class:`compas_ags.diagrams.ColumnStore` or None
+        The typed columns in which attribute values are stored, if any (see :meth:`attach_columns`).
+
+    Notes
+    -----
+    Modifications through the methods of the diagram increment the versions automatically,
+    and the version of every modified attribute is tracked separately.
+    Code that modifies the data of the diagram directly,
+    for example by writing to the attribute dicts of vertices or edges,
+    should call :meth:`invalidate` afterwards,
+    unless it only modifies attributes that are not used by cached views (such as coordinates and forces).
 
     """
 
+    DATANAMES = ('vertex', 'halfedge', 'face', 'facedata', 'edgedata', 'attributes',
+                 'default_vertex_attributes', 'default_edge_attributes', 'default_face_attributes',
+                 '_max_vertex', '_max_face')
+
     def __init__(self):
+        self._version = 0
+        self._topology_version = 0
+        self._attribute_versions = {}
+        self._views = {}
+        self._columns = None
         super(Diagram, self).__init__()
         self._dual = None
 
+    def __getstate__(self):
+        """Return the state of the diagram for pickling, with the mesh data in binary format."""
+        state = {name: value for name, value in self.__dict__.items() if name not in Diagram.DATANAMES and name not in ('_views', '_columns')}
+        return {'__dict__': state, 'bytes': self.to_bytes()}
+
+    def __setstate__(self, state):
+        """Restore the state of the diagram from a pickled state."""
+        self._version = 0
+        self._topology_version = 0
+        self._attribute_versions = {}
+        self._views = {}
+        self._columns = None
+        super(Diagram, self).__init__()
+        self.__dict__.update(state['__dict__'])
+        if 'bytes' in state:
+            unpack_diagram(self, state['bytes'])
+        else:
+            self.data = state['data']
+
     @property
     def dual(self):
         """The dual of this diagram."""
@@ -31,18 +79,317 @@ class Diagram(Mesh):
     def dual(self, dual):
         self._dual = dual
 
+    @property
+    def data(self):
+        """dict: A data dict representing the diagram for serialisation."""
+        self.flush_columns()
+        return super(Diagram, self).data
+
+    @data.setter
+    def data(self, data):
+        self.detach_columns()
+        Mesh.data.fset(self, data)
+        self.invalidate()
+
+    @property
+    def version(self):
+        """The modification counter of the diagram."""
+        return self._version
+
+    @property
+    def topology_version(self):
+        """The modification counter of the topology of the diagram."""
+        return self._topology_version
+
+    # --------------------------------------------------------------------------
+    # Versions
+    # --------------------------------------------------------------------------
+
+    def invalidate(self):
+        """Mark the diagram as modified, such that all cached views are recomputed.
+
+        Attached columns are discarded without writing their values back to the attribute dicts,
+        since the dicts are assumed to have been replaced.
+        """
+        self._version += 1
+        self._topology_version += 1
+        self._columns = None
+
+    def _topology_modified(self):
+        self.detach_columns()
+        self.invalidate()
+
+    def attribute_version(self, name):
+        """The modification counter of an attribute.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+
+        Returns
+        -------
+        int
+        """
+        return self._attribute_versions.get(name, 0)
+
+    def _modified(self, names):
+        self._version += 1
+        versions = self._attribute_versions
+        for name in names:
+            versions[name] = versions.get(name, 0) + 1
+
+    def view(self, name, compute, attributes=None):
+        """Get a view of the diagram that is only recomputed after the diagram was modified.
+
+        Parameters
+        ----------
+        name : str
+            The name of the view.
+        compute : callable
+            A function without arguments computing the view.
+        attributes : list of str, optional
+            The names of the attributes the view depends on.
+            If provided, the view is only recomputed after modifications of the topology or of these attributes.
+            Otherwise, it is recomputed after every modification.
+
+        Returns
+        -------
+        object
+            The view.
+            Views are shared between all callers and should not be modified.
+        """
+        if attributes is None:
+            version = self._version
+        else:
+            version = self._topology_version, tuple(self._attribute_versions.get(attribute, 0) for attribute in attributes)
+        cached = self._views.get(name)
+        if cached is None or cached[0] != version:
+            cached = version, compute()
+            self._views[name] = cached
+        return cached[1]
+
+    # --------------------------------------------------------------------------
+    # Columns
+    # --------------------------------------------------------------------------
+
+    @property
+    def columns(self):
+        """The attached typed columns of attribute values, if any."""
+        return self._columns
+
+    def attach_columns(self, vertex=None, edge=None, dtypes=None):
+        """Move the values of attributes into typed columns.
+
+        Parameters
+        ----------
+        vertex : list of str, optional
+            The names of the vertex attributes.
+        edge : list of str, optional
+            The names of the edge attributes.
+        dtypes : dict, optional
+            The type of the values per attribute name.
+            The default type is ``float``.
+
+        Returns
+        -------
+        :class:`compas_ags.diagrams.ColumnStore`
+            The columns.
+
+        Notes
+        -----
+        While the columns are attached, the attribute methods of the diagram
+        (``vertex_attribute``, ``vertices_attribute``, ``edge_attribute``, ``edges_attributes``, ...)
+        and :meth:`vertex_coordinates` read and write the columns.
+        Solvers can read and write the columns directly, without copying the values.
+        The attribute dicts returned by ``vertices(data=True)``, ``edges(data=True)``,
+        or the attribute methods without attribute names, do not contain the values stored in columns,
+        and functions selecting elements by the values of these attributes (``vertices_where``, ...) should not be used.
+
+        The values are written back to the attribute dicts before the diagram is serialised,
+        and the columns are detached when the topology of the diagram is modified.
+        """
+        self.detach_columns()
+        self._columns = ColumnStore(self, vertex, edge, dtypes)
+        return self._columns
+
+    def detach_columns(self):
+        """Move the values of the attached columns back into the attribute dicts."""
+        columns = self._columns
+        if columns is None:
+            return
+        self._columns = None
+        columns.flush()
+
+    def flush_columns(self):
+        """Write the values of the attached columns to the attribute dicts, and keep the columns attached."""
+        if self._columns is not None:
+            self._columns.flush()
+
+    # --------------------------------------------------------------------------
+    # Modifications
+    # --------------------------------------------------------------------------
+
+    def clear(self):
+        self._topology_modified()
+        super(Diagram, self).clear()
+
+    def add_vertex(self, key=None, attr_dict=None, **kwattr):
+        self._topology_modified()
+        return super(Diagram, self).add_vertex(key, attr_dict, **kwattr)
+
+    def add_face(self, vertices, fkey=None, attr_dict=None, **kwattr):
+        self._topology_modified()
+        return super(Diagram, self).add_face(vertices, fkey, attr_dict, **kwattr)
+
+    def delete_vertex(self, key):
+        self._topology_modified()
+        super(Diagram, self).delete_vertex(key)
+
+    def delete_face(self, fkey):
+        self._topology_modified()
+        super(Diagram, self).delete_face(fkey)
+
+    def update_default_vertex_attributes(self, attr_dict=None, **kwattr):
+        self._modified(list(attr_dict or []) + list(kwattr))
+        super(Diagram, self).update_default_vertex_attributes(attr_dict, **kwattr)
+
+    def update_default_edge_attributes(self, attr_dict=None, **kwattr):
+        self._modified(list(attr_dict or []) + list(kwattr))
+        super(Diagram, self).update_default_edge_attributes(attr_dict, **kwattr)
+
+    def vertex_attribute(self, key, name, value=None):
+        if value is not None:
+            self._modified((name, ))
+        columns = self._columns
+        if columns is not None and name in columns.vertex:
+            return columns.vertex_attribute(key, name, value)
+        return super(Diagram, self).vertex_attribute(key, name, value)
+
+    def vertex_attributes(self, key, names=None, values=None):
+        if values is not None:
+            self._modified(names)
+        columns = self._columns
+        if columns is not None and names and any(name in columns.vertex for name in names):
+            if values is not None:
+                for name, value in zip(names, values):
+                    self.vertex_attribute(key, name, value)
+                return
+            return [self.vertex_attribute(key, name) for name in names]
+        return super(Diagram, self).vertex_attributes(key, names, values)
+
+    def unset_vertex_attribute(self, key, name):
+        self._modified((name, ))
+        columns = self._columns
+        if columns is not None and name in columns.vertex:
+            columns.vertex_attribute(key, name, self.default_vertex_attributes.get(name))
+            return
+        super(Diagram, self).unset_vertex_attribute(key, name)
+
+    def vertex_coordinates(self, key, axes='xyz'):
+        if self._columns is not None:
+            return [self.vertex_attribute(key, axis) for axis in axes]
+        return super(Diagram, self).vertex_coordinates(key, axes)
+
+    def edge_attribute(self, edge, name, value=None):
+        if value is not None:
+            self._modified((name, ))
+        columns = self._columns
+        if columns is not None and name in columns.edge:
+            index = columns.edge_index_of(edge)
+            if index is not None:
+                return columns.edge_attribute(index, name, value)
+        return super(Diagram, self).edge_attribute(edge, name, value)
+
+    def edge_attributes(self, edge, names=None, values=None):
+        if values is not None:
+            self._modified(names)
+        columns = self._columns
+        if columns is not None and names and any(name in columns.edge for name in names):
+            if values is not None:
+                for name, value in zip(names, values):
+                    self.edge_attribute(edge, name, value)
+                return
+            return [self.edge_attribute(edge, name) for name in names]
+        return super(Diagram, self).edge_attributes(edge, names, values)
+
+    def unset_edge_attribute(self, edge, name):
+        self._modified((name, ))
+        columns = self._columns
+        if columns is not None and name in columns.edge:
+            index = columns.edge_index_of(edge)
+            if index is not None:
+                columns.edge_attribute(index, name, self.default_edge_attributes.get(name))
+                return
+        super(Diagram, self).unset_edge_attribute(edge, name)
+
+    # --------------------------------------------------------------------------
+    # Binary
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Construct a diagram from data in compact binary format.
+
+        Parameters
+        ----------
+        data : bytes
+            The binary data produced by :meth:`to_bytes`.
+
+        Returns
+        -------
+        :class:`compas_ags.diagrams.Diagram`
+            A diagram of the type of ``cls``.
+        """
+        diagram = cls()
+        unpack_diagram(diagram, data)
+        return diagram
+
+    def to_bytes(self):
+        """Convert the data of the diagram to a compact binary format.
+
+        Returns
+        -------
+        bytes
+            The binary data.
+
+        Notes
+        -----
+        The binary data contains the same information as :attr:`data`,
+        with the topology stored as integer arrays and the attributes as typed columns.
+        It is considerably smaller and faster to write and read than the JSON representation of :attr:`data`.
+        See :func:`compas_ags.diagrams.pack_diagram` for details.
+        """
+        return pack_diagram(self)
+
+    # --------------------------------------------------------------------------
+    # Indices
+    # --------------------------------------------------------------------------
+
     def vertex_index(self):
-        return {vertex: index for index, vertex in enumerate(self.vertices())}
+        return dict(self.view('vertex_index', lambda: {vertex: index for index, vertex in enumerate(self.vertices())}, ()))
 
     def index_vertex(self):
         return {index: vertex for index, vertex in enumerate(self.vertices())}
 
     def edge_index(self):
-        return {edge: index for index, edge in enumerate(self.edges())}
+        return dict(self.view('edge_index', lambda: {edge: index for index, edge in enumerate(self.edges())}, ('_is_edge', )))
 
     def index_edge(self):
         return {index: edge for index, edge in enumerate(self.edges())}
 
+    def topology(self):
+        """The topology of the diagram in compact array format.
+
+        Returns
+        -------
+        :class:`compas_ags.diagrams.CompactTopology`
+            The topology.
+            It is built once and shared until the topology of the diagram is modified,
+            and should not be modified itself.
+        """
+        return self.view('topology', lambda: CompactTopology(self), ('_is_edge', ))
+
 
 # ==============================================================================
 # Main
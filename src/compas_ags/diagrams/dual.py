@@ -0,0 +1,124 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+
+__all__ = ['diagram_dual']
+
+
+def diagram_dual(diagram, cls):
+    """Construct the dual of a diagram.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    cls : type
+        The type of the dual diagram.
+
+    Returns
+    -------
+    tuple
+        The dual diagram,
+        and a dict mapping pairs of faces of the diagram that are separated by an edge,
+        and thus the halfedges of the dual diagram, to that edge, in the direction of ``diagram.edges()``.
+
+    Notes
+    -----
+    The dual is the same as the dual constructed by :func:`compas.datastructures.mesh_dual`.
+    Every face of the diagram becomes a vertex of the dual at the centroid of the face,
+    and every vertex of the diagram that is not on the boundary becomes a face of the dual,
+    with the same identifier.
+
+    The correspondence between the edges is recorded while the faces around the vertices are collected,
+    and the dicts of the dual are filled directly instead of adding the vertices and faces one by one.
+    """
+    face = diagram.face
+    halfedge = diagram.halfedge
+    boundary = set()
+    for u, nbrs in halfedge.items():
+        if None in nbrs.values():
+            boundary.add(u)
+            boundary.update(v for v, f in nbrs.items() if f is None)
+    primal = set(diagram.edges())
+
+    # the faces around every vertex that is not on the boundary
+    # in the cycling order of Mesh.vertex_neighbors
+    # the face following the face left of (vertex, nbr) is the face on the other side of (vertex, nbr)
+    centroids = {}
+    cycles = []
+    edges = {}
+    shared = []
+    for vertex in list(set(diagram.vertices()) - boundary):
+        nbrs = halfedge[vertex]
+        start = nbr = next(iter(nbrs))
+        faces = []
+        for _ in range(len(nbrs)):
+            left = nbrs[nbr]
+            right = halfedge[nbr][vertex]
+            faces.append(left)
+            edge = (vertex, nbr)
+            if edge in primal:
+                other = edge
+            else:
+                other = (nbr, vertex)
+                if other in primal:
+                    edge = other
+            if edges.setdefault((left, right), other) != other:
+                shared.append((left, right))
+            if edges.setdefault((right, left), edge) != edge:
+                shared.append((right, left))
+            cycle = face[right]
+            nbr = cycle[(cycle.index(vertex) + 1) % len(cycle)]
+            if nbr == start:
+                break
+        else:
+            raise ValueError('The faces around vertex {} do not form a closed cycle.'.format(vertex))
+        cycles.append((vertex, faces))
+        centroids.update(dict.fromkeys(faces))
+
+    # faces separated by more than one edge correspond to the first edge in the cycle of the face
+    for a, b in shared:
+        cycle = face[a]
+        for u, v in zip(cycle, cycle[1:] + cycle[:1]):
+            if halfedge[v][u] == b:
+                edges[a, b] = (u, v) if (u, v) in primal else (v, u)
+                break
+
+    dual = cls()
+    xyz = {vertex: diagram.vertex_coordinates(vertex) for vertex in diagram.vertices()}
+    for key in centroids:
+        x, y, z = zip(*[xyz[vertex] for vertex in face[key]])
+        p = len(x)
+        dual.vertex[key] = {'x': sum(x) / p, 'y': sum(y) / p, 'z': sum(z) / p}
+        dual.halfedge[key] = {}
+        if key > dual._max_vertex:
+            dual._max_vertex = key
+
+    dual_halfedge = dual.halfedge
+    for key, vertices in cycles:
+        # as Mesh.add_face
+        if vertices[-1] == vertices[0]:
+            vertices = vertices[:-1]
+        if len(set(vertices)) < len(vertices):
+            vertices = [u for u, v in zip(vertices, vertices[1:] + vertices[:1]) if u != v]
+        if len(vertices) < 3:
+            continue
+        if key > dual._max_face:
+            dual._max_face = key
+        dual.face[key] = vertices
+        dual.facedata.setdefault(key, {})
+        for u, v in zip(vertices, vertices[1:] + vertices[:1]):
+            dual_halfedge[u][v] = key
+            if u not in dual_halfedge[v]:
+                dual_halfedge[v][u] = None
+    dual.invalidate()
+    return dual, edges
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
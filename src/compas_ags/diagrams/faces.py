@@ -0,0 +1,215 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from math import atan2
+from math import pi
+
+from compas.geometry import angle_vectors
+from compas.geometry import is_ccw_xy
+
+
+__all__ = [
+    'graph_remove_degree2_nodes',
+    'graph_find_cycles',
+]
+
+
+PI2 = 2.0 * pi
+
+
+def graph_remove_degree2_nodes(graph):
+    """Remove the nodes with two neighbors from a graph.
+
+    Parameters
+    ----------
+    graph : :class:`compas_ags.diagrams.FormGraph`
+        The graph.
+
+    Returns
+    -------
+    list
+        The identifiers of the removed nodes.
+
+    Notes
+    -----
+    The nodes are visited in order and every node that has two neighbors at the time it is visited is removed,
+    together with its edges, exactly as if ``graph.delete_node`` was called for every such node in turn.
+    The removal of a node can therefore reduce the degree of a node that is visited later to two.
+    All nodes are removed at once, such that the cost is linear in the size of the graph.
+    """
+    adjacency = graph.adjacency
+    degree = {node: len(adjacency[node]) for node in graph.nodes()}
+    removed = []
+    deleted = set()
+    for node in list(graph.nodes()):
+        if degree[node] != 2:
+            continue
+        removed.append(node)
+        deleted.add(node)
+        for nbr in adjacency[node]:
+            if nbr not in deleted:
+                degree[nbr] -= 1
+    if not removed:
+        return removed
+    for node in removed:
+        del graph.node[node]
+        del adjacency[node]
+        graph.edge.pop(node, None)
+    for u in list(graph.edge):
+        for v in [v for v in graph.edge[u] if v in deleted]:
+            del graph.edge[u][v]
+        if not graph.edge[u]:
+            del graph.edge[u]
+    for u in adjacency:
+        for v in [v for v in adjacency[u] if v in deleted]:
+            del adjacency[u][v]
+    graph.invalidate()
+    return removed
+
+
+def graph_find_cycles(graph, breakpoints=None, indices=False):
+    """Find the faces of the planar straight-line embedding of a graph.
+
+    Parameters
+    ----------
+    graph : :class:`compas_ags.diagrams.FormGraph`
+        The graph.
+    breakpoints : list, optional
+        The nodes at which to break the found faces.
+        Default is ``None``.
+    indices : bool, optional
+        If True, return the faces as lists of the indices of the nodes in ``graph.nodes()``.
+        Default is ``False``.
+
+    Returns
+    -------
+    list
+        The faces as lists of node identifiers.
+
+    Notes
+    -----
+    The result is the same as the result of :func:`compas.datastructures.network_find_cycles`,
+    but the graph is not modified.
+
+    The neighbors of every node are sorted by angle once.
+    The halfedges are numbered per start node in the order of the sorted neighbors,
+    such that the halfedge following a halfedge in its face is found by integer arithmetic only.
+    Every halfedge is traversed once.
+    """
+    nodes = list(graph.nodes())
+    node_index = {node: index for index, node in enumerate(nodes)}
+    xyz = [graph.node_coordinates(node) for node in nodes]
+
+    # the halfedges from a node to its neighbors in counterclockwise order
+    offsets = [0]
+    end = []
+    for i, node in enumerate(nodes):
+        x, y = xyz[i][0], xyz[i][1]
+        nbrs = [node_index[nbr] for nbr in graph.neighbors(node)]
+        nbrs.sort(key=lambda j: atan2(xyz[j][1] - y, xyz[j][0] - x))
+        end.extend(nbrs)
+        offsets.append(len(end))
+
+    halfedge = {}
+    start = []
+    for i in range(len(nodes)):
+        for h in range(offsets[i], offsets[i + 1]):
+            halfedge[i, end[h]] = h
+            start.append(i)
+
+    # the next halfedge of a halfedge (i, j) starts at j
+    # and ends at the neighbor of j following i in clockwise order
+    following = []
+    for h in range(len(end)):
+        j = end[h]
+        twin = halfedge[j, start[h]]
+        following.append(twin - 1 if twin > offsets[j] else offsets[j + 1] - 1)
+
+    face = [None] * len(end)
+    cycles = []
+    found = {}
+
+    def trace(h):
+        first = start[h]
+        cycle = [first]
+        path = []
+        while True:
+            path.append(h)
+            cycle.append(end[h])
+            h = following[h]
+            if end[h] == first:
+                path.append(h)
+                break
+        frozen = frozenset(cycle)
+        if frozen not in found:
+            found[frozen] = len(cycles)
+            cycles.append(cycle)
+        for h in path:
+            face[h] = found[frozen]
+
+    leaves = [i for i in range(len(nodes)) if offsets[i + 1] - offsets[i] == 1]
+    candidates = leaves or range(len(nodes))
+    u = min(candidates, key=lambda i: (xyz[i][1], xyz[i][0]))
+    trace(halfedge[u, _first_neighbor(graph, nodes, node_index, u)])
+
+    for u, v in graph.edges():
+        i, j = node_index[u], node_index[v]
+        h = halfedge[i, j]
+        if face[h] is None:
+            trace(h)
+        h = halfedge[j, i]
+        if face[h] is None:
+            trace(h)
+
+    cycles = _break_cycles(cycles, [node_index[node] for node in breakpoints or []])
+    if indices:
+        return cycles
+    return [[nodes[i] for i in cycle] for cycle in cycles]
+
+
+def _first_neighbor(graph, nodes, node_index, index):
+    # the neighbor at the smallest clockwise angle from the direction (-1, -1)
+    key = nodes[index]
+    nbrs = graph.neighbors(key)
+    if len(nbrs) == 1:
+        return node_index[nbrs[0]]
+    ab = [-1.0, -1.0, 0.0]
+    a = graph.node_coordinates(key)
+    b = [a[0] + ab[0], a[1] + ab[1], 0]
+    angles = []
+    for nbr in nbrs:
+        c = graph.node_coordinates(nbr)
+        alpha = angle_vectors(ab, [c[0] - a[0], c[1] - a[1], 0])
+        if is_ccw_xy(a, b, c, True):
+            alpha = PI2 - alpha
+        angles.append(alpha)
+    return node_index[nbrs[angles.index(min(angles))]]
+
+
+def _break_cycles(cycles, breakpoints):
+    # split the cycles at the breakpoints
+    # the part before the first and after the last breakpoint are joined
+    breakpoints = set(breakpoints)
+    broken = []
+    for cycle in cycles:
+        faces = [[cycle[0]]]
+        for key in cycle[1:-1]:
+            faces[-1].append(key)
+            if key in breakpoints:
+                faces.append([key])
+        faces[-1].append(cycle[-1])
+        faces[-1].append(cycle[0])
+        if len(faces) > 1 and faces[0][0] not in breakpoints and faces[-1][-1] not in breakpoints:
+            if faces[0][0] == faces[-1][-1]:
+                faces[:] = [faces[-1] + faces[0][1:]] + faces[1:-1]
+        broken.extend(faces)
+    return broken
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -2,8 +2,8 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
-from compas.datastructures import mesh_dual
 from compas_ags.diagrams import Diagram
+from compas_ags.diagrams import diagram_dual
 
 
 __all__ = ['ForceDiagram']
@@ -41,10 +41,16 @@ class ForceDiagram(Diagram):
         Returns
         -------
         :class:`compas_ags.diagrams.ForceDiagram`
+
+        Notes
+        -----
+        The force diagram is constructed with :func:`compas_ags.diagrams.diagram_dual`,
+        and the correspondence between the edges of both diagrams found by the construction is kept.
         """
-        forcediagram = mesh_dual(formdiagram, cls)
+        forcediagram, edge_dual = diagram_dual(formdiagram, cls)
         forcediagram.dual = formdiagram
         formdiagram.dual = forcediagram
+        forcediagram._dual_view('dual_edges', formdiagram, lambda dual: {'edge_dual': edge_dual})
         return forcediagram
 
     # --------------------------------------------------------------------------
@@ -106,10 +112,9 @@ class ForceDiagram(Diagram):
         >>>
 
         """
-        for edge in list(self.edges()):
+        for edge, dual_edge in self._linked_dual_edges()['pairs']:
             is_match = True
 
-            dual_edge = self.dual_edge(edge)
             dual_edge_attr = self.dual.edge_attributes(dual_edge)
 
             for cond_name, cond_value in conditions.items():
@@ -155,12 +160,74 @@ class ForceDiagram(Diagram):
         -------
         tuple(int, int) or None
             The identifier of the dual edge if it exists.
+
+        Notes
+        -----
+        The correspondence between the edges of the diagram and its dual is computed once,
+        and is only updated after the topology of either diagram is modified.
+        """
+        u, v = edge
+        return self._dual_edges()['edge_dual'].get((u, v))
+
+    def edge_from_dual(self, edge):
+        """Find the edge corresponding to an edge of the diagram's dual.
+
+        Parameters
+        ----------
+        edge : tuple of int
+            The identifier of the edge of the dual, in either direction.
+
+        Returns
+        -------
+        tuple(int, int) or None
+            The identifier of the edge if it exists.
         """
-        for u, v in self.dual.face_halfedges(edge[0]):
-            if self.dual.halfedge[v][u] == edge[1]:
-                if self.dual.has_edge((u, v)):
-                    return u, v
-                return v, u
+        u, v = edge
+        return self._linked_dual_edges()['dual_edge'].get((u, v))
+
+    def _dual_view(self, name, dual, compute):
+        # a view depending on the topology of this diagram and of the dual
+        version = self._topology_version, id(dual), dual.topology_version, dual.attribute_version('_is_edge')
+        cached = self._views.get(name)
+        if cached is None or cached[0] != version:
+            cached = version, compute(dual)
+            self._views[name] = cached
+        return cached[1]
+
+    def _dual_edges(self):
+        return self._dual_view('dual_edges', self.dual, self._compute_dual_edges)
+
+    def _compute_dual_edges(self, dual):
+        # the halfedge (u, v) of the face ``a`` of the dual
+        # with the face ``b`` on the other side
+        # corresponds to the edge (a, b) of this diagram
+        dual_edges = set(dual.edges())
+        edge_dual = {}
+        for a in dual.faces():
+            for u, v in dual.face_halfedges(a):
+                b = dual.halfedge[v][u]
+                if b is None or (a, b) in edge_dual:
+                    continue
+                edge_dual[a, b] = (u, v) if (u, v) in dual_edges else (v, u)
+        return {'edge_dual': edge_dual}
+
+    def _linked_dual_edges(self):
+        # the inverse map and the pairs of corresponding edges
+        # are only computed when needed
+        links = self._dual_edges()
+        if 'pairs' not in links:
+            edge_dual = links['edge_dual']
+            dual_edge = {}
+            pairs = []
+            for edge in self.edges():
+                other = edge_dual.get(edge)
+                pairs.append((edge, other))
+                if other:
+                    dual_edge[other] = edge
+                    dual_edge[other[1], other[0]] = edge
+            links['dual_edge'] = dual_edge
+            links['pairs'] = pairs
+        return links
 
     def is_dual_edge_external(self, edge):
         """Verify if the corresponding edge in the diagram's dual is marked as "external".
@@ -262,14 +329,8 @@ class ForceDiagram(Diagram):
 
         """
         if not form:
-            return {edge: index for index, edge in enumerate(self.edges())}
-        edge_index = dict()
-        for index, (u, v) in enumerate(form.edges()):
-            f1 = form.halfedge[u][v]
-            f2 = form.halfedge[v][u]
-            edge_index[f1, f2] = index
-            # the weird side-effect of this is that edges get rotated if necessary
-        return edge_index
+            return super(ForceDiagram, self).edge_index()
+        return dict(self._form_order(form)['edge_index'])
 
     def ordered_edges(self, form):
         """"Construct a list of edges with the same order as the corresponding edges of the form diagram.
@@ -282,10 +343,63 @@ class ForceDiagram(Diagram):
         -------
         list
         """
-        edge_index = self.edge_index(form=form)
-        index_edge = {index: edge for edge, index in edge_index.items()}
-        edges = [index_edge[index] for index in range(self.number_of_edges())]
-        return edges
+        order = self._form_order(form)
+        if 'edges' not in order:
+            index_edge = {index: edge for edge, index in order['edge_index'].items()}
+            order['edges'] = [index_edge[index] for index in range(self.number_of_edges())]
+        return list(order['edges'])
+
+    def edge_permutation(self, form):
+        """Construct the permutation between the order of the edges of the diagram and of the corresponding edges of the form diagram.
+
+        Parameters
+        ----------
+        form : :class:`compas_ags.diagrams.FormDiagram`
+
+        Returns
+        -------
+        tuple
+            Two integer arrays.
+            The first contains per edge of the form diagram the index of the corresponding edge in ``self.edges()``,
+            the second contains per edge of the diagram the index of the corresponding edge in ``form.edges()``.
+
+        Notes
+        -----
+        Values per edge of the diagram are ordered as the edges of the form diagram with ``values[permutation]``,
+        and values per edge of the form diagram are ordered as the edges of the diagram with ``values[inverse]``.
+
+        The permutation is computed once per topology of both diagrams.
+        The arrays are shared between all callers and cannot be modified.
+        """
+        order = self._form_order(form)
+        if 'permutation' not in order:
+            from numpy import array
+            from numpy import empty
+
+            edges = self.ordered_edges(form)
+            index = {}
+            for i, (u, v) in enumerate(self.edges()):
+                index[u, v] = i
+                index[v, u] = i
+            permutation = array([index[edge] for edge in edges], dtype=int)
+            inverse = empty(len(permutation), dtype=int)
+            inverse[permutation] = range(len(permutation))
+            permutation.flags.writeable = False
+            inverse.flags.writeable = False
+            order['permutation'] = permutation, inverse
+        return order['permutation']
+
+    def _form_order(self, form):
+        return self._dual_view('form_order', form, self._compute_form_order)
+
+    def _compute_form_order(self, form):
+        edge_index = {}
+        for index, (u, v) in enumerate(form.edges()):
+            f1 = form.halfedge[u][v]
+            f2 = form.halfedge[v][u]
+            edge_index[f1, f2] = index
+            # the weird side-effect of this is that edges get rotated if necessary
+        return {'edge_index': edge_index}
 
     # def compute_constraints(self, form, M):
     #     r"""Computes the form diagram constraints used
@@ -2,9 +2,9 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
-from itertools import islice
-from compas.datastructures import network_find_cycles
 from compas_ags.diagrams import Diagram
+from compas_ags.diagrams import graph_remove_degree2_nodes
+from compas_ags.diagrams import graph_find_cycles
 
 
 __all__ = ['FormDiagram']
@@ -62,14 +62,15 @@ class FormDiagram(Diagram):
         Returns
         -------
         :class:`compas_ags.diagrams.FormDiagram`
+
+        Notes
+        -----
+        Nodes with two neighbors are removed from the graph (see :func:`compas_ags.diagrams.graph_remove_degree2_nodes`).
+        The faces are found with :func:`compas_ags.diagrams.graph_find_cycles`.
         """
-        for node in list(graph.nodes()):
-            if graph.degree(node) == 2:
-                graph.delete_node(node)
-        node_index = graph.node_index()
-        cycles = network_find_cycles(graph, breakpoints=graph.leaves())
-        points = graph.nodes_attributes('xyz')
-        cycles[:] = [[node_index[node] for node in cycle] for cycle in cycles]
+        graph_remove_degree2_nodes(graph)
+        cycles = graph_find_cycles(graph, breakpoints=graph.leaves(), indices=True)
+        points = [graph.node_coordinates(node) for node in graph.nodes()]
         form = cls.from_vertices_and_faces(points, cycles)
         form.edges_attribute('_is_edge', False, keys=list(form.edges_on_boundary()))
         form.edges_attribute('is_external', True, keys=form.leaf_edges())
@@ -88,16 +89,45 @@ class FormDiagram(Diagram):
         list
             The identifiers of vertices with only one connected edge.
         """
-        keys = []
-        for key in self.vertices():
-            edges = 0
-            nbrs = self.vertex_neighbors(key)
-            for nbr in nbrs:
-                if self.edge_attribute((key, nbr), '_is_edge'):
-                    edges += 1
-            if edges == 1:
-                keys.append(key)
-        return keys
+        return list(self._leaves()[0])
+
+    def leaf_set(self):
+        """The leaves of the form diagram as a set.
+
+        Returns
+        -------
+        frozenset
+            The identifiers of vertices with only one connected edge.
+        """
+        return self._leaves()[1]
+
+    def fixed_set(self):
+        """The fixed vertices of the form diagram as a set.
+
+        Returns
+        -------
+        frozenset
+            The identifiers of the fixed vertices.
+        """
+        return self._fixed()[1]
+
+    def _leaves(self):
+        return self.view('leaves', self._compute_leaves, ('_is_edge', ))
+
+    def _compute_leaves(self):
+        degree = {}
+        for u, v in self._edges()[0]:
+            degree[u] = degree.get(u, 0) + 1
+            degree[v] = degree.get(v, 0) + 1
+        leaves = [vertex for vertex in self.vertices() if degree.get(vertex) == 1]
+        return leaves, frozenset(leaves)
+
+    def _fixed(self):
+        return self.view('fixed', lambda: self._where({'is_fixed': True}), ('is_fixed', ))
+
+    def _where(self, conditions):
+        vertices = list(self.vertices_where(conditions))
+        return vertices, frozenset(vertices)
 
     # --------------------------------------------------------------------------
     # edges
@@ -116,20 +146,25 @@ class FormDiagram(Diagram):
         tuple
             If `data` is `False`, the tuple of vertices identifying the edge.
             Otherwise, a tuple with the pair of vertices and an attribute dict.
+
+        Notes
+        -----
+        The edges are identified once and cached until the diagram is modified.
         """
-        seen = set()
-        for u in self.halfedge:
-            for v in self.halfedge[u]:
-                if (u, v) in seen or (v, u) in seen:
-                    continue
-                seen.add((u, v))
-                seen.add((v, u))
-                if not self.edge_attribute((u, v), '_is_edge'):
-                    continue
-                if not data:
-                    yield u, v
-                else:
-                    yield (u, v), self.edge_attributes((u, v))
+        edges = self._edges()[0]
+        if not data:
+            return iter(edges)
+        return ((edge, self.edge_attributes(edge)) for edge in edges)
+
+    def edge_set(self):
+        """The edges of the form diagram as a set.
+
+        Returns
+        -------
+        frozenset
+            The identifiers of the edges, in the orientation in which they are returned by :meth:`edges`.
+        """
+        return self._edges()[1]
 
     def leaf_edges(self):
         """Identify the edges connecting leaf vertices to the diagram.
@@ -139,12 +174,58 @@ class FormDiagram(Diagram):
         list
             The identifiers of the edges.
         """
+        return list(self._leaf_edges()[0])
+
+    def leaf_edge_set(self):
+        """The edges connecting leaf vertices to the diagram as a set.
+
+        Returns
+        -------
+        frozenset
+            The identifiers of the edges.
+        """
+        return self._leaf_edges()[1]
+
+    def ind_set(self):
+        """The independent edges of the form diagram as a set.
+
+        Returns
+        -------
+        frozenset
+            The identifiers of the independent edges.
+        """
+        return self._ind()[1]
+
+    def _edges(self):
+        return self.view('edges', self._compute_edges, ('_is_edge', ))
+
+    def _compute_edges(self):
         edges = []
-        leaves = set(self.leaves())
-        for u, v in self.edges():
-            if u in leaves or v in leaves:
+        seen = set()
+        for u in self.halfedge:
+            for v in self.halfedge[u]:
+                if (v, u) in seen:
+                    continue
+                seen.add((u, v))
+                if not self.edge_attribute((u, v), '_is_edge'):
+                    continue
                 edges.append((u, v))
-        return edges
+        return edges, frozenset(edges)
+
+    def _leaf_edges(self):
+        return self.view('leaf_edges', self._compute_leaf_edges, ('_is_edge', ))
+
+    def _compute_leaf_edges(self):
+        leaves = self.leaf_set()
+        edges = [(u, v) for u, v in self._edges()[0] if u in leaves or v in leaves]
+        return edges, frozenset(edges)
+
+    def _ind(self):
+        return self.view('ind', self._compute_ind, ('_is_edge', 'is_ind'))
+
+    def _compute_ind(self):
+        edges = list(self.edges_where({'is_ind': True}))
+        return edges, frozenset(edges)
 
     def edge_forcedensity(self, edge, q=None):
         """Get or set the forcedensity in an edge.
@@ -165,7 +246,7 @@ class FormDiagram(Diagram):
             Otherwise, nothing.
         """
         if type(edge) is int:
-            edge = next(islice(self.edges(), edge, None))
+            edge = self._edges()[0][edge]
         if q is None:
             return self.edge_attribute(edge, 'q')
         self.edge_attribute(edge, 'q', q)
@@ -189,7 +270,7 @@ class FormDiagram(Diagram):
             Otherwise, nothing.
         """
         if type(edge) is int:
-            edge = next(islice(self.edges(), edge, None))
+            edge = self._edges()[0][edge]
         length = self.edge_length(*edge)
         q = self.edge_attribute(edge, 'q')
         if force is None:
@@ -197,6 +278,98 @@ class FormDiagram(Diagram):
         self.edge_attribute(edge, 'is_ind', True)
         self.edge_attribute(edge, 'q', force / length)
 
+    # --------------------------------------------------------------------------
+    # Arrays
+    # --------------------------------------------------------------------------
+
+    def _edge_keys(self):
+        return self.view('edge_keys', lambda: ["-".join(map(str, sorted(edge))) for edge in self._edges()[0]], ('_is_edge', ))
+
+    def _edge_column(self, name):
+        columns = self.columns
+        if columns is None or name not in columns.edge or columns.edges != self._edges()[0]:
+            return None
+        return columns.edge[name]
+
+    def edges_array(self, name, dtype=float):
+        """Get the values of an attribute of all edges as an array.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+        dtype : type, optional
+            The type of the values of the array.
+            Default is ``float``.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The values of the attribute, in the order of :meth:`edges`.
+            If the attribute is stored in an attached column (see :meth:`attach_columns`),
+            the column itself is returned, without copying the values.
+
+        """
+        from numpy import array
+
+        column = self._edge_column(name)
+        if column is not None:
+            return column.astype(dtype, copy=False)
+        default = self.default_edge_attributes.get(name)
+        edgedata = self.edgedata
+        values = []
+        for key in self._edge_keys():
+            attr = edgedata.get(key)
+            values.append(attr.get(name, default) if attr else default)
+        return array(values, dtype=dtype)
+
+    def edges_array_update(self, name, values, mask=None):
+        """Set the values of an attribute of all edges, or of a selection of edges, from an array.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+        values : array-like
+            One value per edge, in the order of :meth:`edges`.
+        mask : array-like, optional
+            The selection of edges that is updated,
+            as one boolean per edge, or as a list of edge indices.
+            By default, all edges are updated.
+
+        Returns
+        -------
+        None
+
+        """
+        from numpy import asarray
+        from numpy import flatnonzero
+
+        column = self._edge_column(name)
+        if column is not None:
+            values = asarray(values).ravel()
+            if mask is None:
+                column[:] = values
+            else:
+                mask = asarray(mask)
+                column[mask] = values[mask]
+            self._modified((name, ))
+            return
+        values = asarray(values).ravel().tolist()
+        keys = self._edge_keys()
+        if mask is None:
+            indices = range(len(keys))
+        else:
+            mask = asarray(mask)
+            indices = flatnonzero(mask).tolist() if mask.dtype == bool else mask.ravel().tolist()
+        edgedata = self.edgedata
+        for index in indices:
+            key = keys[index]
+            if key not in edgedata:
+                edgedata[key] = {}
+            edgedata[key][name] = values[index]
+        self._modified((name, ))
+
     # --------------------------------------------------------------------------
     # Convenience functions for retrieving the attributes of the formdiagram.
     # --------------------------------------------------------------------------
@@ -208,13 +381,13 @@ class FormDiagram(Diagram):
         return self.vertices_attributes('xy')
 
     def fixed(self):
-        return list(self.vertices_where({'is_fixed': True}))
+        return list(self._fixed()[0])
 
     def fixed_x(self):
-        return list(self.vertices_where({'is_fixed_x': True, 'is_fixed': False}))
+        return list(self.view('fixed_x', lambda: self._where({'is_fixed_x': True, 'is_fixed': False}), ('is_fixed', 'is_fixed_x'))[0])
 
     def fixed_y(self):
-        return list(self.vertices_where({'is_fixed_y': True, 'is_fixed': False}))
+        return list(self.view('fixed_y', lambda: self._where({'is_fixed_y': True, 'is_fixed': False}), ('is_fixed', 'is_fixed_y'))[0])
 
     def constrained(self):
         return [key for key, attr in self.vertices(True) if attr['cx'] or attr['cy']]
@@ -225,7 +398,7 @@ class FormDiagram(Diagram):
         return cx, cy
 
     def ind(self):
-        return list(self.edges_where({'is_ind': True}))
+        return list(self._ind()[0])
 
     # --------------------------------------------------------------------------
     # Identify features of the formdiagram based on geometrical inputs.
@@ -246,8 +419,8 @@ class FormDiagram(Diagram):
         None
             The FormDiagram is modified in place.
         """
-        fixed = self.fixed()
-        leaves = self.leaves()
+        fixed = self.fixed_set()
+        leaves = self.leaf_set()
         for edge in self.leaf_edges():
             if edge[0] in fixed or edge[1] in fixed:
                 continue
@@ -4,7 +4,9 @@ from __future__ import division
 
 import compas
 from compas.datastructures import Network
-from compas.datastructures import network_is_crossed
+
+from compas_ags.diagrams import graph_find_crossings
+from compas_ags.diagrams import graph_is_planar
 
 
 __all__ = ['FormGraph']
@@ -15,8 +17,65 @@ class FormGraph(Network):
     """
 
     def __init__(self):
+        self._topology_version = 0
+        self._views = {}
         super(FormGraph, self).__init__()
 
+    @property
+    def data(self):
+        """dict: A data dict representing the graph for serialisation."""
+        return super(FormGraph, self).data
+
+    @data.setter
+    def data(self, data):
+        Network.data.fset(self, data)
+        self.invalidate()
+
+    @property
+    def topology_version(self):
+        """The modification counter of the topology of the graph."""
+        return self._topology_version
+
+    def invalidate(self):
+        """Mark the topology of the graph as modified, such that all cached results are recomputed."""
+        self._topology_version += 1
+
+    def _view(self, name, compute):
+        # a result that is only recomputed after the topology was modified
+        cached = self._views.get(name)
+        if cached is None or cached[0] != self._topology_version:
+            cached = self._topology_version, compute()
+            self._views[name] = cached
+        return cached[1]
+
+    # --------------------------------------------------------------------------
+    # Modifications
+    # --------------------------------------------------------------------------
+
+    def clear(self):
+        self.invalidate()
+        super(FormGraph, self).clear()
+
+    def add_node(self, key=None, attr_dict=None, **kwattr):
+        self.invalidate()
+        return super(FormGraph, self).add_node(key, attr_dict, **kwattr)
+
+    def add_edge(self, u, v, attr_dict=None, **kwattr):
+        self.invalidate()
+        return super(FormGraph, self).add_edge(u, v, attr_dict, **kwattr)
+
+    def delete_node(self, key):
+        self.invalidate()
+        super(FormGraph, self).delete_node(key)
+
+    def delete_edge(self, u, v):
+        self.invalidate()
+        super(FormGraph, self).delete_edge(u, v)
+
+    # --------------------------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------------------------
+
     def node_index(self):
         return {node: index for index, node in enumerate(self.nodes())}
 
@@ -43,22 +102,34 @@ class FormGraph(Network):
         Returns
         -------
         bool
+
+        Notes
+        -----
+        The graph is tested in process with :func:`graph_is_planar`, also in Rhino.
+        The result is cached until the topology of the graph is modified,
+        such that repeated verification of an unchanged graph is free.
         """
-        if compas.IPY:
-            from compas.rpc import Proxy
-            planarity = Proxy('planarity')
-        else:
-            import planarity
-        return planarity.is_planar(list(self.edges()))
+        return self._view('planar', lambda: graph_is_planar(self))
 
-    def is_crossed(self):
+    def is_crossed(self, pairs=False):
         """Verify that the current embedding of the graph has crossing edges.
 
+        Parameters
+        ----------
+        pairs : bool, optional
+            If True, return the pairs of crossing edges instead.
+            Default is ``False``.
+
         Returns
         -------
-        bool
+        bool or list
+            True if at least one pair of edges crosses.
+            If ``pairs`` is True, the pairs of crossing edges (see :func:`graph_find_crossings`),
+            for example to highlight them.
         """
-        return network_is_crossed(self)
+        if pairs:
+            return graph_find_crossings(self)
+        return bool(graph_find_crossings(self, first=True))
 
     def is_planar_embedding(self):
         """Verify that the current embedding of the graph is planar."""
@@ -0,0 +1,320 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+
+__all__ = ['graph_is_planar']
+
+
+def graph_is_planar(graph):
+    """Verify that a graph has a planar embedding.
+
+    Parameters
+    ----------
+    graph : :class:`compas_ags.diagrams.FormGraph`
+        The graph.
+        Any object with an ``edges`` method, such as a diagram, can be used.
+
+    Returns
+    -------
+    bool
+        True if the graph can be drawn in the plane without crossing edges.
+
+    Notes
+    -----
+    The graph is tested with the left-right planarity test of Brandes [1]_,
+    which runs in linear time in the number of edges and is implemented in pure Python,
+    such that the test does not require the ``planarity`` package nor a call through :mod:`compas.rpc` in Rhino.
+    The orientation of the edges, self-loops, and duplicate edges are ignored,
+    and nodes without edges do not affect the result.
+
+    Both depth-first searches of the test are iterative,
+    such that the size of the graph is not limited by the recursion limit of the interpreter.
+
+    References
+    ----------
+    .. [1] Brandes, U. *The Left-Right Planarity Test*, 2009.
+           Available at: https://citeseerx.ist.psu.edu/viewdoc/summary?doi=10.1.1.217.9208
+
+    Examples
+    --------
+    >>> from compas_ags.diagrams import FormGraph
+    >>> k4 = FormGraph.from_lines([[[0, 0, 0], [1, 0, 0]], [[1, 0, 0], [0, 1, 0]], [[0, 1, 0], [0, 0, 0]],
+    ...                            [[0, 0, 0], [1, 1, 0]], [[1, 0, 0], [1, 1, 0]], [[0, 1, 0], [1, 1, 0]]])
+    >>> graph_is_planar(k4)
+    True
+
+    """
+    return _LRPlanarity(graph.edges()).is_planar()
+
+
+# ==============================================================================
+# Left-right planarity
+# ==============================================================================
+
+
+class _Interval(object):
+    # an interval of return edges, from its lowest to its highest edge
+
+    __slots__ = ('low', 'high')
+
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def empty(self):
+        return self.low is None and self.high is None
+
+    def copy(self):
+        return _Interval(self.low, self.high)
+
+    def conflicting(self, edge, lowpt):
+        return not self.empty() and lowpt[self.high] > lowpt[edge]
+
+
+class _ConflictPair(object):
+    # a pair of intervals of return edges that have to be on different sides
+
+    __slots__ = ('left', 'right')
+
+    def __init__(self, left=None, right=None):
+        self.left = left or _Interval()
+        self.right = right or _Interval()
+
+    def swap(self):
+        self.left, self.right = self.right, self.left
+
+    def lowest(self, lowpt):
+        if self.left.empty():
+            return lowpt[self.right.low]
+        if self.right.empty():
+            return lowpt[self.left.low]
+        return min(lowpt[self.left.low], lowpt[self.right.low])
+
+
+class _LRPlanarity(object):
+    # the state of the left-right planarity test of a graph
+    # the nodes are numbered, and edges are pairs of node numbers oriented by the first depth-first search
+
+    def __init__(self, edges):
+        index = {}
+        adjacency = []
+        seen = set()
+        for u, v in edges:
+            if u == v:
+                continue
+            for node in (u, v):
+                if node not in index:
+                    index[node] = len(adjacency)
+                    adjacency.append([])
+            i, j = index[u], index[v]
+            if (i, j) in seen:
+                continue
+            seen.add((i, j))
+            seen.add((j, i))
+            adjacency[i].append(j)
+            adjacency[j].append(i)
+        self.n = len(adjacency)
+        self.m = len(seen) // 2
+        self.adjacency = adjacency
+
+        self.height = [None] * self.n
+        self.parent_edge = [None] * self.n
+        self.oriented = [[] for _ in range(self.n)]
+        self.lowpt = {}
+        self.lowpt2 = {}
+        self.nesting_depth = {}
+
+        self.ref = {}
+        self.lowpt_edge = {}
+        self.stack_bottom = {}
+        self.S = []
+
+    def is_planar(self):
+        if self.n > 2 and self.m > 3 * self.n - 6:
+            return False
+        roots = []
+        for v in range(self.n):
+            if self.height[v] is None:
+                self.height[v] = 0
+                roots.append(v)
+                self.orient(v)
+        nesting_depth = self.nesting_depth
+        self.ordered = [sorted(nbrs, key=lambda w: nesting_depth[v, w]) for v, nbrs in enumerate(self.oriented)]
+        for v in roots:
+            if not self.test(v):
+                return False
+        return True
+
+    def orient(self, root):
+        # orient the edges with a depth-first search and compute the lowpoints and the nesting depths
+        adjacency = self.adjacency
+        height = self.height
+        parent_edge = self.parent_edge
+        lowpt = self.lowpt
+        lowpt2 = self.lowpt2
+        nesting_depth = self.nesting_depth
+        index = [0] * self.n
+        resumed = set()
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            e = parent_edge[v]
+            nbrs = adjacency[v]
+            while index[v] < len(nbrs):
+                w = nbrs[index[v]]
+                vw = v, w
+                if vw not in resumed:
+                    if vw in lowpt or (w, v) in lowpt:
+                        # already oriented
+                        index[v] += 1
+                        continue
+                    self.oriented[v].append(w)
+                    lowpt[vw] = height[v]
+                    lowpt2[vw] = height[v]
+                    if height[w] is None:
+                        # tree edge: visit w and continue with v afterwards
+                        parent_edge[w] = vw
+                        height[w] = height[v] + 1
+                        stack.append(v)
+                        stack.append(w)
+                        resumed.add(vw)
+                        break
+                    # back edge
+                    lowpt[vw] = height[w]
+                # the nesting depth of the edge
+                nesting_depth[vw] = 2 * lowpt[vw]
+                if lowpt2[vw] < height[v]:
+                    nesting_depth[vw] += 1
+                # update the lowpoints of the parent edge
+                if e is not None:
+                    if lowpt[vw] < lowpt[e]:
+                        lowpt2[e] = min(lowpt[e], lowpt2[vw])
+                        lowpt[e] = lowpt[vw]
+                    elif lowpt[vw] > lowpt[e]:
+                        lowpt2[e] = min(lowpt2[e], lowpt[vw])
+                    else:
+                        lowpt2[e] = min(lowpt2[e], lowpt2[vw])
+                index[v] += 1
+
+    def test(self, root):
+        # test the constraints on the sides of the return edges with a second depth-first search
+        ordered = self.ordered
+        height = self.height
+        parent_edge = self.parent_edge
+        lowpt = self.lowpt
+        lowpt_edge = self.lowpt_edge
+        S = self.S
+        index = [0] * self.n
+        resumed = set()
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            e = parent_edge[v]
+            descended = False
+            nbrs = ordered[v]
+            while index[v] < len(nbrs):
+                w = nbrs[index[v]]
+                ei = v, w
+                if ei not in resumed:
+                    self.stack_bottom[ei] = S[-1] if S else None
+                    if ei == parent_edge[w]:
+                        # tree edge: visit w and continue with v afterwards
+                        stack.append(v)
+                        stack.append(w)
+                        resumed.add(ei)
+                        descended = True
+                        break
+                    # back edge
+                    lowpt_edge[ei] = ei
+                    S.append(_ConflictPair(right=_Interval(ei, ei)))
+                # integrate the return edges of ei
+                if lowpt[ei] < height[v]:
+                    if w == nbrs[0]:
+                        lowpt_edge[e] = lowpt_edge[ei]
+                    elif not self.add_constraints(ei, e):
+                        return False
+                index[v] += 1
+            if not descended and e is not None:
+                self.remove_back_edges(e)
+        return True
+
+    def add_constraints(self, ei, e):
+        lowpt = self.lowpt
+        ref = self.ref
+        S = self.S
+        P = _ConflictPair()
+        # merge the return edges of ei into the right interval of P
+        while True:
+            Q = S.pop()
+            if not Q.left.empty():
+                Q.swap()
+            if not Q.left.empty():
+                return False
+            if lowpt[Q.right.low] > lowpt[e]:
+                if P.right.empty():
+                    P.right = Q.right.copy()
+                else:
+                    ref[P.right.low] = Q.right.high
+                P.right.low = Q.right.low
+            else:
+                ref[Q.right.low] = self.lowpt_edge[e]
+            if (S[-1] if S else None) is self.stack_bottom[ei]:
+                break
+        # merge the conflicting return edges of the previous edges into the left interval of P
+        while S and (S[-1].left.conflicting(ei, lowpt) or S[-1].right.conflicting(ei, lowpt)):
+            Q = S.pop()
+            if Q.right.conflicting(ei, lowpt):
+                Q.swap()
+            if Q.right.conflicting(ei, lowpt):
+                return False
+            ref[P.right.low] = Q.right.high
+            if Q.right.low is not None:
+                P.right.low = Q.right.low
+            if P.left.empty():
+                P.left = Q.left.copy()
+            else:
+                ref[P.left.low] = Q.left.high
+            P.left.low = Q.left.low
+        if not (P.left.empty() and P.right.empty()):
+            S.append(P)
+        return True
+
+    def remove_back_edges(self, e):
+        lowpt = self.lowpt
+        ref = self.ref
+        S = self.S
+        u = e[0]
+        # drop the conflict pairs of which all return edges end at u
+        while S and S[-1].lowest(lowpt) == self.height[u]:
+            S.pop()
+        if S:
+            # trim the return edges ending at u from the intervals of the next pair
+            P = S.pop()
+            while P.left.high is not None and P.left.high[1] == u:
+                P.left.high = ref.get(P.left.high)
+            if P.left.high is None and P.left.low is not None:
+                ref[P.left.low] = P.right.low
+                P.left.low = None
+            while P.right.high is not None and P.right.high[1] == u:
+                P.right.high = ref.get(P.right.high)
+            if P.right.high is None and P.right.low is not None:
+                ref[P.right.low] = P.left.low
+                P.right.low = None
+            S.append(P)
+        # the reference of e is a highest return edge
+        if lowpt[e] < self.height[u] and S:
+            hl = S[-1].left.high
+            hr = S[-1].right.high
+            if hl is not None and (hr is None or lowpt[hl] > lowpt[hr]):
+                ref[e] = hl
+            else:
+                ref[e] = hr
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,221 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+
+__all__ = ['CompactTopology']
+
+
+class CompactTopology(object):
+    """Read-only array representation of the topology of a diagram.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+
+    Attributes
+    ----------
+    vertices : list
+        The identifiers of the vertices, in the order of their indices.
+    faces : list
+        The identifiers of the faces, in the order of their indices.
+    vertex_offsets : :class:`numpy.ndarray`
+        Per vertex, the offset of its halfedges in the halfedge arrays.
+        The halfedges starting at vertex ``i`` are ``vertex_offsets[i]`` to ``vertex_offsets[i + 1] - 1``.
+    halfedge_start : :class:`numpy.ndarray`
+        Per halfedge, the index of its start vertex.
+    halfedge_end : :class:`numpy.ndarray`
+        Per halfedge, the index of its end vertex.
+    halfedge_face : :class:`numpy.ndarray`
+        Per halfedge, the index of its face, or ``-1`` if it is on the boundary.
+    halfedge_twin : :class:`numpy.ndarray`
+        Per halfedge, the index of the halfedge in the opposite direction.
+    face_offsets : :class:`numpy.ndarray`
+        Per face, the offset of its vertices in ``face_vertices``.
+    face_vertices : :class:`numpy.ndarray`
+        The indices of the vertices of all faces.
+    edge_vertices : :class:`numpy.ndarray`
+        Per edge of the diagram, in the order of ``diagram.edges()``, the indices of its vertices.
+    edge_halfedge : :class:`numpy.ndarray`
+        Per edge, the index of the halfedge in the direction of the edge.
+
+    Notes
+    -----
+    The adjacency of the vertices is stored in compressed sparse row format:
+    halfedges are numbered per start vertex, in the order of the adjacency dicts of the diagram,
+    such that the neighbors of a vertex and the faces of its halfedges are contiguous slices.
+
+    The arrays are built once from the dicts of the diagram (see :meth:`compas_ags.diagrams.Diagram.topology`),
+    after which matrices and queries do not require any Python loops over the elements of the diagram.
+
+    """
+
+    def __init__(self, diagram):
+        from numpy import array
+        from numpy import cumsum
+
+        halfedge = diagram.halfedge
+        self.vertices = list(diagram.vertices())
+        self.faces = list(diagram.faces())
+        self.vertex_index = vertex_index = {vertex: index for index, vertex in enumerate(self.vertices)}
+        self.face_index = face_index = {face: index for index, face in enumerate(self.faces)}
+
+        degrees = [len(halfedge[vertex]) for vertex in self.vertices]
+        offsets = [0] + degrees
+        self.vertex_offsets = cumsum(offsets).astype(int)
+
+        start = []
+        end = []
+        face = []
+        pairs = []
+        slot = {}
+        for u in self.vertices:
+            i = vertex_index[u]
+            for v, f in halfedge[u].items():
+                slot[u, v] = len(start)
+                pairs.append((u, v))
+                start.append(i)
+                end.append(vertex_index[v])
+                face.append(-1 if f is None else face_index[f])
+        self.halfedge_start = array(start, dtype=int)
+        self.halfedge_end = array(end, dtype=int)
+        self.halfedge_face = array(face, dtype=int)
+        self.halfedge_twin = array([slot[v, u] for u, v in pairs], dtype=int)
+
+        fvertices = [diagram.face_vertices(f) for f in self.faces]
+        self.face_offsets = cumsum([0] + [len(vertices) for vertices in fvertices]).astype(int)
+        self.face_vertices = array([vertex_index[vertex] for vertices in fvertices for vertex in vertices], dtype=int)
+
+        self._edges = list(diagram.edges())
+        self.edge_vertices = array([(vertex_index[u], vertex_index[v]) for u, v in self._edges], dtype=int).reshape((-1, 2))
+        self.edge_halfedge = array([slot[edge] for edge in self._edges], dtype=int)
+
+    # --------------------------------------------------------------------------
+    # Read-only mesh interface
+    # --------------------------------------------------------------------------
+
+    def vertex_neighbors(self, key):
+        """The neighbors of a vertex, in the order of the adjacency of the diagram.
+
+        Parameters
+        ----------
+        key : int
+            The identifier of the vertex.
+
+        Returns
+        -------
+        list
+            The identifiers of the neighbors.
+        """
+        i = self.vertex_index[key]
+        a, b = self.vertex_offsets[i], self.vertex_offsets[i + 1]
+        return [self.vertices[j] for j in self.halfedge_end[a:b].tolist()]
+
+    def face_vertices_of(self, key):
+        """The vertices of a face.
+
+        Parameters
+        ----------
+        key : int
+            The identifier of the face.
+
+        Returns
+        -------
+        list
+            The identifiers of the vertices.
+        """
+        i = self.face_index[key]
+        a, b = self.face_offsets[i], self.face_offsets[i + 1]
+        return [self.vertices[j] for j in self.face_vertices[a:b].tolist()]
+
+    def face_halfedges(self, key):
+        """The halfedges of a face.
+
+        Parameters
+        ----------
+        key : int
+            The identifier of the face.
+
+        Returns
+        -------
+        list
+            The halfedges as pairs of vertex identifiers.
+        """
+        vertices = self.face_vertices_of(key)
+        return list(zip(vertices, vertices[1:] + vertices[:1]))
+
+    def edges(self):
+        """The edges of the diagram.
+
+        Returns
+        -------
+        list
+            The edges as pairs of vertex identifiers, in the order of ``diagram.edges()``.
+        """
+        return list(self._edges)
+
+    # --------------------------------------------------------------------------
+    # Matrices
+    # --------------------------------------------------------------------------
+
+    def connectivity_matrix(self, rtype='csr'):
+        """The connectivity matrix of the edges of the diagram.
+
+        Parameters
+        ----------
+        rtype : {'csr', 'csc', 'coo', 'array'}, optional
+            The format of the matrix.
+            Default is ``'csr'``.
+
+        Returns
+        -------
+        sparse matrix or :class:`numpy.ndarray`
+            The matrix with one row per edge and one column per vertex,
+            with ``-1`` in the column of the start vertex and ``+1`` in the column of the end vertex of every edge,
+            as :func:`compas.numerical.connectivity_matrix`.
+        """
+        from numpy import arange
+        from numpy import concatenate
+        from numpy import ones
+        from scipy.sparse import coo_matrix
+
+        m = len(self.edge_vertices)
+        rows = concatenate((arange(m), arange(m)))
+        cols = concatenate((self.edge_vertices[:, 0], self.edge_vertices[:, 1]))
+        data = concatenate((- ones(m), ones(m)))
+        C = coo_matrix((data, (rows, cols)), shape=(m, len(self.vertices)))
+        if rtype == 'array':
+            return C.toarray()
+        return C.asformat(rtype)
+
+    def adjacency_matrix(self, rtype='csr'):
+        """The adjacency matrix of the vertices of the diagram, based on all its halfedges.
+
+        Parameters
+        ----------
+        rtype : {'csr', 'csc', 'coo', 'array'}, optional
+            The format of the matrix.
+            Default is ``'csr'``.
+
+        Returns
+        -------
+        sparse matrix or :class:`numpy.ndarray`
+            The square matrix with a ``1`` for every pair of neighboring vertices.
+        """
+        from numpy import ones
+        from scipy.sparse import csr_matrix
+
+        n = len(self.vertices)
+        A = csr_matrix((ones(len(self.halfedge_end)), self.halfedge_end, self.vertex_offsets), shape=(n, n))
+        if rtype == 'array':
+            return A.toarray()
+        return A.asformat(rtype)
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -28,6 +28,17 @@ Objects
     ForceObject
 
 
+Conduits
+========
+
+.. autosummary::
+    :toctree: generated/
+    :nosignatures:
+
+    DiagramConduit
+    LabelConduit
+
+
 Scene
 =====
 
@@ -37,6 +48,17 @@ Scene
 
     Scene
 
+
+Updates
+=======
+
+.. autosummary::
+    :toctree: generated/
+    :nosignatures:
+
+    ReciprocalPreview
+    AutoUpdateScheduler
+
 """
 from __future__ import absolute_import
 
@@ -51,9 +73,14 @@ from .diagramobject import DiagramObject  # noqa: F401
 from .formobject import FormObject  # noqa: F401
 from .forceobject import ForceObject  # noqa: F401
 
+from .diagramconduit import DiagramConduit  # noqa: F401
+from .diagramconduit import LabelConduit  # noqa: F401
+
 from .forceinspector import ForceDiagramInspector  # noqa: F401
 
 from .scene import Scene  # noqa: F401
+from .preview import ReciprocalPreview  # noqa: F401
+from .scheduler import AutoUpdateScheduler  # noqa: F401
 from .settings import SettingsForm  # noqa: F401
 from .attributesform import AttributesForm  # noqa: F401
 
@@ -10,6 +10,8 @@ import Eto.Drawing as drawing
 import Eto.Forms as forms
 import Rhino
 
+from compas_ags.rhino.forceobject import ForceObject
+
 find_object = sc.doc.Objects.Find
 
 
@@ -20,6 +22,83 @@ def get_scene():
     return sc.sticky['AGS']['scene']
 
 
+class TableStore(forms.ITreeGridStore[forms.ITreeGridItem]):
+    """Virtual data store of a table, creating the items of rows only when they are shown.
+
+    Parameters
+    ----------
+    keys : list
+        The key of the element of every row.
+    rows : list
+        The values of every row, with their original types.
+    children : list, optional
+        The values of the child rows of every row.
+    display : callable, optional
+        A function converting a value to the value shown in its cell.
+
+    Notes
+    -----
+    The grid only requests the items of the rows that are visible,
+    and the items are cached until the order of the rows changes.
+    Sorting uses the original values, without converting the contents of the cells.
+    The index of a row is stored in the ``Tag`` of its item.
+    """
+
+    def __init__(self, keys, rows, children=None, display=None):
+        self.keys = keys
+        self.rows = rows
+        self.children = children
+        self.display = display or (lambda value: value)
+        self.order = list(range(len(rows)))
+        self._items = {}
+
+    @property
+    def Count(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        item = self._items.get(index)
+        if item is None:
+            row = self.order[index]
+            item = forms.TreeGridItem(Values=tuple(self.display(value) for value in self.rows[row]))
+            item.Tag = row
+            if self.children:
+                for values in self.children[row]:
+                    item.Children.Add(forms.TreeGridItem(Values=values))
+            self._items[index] = item
+        return item
+
+    def key(self, item):
+        """The key of the element of an item, or None for child items."""
+        if item.Tag is None:
+            return None
+        return self.keys[item.Tag]
+
+    def update(self, item, column, value):
+        """Update the value of a cell of a row."""
+        row = list(self.rows[item.Tag])
+        row[column] = value
+        self.rows[item.Tag] = tuple(row)
+
+    def sort(self, column, reverse=False):
+        """Sort the rows by the values in a column."""
+        rows = self.rows
+        self.order.sort(key=lambda row: (rows[row][column] is None, rows[row][column]), reverse=reverse)
+        self._items = {}
+
+
+def display_rounded(value):
+    if isinstance(value, float):
+        return float("%.4g" % (value))
+    return value
+
+
+def display_text(value):
+    if isinstance(value, bool):
+        return value
+    return str(value)
+
+
 class Tree_Table(forms.TreeGridView):
     def __init__(self, ShowHeader=True, sceneNode=None, table_type=None):
         self.ShowHeader = ShowHeader
@@ -41,7 +120,7 @@ class Tree_Table(forms.TreeGridView):
             general_setting_key = "color.%s" % table_type
 
             if getattr(sceneNode.diagram, table_type):
-                color.update({str(key): settings.get(general_setting_key) for key in getattr(sceneNode.diagram, table_type)()})
+                color.update({key: settings.get(general_setting_key) for key in getattr(sceneNode.diagram, table_type)()})
 
             # gather and update subsettings
             for full_setting_key in settings:
@@ -49,17 +128,17 @@ class Tree_Table(forms.TreeGridView):
                 if len(sub_setting_str) > 1 and sub_setting_str[0] == general_setting_key:
                     sub_setting_key = sub_setting_str[-1]
                     items_where = getattr(sceneNode.diagram, '%s_where' % table_type)
-                    color.update({str(key): settings.get(full_setting_key) for key in items_where({sub_setting_key: True})})
-                    color.update({str(key): settings.get(full_setting_key) for key in items_where({'_'+sub_setting_key: True})})  # including read-only ones
-                    color.update({str(key): settings.get("color.edges:is_ind") for key in items_where({"is_ind": True})})  # overwrite is_ind lastly
+                    color.update({key: settings.get(full_setting_key) for key in items_where({sub_setting_key: True})})
+                    color.update({key: settings.get(full_setting_key) for key in items_where({'_'+sub_setting_key: True})})  # including read-only ones
+                    color.update({key: settings.get("color.edges:is_ind") for key in items_where({"is_ind": True})})  # overwrite is_ind lastly
 
             # Additional settings for AGS
             tol = 0.001
             for edge in sceneNode.diagram.edges_where({'is_external': False}):
                 if sceneNode.diagram.edge_attribute(edge, 'f') > + tol:
-                    color[str(edge)] = settings['color.tension']
+                    color[edge] = settings['color.tension']
                 if sceneNode.diagram.edge_attribute(edge, 'f') < - tol:
-                    color[str(edge)] = settings['color.compression']
+                    color[edge] = settings['color.compression']
 
         def OnCellFormatting(sender, e):
             try:
@@ -69,7 +148,7 @@ class Tree_Table(forms.TreeGridView):
                 #     e.ForegroundColor = drawing.Colors.DarkGray
 
                 if attr == 'EdgeLabel':
-                    key = e.Item.Values[1]
+                    key = self.DataStore.key(e.Item)
                     if key in color:
                         rgb = color[key]
                         rgb = [c/255. for c in rgb]
@@ -98,24 +177,15 @@ class Tree_Table(forms.TreeGridView):
             attr = attr.replace("_", "-")
             table.add_column(attr, Editable=False, checkbox=checkbox)
 
-        treecollection = forms.TreeGridItemCollection()
-        for index, edge in enumerate(datastructure.edges()):
+        keys = list(datastructure.edges())
+        rows = []
+        for index, edge in enumerate(keys):
             values = [index, str(edge)]
+            values += datastructure.edge_attributes(edge, attributes)
+            rows.append(tuple(values))
 
-            for attr in attributes:
-                value = datastructure.edge_attribute(edge, attr)
-                if isinstance(value, float):
-                    value = float("%.4g" % (value))
-                values.append(value)
-
-            edge_item = forms.TreeGridItem(Values=tuple(values))
-            treecollection.Add(edge_item)
-            # for key in edge:
-            #     vertex_item = forms.TreeGridItem(Values=(str(key),))
-            #     edge_item.Children.Add(vertex_item)
-
-        table.DataStore = treecollection
-        table.Activated += table.SelectEvent(sceneNode, 'guid_edge', dual=dual)
+        table.DataStore = TableStore(keys, rows, display=display_rounded)
+        table.Activated += table.SelectEvent(sceneNode, 'edge', dual=dual)
         table.ColumnHeaderClick += table.HeaderClickEvent()
         table.CellEdited += table.EditEvent()
         return table
@@ -133,14 +203,10 @@ class Tree_Table(forms.TreeGridView):
             if not editable:
                 attr = attr[1:]
             table.add_column(attr, Editable=editable, checkbox=checkbox)
-        treecollection = forms.TreeGridItemCollection()
-        for key in datastructure.vertices():
-            values = [str(key)]
-            for attr in attributes:
-                values.append(str(datastructure.vertex_attribute(key, attr)))
-            treecollection.Add(forms.TreeGridItem(Values=tuple(values)))
-        table.DataStore = treecollection
-        table.Activated += table.SelectEvent(sceneNode, 'guid_vertex')
+        keys = list(datastructure.vertices())
+        rows = [tuple([key] + datastructure.vertex_attributes(key, attributes)) for key in keys]
+        table.DataStore = TableStore(keys, rows, display=display_text)
+        table.Activated += table.SelectEvent(sceneNode, 'vertex')
         table.ColumnHeaderClick += table.HeaderClickEvent()
         table.CellEdited += table.EditEvent()
         return table
@@ -160,18 +226,11 @@ class Tree_Table(forms.TreeGridView):
                 attr = attr[1:]
             table.add_column(attr, Editable=editable, checkbox=checkbox)
 
-        treecollection = forms.TreeGridItemCollection()
-        for key, edge in enumerate(datastructure.edges()):
-            values = [str(edge)]
-            for attr in attributes:
-                values.append(datastructure.edge_attribute(edge, attr))
-            edge_item = forms.TreeGridItem(Values=tuple(values))
-            treecollection.Add(edge_item)
-            for key in edge:
-                vertex_item = forms.TreeGridItem(Values=(str(key),))
-                edge_item.Children.Add(vertex_item)
-        table.DataStore = treecollection
-        table.Activated += table.SelectEvent(sceneNode, 'guid_edge', 'guid_vertex')
+        keys = list(datastructure.edges())
+        rows = [tuple([str(edge)] + datastructure.edge_attributes(edge, attributes)) for edge in keys]
+        children = [[(str(key),) for key in edge] for edge in keys]
+        table.DataStore = TableStore(keys, rows, children=children, display=display_text)
+        table.Activated += table.SelectEvent(sceneNode, 'edge')
         table.ColumnHeaderClick += table.HeaderClickEvent()
         table.CellEdited += table.EditEvent()
         return table
@@ -189,36 +248,30 @@ class Tree_Table(forms.TreeGridView):
 
         return sorted_attributes
 
-    def SelectEvent(self, sceneNode, guid_field, children_guid_field=None, dual=None):
+    def SelectEvent(self, sceneNode, element, dual=None):
+        # the edges of the dual diagram, in the order of the rows
+        dual_edges = {}
+        if dual:
+            for edge, index in dual.diagram.edge_index(dual.diagram.dual).items():
+                dual_edges[index] = edge
+
         def on_selected(sender, event):
             try:
                 rs.UnselectAllObjects()
-                key = event.Item.Values[1]
-                guid2key = getattr(sceneNode, guid_field)
-                key2guid = {str(guid2key[guid]): guid for guid in guid2key}
-                if key in key2guid:
-                    find_object(key2guid[key]).Select(True)
+                key = self.DataStore.key(event.Item)
+                key_guid = sceneNode.element_guid(element)
+                if key in key_guid:
+                    find_object(key_guid[key]).Select(True)
 
                 if dual:
-                    force_edge_index = int(event.Item.Values[0])
-                    force_edge_key2index = dual.diagram.edge_index(dual.diagram.dual)
-                    force_edge_index2key = {force_edge_key2index[key]: key for key in force_edge_key2index}
-                    force_edge_key = force_edge_index2key[force_edge_index]
-
-                    guid2key = getattr(dual, guid_field)
-                    key2guid = {guid2key[guid]: guid for guid in guid2key}
-                    key2guid.update({(v, u): key2guid[(u, v)] for u, v in key2guid})
-                    if force_edge_key in key2guid:
-                        find_object(key2guid[force_edge_key]).Select(True)
-
-                # elif children_guid_field:
-                #     if key == '':
-                #         key = event.Item.Values[1]
-                #     guid2key = getattr(sceneNode.artist, children_guid_field)
-                #     key2guid = {str(guid2key[guid]): guid for guid in guid2key}
-                #     find_object(key2guid[key]).Select(True)
-
-                # print('selected', key, key2guid[key])
+                    edge = dual_edges.get(event.Item.Tag)
+                    key_guid = dual.element_guid(element)
+                    guid = key_guid.get(edge) if edge else None
+                    if not guid and edge:
+                        guid = key_guid.get((edge[1], edge[0]))
+                    if guid:
+                        find_object(guid).Select(True)
+
                 rs.Redraw()
             except Exception as e:
                 print(e)
@@ -228,39 +281,29 @@ class Tree_Table(forms.TreeGridView):
     def EditEvent(self):
         def on_edited(sender, event):
             try:
-                key = event.Item.Values[0]
+                key = self.DataStore.key(event.Item)
+                if key is None:
+                    return
                 value = event.Item.Values[event.Column]
                 attr = self.Columns[event.Column].HeaderText
 
-                if self.table_type == 'vertices':
-                    get_set_attributes = getattr(self.sceneNode.datastructure, 'vertex_attribute')
-                if self.table_type == 'edges':
-                    get_set_attributes = getattr(self.sceneNode.datastructure, 'edge_attribute')
-                if self.table_type == 'faces':
-                    get_set_attributes = getattr(self.sceneNode.datastructure, 'face_attribute')
-
                 try:
                     new_value = ast.literal_eval(str(value))  # checkboxes value type is bool, turn them into str first to be parsed back to bool
                 except Exception:
                     new_value = str(value)
 
-                # convert key from str to original type: int,tuple...
-                try:
-                    key = ast.literal_eval(key)
-                except Exception:
-                    pass
-
-                original_value = get_set_attributes(key, attr)
+                original_value = self.DataStore.rows[event.Item.Tag][event.Column]
 
                 if type(original_value) == float and type(new_value) == int:
                     new_value = float(new_value)
                 if new_value != original_value:
                     if type(new_value) == type(original_value):
                         print('will update key: %s, attr: %s, value: %s' % (key, attr, new_value))
-                        self.to_update[(key, attr)] = (get_set_attributes, new_value)
+                        self.to_update[(key, attr)] = new_value
+                        self.DataStore.update(event.Item, event.Column, new_value)
                     else:
                         print('invalid value type, needs: %s, got %s instead' % (type(original_value), type(new_value)))
-                        event.Item.Values[event.Column] = original_value
+                        event.Item.Values[event.Column] = self.DataStore.display(original_value)
                 else:
                     print('value not changed from', original_value)
 
@@ -292,29 +335,39 @@ class Tree_Table(forms.TreeGridView):
     def sort(self, key):
         headerTexts = [column.HeaderText for column in self.Columns]
         index = headerTexts.index(key)
-        print(key, index)
 
-        def getValue(item):
-            try:
-                value = ast.literal_eval(item.Values[index])
-            except (ValueError, TypeError):
-                value = item.Values[index]
-            return value
-
-        items = sorted(self.DataStore, key=getValue, reverse=True)
         if self.last_sorted_to == key:
-            items.reverse()
+            self.DataStore.sort(index)
             self.last_sorted_to = None
         else:
+            self.DataStore.sort(index, reverse=True)
             self.last_sorted_to = key
 
-        self.DataStore = forms.TreeGridItemCollection(items)
+        self.ReloadData()
 
     def apply(self):
-        for _key in self.to_update:
-            get_set_attributes, new_value = self.to_update[_key]
-            key, attr = _key
-            get_set_attributes(key, attr, new_value)
+        """Apply all queued edits to the diagram, in one batch.
+
+        Returns
+        -------
+        bool
+            True if any attributes were modified.
+        """
+        if not self.to_update:
+            return False
+        if self.table_type == 'vertices':
+            set_attributes = self.sceneNode.datastructure.vertex_attributes
+        elif self.table_type == 'edges':
+            set_attributes = self.sceneNode.datastructure.edge_attributes
+        else:
+            set_attributes = self.sceneNode.datastructure.face_attributes
+        key_attr_value = {}
+        for (key, attr), value in self.to_update.items():
+            key_attr_value.setdefault(key, {})[attr] = value
+        for key, attr_value in key_attr_value.items():
+            set_attributes(key, list(attr_value.keys()), list(attr_value.values()))
+        self.to_update = {}
+        return True
 
 
 class Tree_Tab(forms.TabPage):
@@ -328,7 +381,7 @@ class Tree_Tab(forms.TabPage):
         return tab
 
     def apply(self):
-        self.Content.apply()
+        return self.Content.apply()
 
 
 class AttributesForm(forms.Dialog[bool]):
@@ -388,22 +441,34 @@ class AttributesForm(forms.Dialog[bool]):
         self.ApplyButton.Click += self.on_apply
         return self.ApplyButton
 
+    def apply_changes(self):
+        """Apply the edits of all pages, followed by a single update of the scene.
+
+        If automatic updates are enabled, the diagrams are brought back into equilibrium
+        with one solve for all edits together.
+        """
+        modified = False
+        for page in self.TabControl.Pages:
+            if hasattr(page, 'apply'):
+                modified = page.apply() or modified
+        scene = get_scene()
+        scheduler = sc.sticky['AGS'].get('scheduler')
+        if modified and scheduler and scene.settings['AGS']['autoupdate']:
+            scheduler.request('force' if isinstance(self.sceneNode, ForceObject) else 'form')
+            if scheduler.flush():
+                return
+        scene.update()
+
     def on_ok(self, sender, event):
         try:
-            for page in self.TabControl.Pages:
-                if hasattr(page, 'apply'):
-                    page.apply()
-            get_scene().update()
+            self.apply_changes()
         except Exception as e:
             print(e)
         self.Close()
 
     def on_apply(self, sender, event):
         try:
-            for page in self.TabControl.Pages:
-                if hasattr(page, 'apply'):
-                    page.apply()
-            get_scene().update()
+            self.apply_changes()
         except Exception as e:
             print(e)
 
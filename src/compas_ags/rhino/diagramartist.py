@@ -2,6 +2,8 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
+import compas_rhino
+
 from functools import partial
 from compas.utilities import color_to_colordict
 from compas_rhino.artists import MeshArtist
@@ -31,3 +33,30 @@ class DiagramArtist(MeshArtist):
     @diagram.setter
     def diagram(self, diagram):
         self.mesh = diagram
+
+    def draw_edgechains(self, chains, color=None):
+        """Draw chains of consecutive edges as polylines.
+
+        Parameters
+        ----------
+        chains : list
+            The chains, as lists of consecutive vertices (see :func:`compas_ags.utilities.edge_chains`).
+        color : tuple or list of tuple, optional
+            The color of all chains, or the color per chain.
+            The default color is the color of the edges.
+
+        Returns
+        -------
+        list
+            The GUIDs of the created Rhino objects.
+        """
+        vertex_xyz = self.vertex_xyz
+        if not color or not isinstance(color[0], (list, tuple)):
+            color = [color or self.color_edges] * len(chains)
+        polylines = []
+        for index, vertices in enumerate(chains):
+            polylines.append({
+                'points': [vertex_xyz[vertex] for vertex in vertices],
+                'color': color[index],
+                'name': "{}.edges.{}".format(self.diagram.name, index)})
+        return compas_rhino.draw_polylines(polylines, layer=self.layer, clear=False, redraw=False)
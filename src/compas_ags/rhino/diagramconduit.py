@@ -0,0 +1,284 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from bisect import bisect_right
+
+from System.Collections.Generic import List
+from System.Drawing.Color import FromArgb
+
+from Rhino.Display import DisplayMaterial
+from Rhino.Display import PointStyle
+from Rhino.Geometry import BoundingBox
+from Rhino.Geometry import Line
+from Rhino.Geometry import Mesh
+from Rhino.Geometry import Point3d
+
+from compas_rhino.conduits import BaseConduit
+
+from compas_ags.utilities import pipe_mesh
+
+
+__all__ = [
+    'DiagramConduit',
+    'LabelConduit',
+]
+
+
+def _textcolor(color):
+    # black or white text, whichever contrasts most with the background
+    r, g, b = color
+    if 0.299 * r + 0.587 * g + 0.114 * b > 127:
+        return FromArgb(0, 0, 0)
+    return FromArgb(255, 255, 255)
+
+
+class DiagramConduit(BaseConduit):
+    """Display conduit drawing the elements of a diagram without adding objects to the Rhino document.
+
+    Parameters
+    ----------
+    pointsize : int, optional
+        The size of the points of the vertices, in pixels.
+        Default is ``3``.
+    linewidth : int, optional
+        The width of the lines of the edges, in pixels.
+        Default is ``1``.
+
+    Notes
+    -----
+    The conduit draws the same descriptions of elements that diagram objects synchronise with the Rhino document
+    (see :meth:`compas_ags.rhino.DiagramObject.draw_elements`).
+    The descriptions are converted once to display geometry grouped per color,
+    such that every frame only costs a few calls to the display pipeline.
+    Only the types of elements whose descriptions changed are converted again.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        conduit = DiagramConduit()
+        conduit.update({'vertex': {0: ((0, 0, 0), (0, 0, 0))}})
+        conduit.enable()
+
+    """
+
+    def __init__(self, pointsize=3, linewidth=1, **kwargs):
+        super(DiagramConduit, self).__init__(**kwargs)
+        self.pointsize = pointsize
+        self.linewidth = linewidth
+        self.elements = {}
+        self.points = []
+        self.lines = []
+        self.arrows = []
+        self.dots = []
+        self.meshes = []
+        self.bbox = BoundingBox.Empty
+
+    def update(self, elements):
+        """Update the display geometry.
+
+        Parameters
+        ----------
+        elements : dict
+            Per type of element, a dict mapping element keys to their description.
+
+        Returns
+        -------
+        None
+        """
+        previous = self.elements
+        self.elements = elements
+        if elements.get('vertex') != previous.get('vertex'):
+            self._update_points(elements.get('vertex') or {})
+        if elements.get('edge') != previous.get('edge'):
+            self._update_lines(elements.get('edge') or {})
+        if elements.get('vertex') != previous.get('vertex') or elements.get('edge') != previous.get('edge'):
+            self._update_bbox(elements.get('vertex') or {}, elements.get('edge') or {})
+        if elements.get('vertexlabel') != previous.get('vertexlabel') or elements.get('edgelabel') != previous.get('edgelabel'):
+            self._update_dots(elements.get('vertexlabel') or {}, elements.get('edgelabel') or {})
+        if elements.get('force') != previous.get('force'):
+            self._update_meshes(elements.get('force') or {})
+
+    def clear(self):
+        """Remove all display geometry."""
+        self.update({})
+
+    def _update_points(self, vertices):
+        color_points = {}
+        for xyz, color in vertices.values():
+            color_points.setdefault(color, []).append(Point3d(*xyz))
+        self.points = [(List[Point3d](points), FromArgb(*color)) for color, points in color_points.items()]
+
+    def _update_bbox(self, vertices, edges):
+        points = List[Point3d]()
+        for element in vertices.values():
+            points.Add(Point3d(*element[0]))
+        for element in edges.values():
+            points.Add(Point3d(*element[0]))
+            points.Add(Point3d(*element[1]))
+        self.bbox = BoundingBox(points) if points.Count else BoundingBox.Empty
+
+    def _update_lines(self, edges):
+        color_lines = {}
+        color_arrows = {}
+        for start, end, color, arrow in edges.values():
+            if arrow == 'start':
+                color_arrows.setdefault(color, []).append(Line(Point3d(*end), Point3d(*start)))
+            elif arrow == 'end':
+                color_arrows.setdefault(color, []).append(Line(Point3d(*start), Point3d(*end)))
+            else:
+                color_lines.setdefault(color, []).append(Line(Point3d(*start), Point3d(*end)))
+        self.lines = [(List[Line](lines), FromArgb(*color)) for color, lines in color_lines.items()]
+        self.arrows = [(List[Line](lines), FromArgb(*color)) for color, lines in color_arrows.items()]
+
+    def _update_dots(self, vertexlabels, edgelabels):
+        dots = []
+        for labels in (vertexlabels, edgelabels):
+            for xyz, text, color in labels.values():
+                dots.append((Point3d(*xyz), text, FromArgb(*color), _textcolor(color)))
+        self.dots = dots
+
+    def _update_meshes(self, forces):
+        color_pipes = {}
+        for start, end, radius, color in forces.values():
+            color_pipes.setdefault(color, []).append((start, end, radius))
+        meshes = []
+        for color, pipes in color_pipes.items():
+            vertices, faces = pipe_mesh(pipes)
+            mesh = Mesh()
+            for x, y, z in vertices:
+                mesh.Vertices.Add(x, y, z)
+            for a, b, c, d in faces:
+                mesh.Faces.AddFace(a, b, c, d)
+            mesh.Normals.ComputeNormals()
+            meshes.append((mesh, DisplayMaterial(FromArgb(*color))))
+        self.meshes = meshes
+
+    def CalculateBoundingBox(self, e):
+        if self.bbox.IsValid:
+            e.IncludeBoundingBox(self.bbox)
+
+    def DrawForeground(self, e):
+        display = e.Display
+        for mesh, material in self.meshes:
+            display.DrawMeshShaded(mesh, material)
+        for lines, color in self.lines:
+            display.DrawLines(lines, color, self.linewidth)
+        for lines, color in self.arrows:
+            display.DrawArrows(lines, color)
+        for points, color in self.points:
+            display.DrawPoints(points, PointStyle.RoundSimple, self.pointsize, color)
+        for point, text, color, textcolor in self.dots:
+            display.DrawDot(point, text, color, textcolor)
+
+
+class LabelConduit(BaseConduit):
+    """Display conduit drawing labels depending on the zoom level of the view.
+
+    Parameters
+    ----------
+    minsize : float, optional
+        The minimum size of the element of a label on the screen, in pixels.
+        Default is ``40``.
+    maxlabels : int, optional
+        The maximum number of labels drawn at the same time.
+        Default is ``200``.
+    maxforces : int, optional
+        The number of labels with the largest forces that are always drawn.
+        Default is ``10``.
+
+    Notes
+    -----
+    Every label has a size and a force.
+    The size is the size of the labelled element in model space, for example the length of an edge.
+    A label is drawn if its element is at least ``minsize`` pixels large on the screen,
+    or if its force is one of the ``maxforces`` largest forces.
+    If more than ``maxlabels`` labels qualify,
+    the labels with the largest forces are drawn first, followed by those of the largest elements.
+
+    The labels are sorted by size once, whenever they are updated.
+    Every frame then only requires the scale of the view to determine the labels to draw,
+    and the selection is reused as long as the scale does not change.
+    """
+
+    def __init__(self, minsize=40, maxlabels=200, maxforces=10, **kwargs):
+        super(LabelConduit, self).__init__(**kwargs)
+        self.minsize = minsize
+        self.maxlabels = maxlabels
+        self.maxforces = maxforces
+        self.labels = []
+        self.sizes = []
+        self.forces = []
+        self.center = Point3d(0, 0, 0)
+        self._scale = None
+        self._dots = []
+
+    def update(self, labels):
+        """Update the labels.
+
+        Parameters
+        ----------
+        labels : list
+            Per label, the XYZ coordinates of its location, its text, its color,
+            the size of its element and its force.
+
+        Returns
+        -------
+        None
+        """
+        labels = sorted(labels, key=lambda label: - label[3])
+        self.labels = [(Point3d(*xyz), text, FromArgb(*color), _textcolor(color)) for xyz, text, color, size, force in labels]
+        # negative sizes are sorted in ascending order
+        self.sizes = [- label[3] for label in labels]
+        forces = sorted(range(len(labels)), key=lambda index: - abs(labels[index][4]))
+        self.forces = [index for index in forces if labels[index][4]]
+        if labels:
+            n = len(labels)
+            self.center = Point3d(sum(label[0][0] for label in labels) / n,
+                                  sum(label[0][1] for label in labels) / n,
+                                  sum(label[0][2] for label in labels) / n)
+        self._scale = None
+
+    def visible(self, scale):
+        """Determine the labels to draw at a scale of the view.
+
+        Parameters
+        ----------
+        scale : float
+            The number of pixels per unit of model space.
+
+        Returns
+        -------
+        list of int
+            The indices of the labels.
+        """
+        budget = int(self.maxlabels)
+        indices = self.forces[:min(int(self.maxforces), budget)]
+        selected = set(indices)
+        count = bisect_right(self.sizes, - self.minsize / scale) if scale > 0 else 0
+        for index in range(count):
+            if len(indices) >= budget:
+                break
+            if index not in selected:
+                indices.append(index)
+        return indices
+
+    def DrawForeground(self, e):
+        if not self.labels:
+            return
+        result = e.Viewport.GetWorldToScreenScale(self.center)
+        scale = result[1] if result[0] else 0.0
+        if scale != self._scale:
+            self._dots = [self.labels[index] for index in self.visible(scale)]
+            self._scale = scale
+        for point, text, color, textcolor in self._dots:
+            e.Display.DrawDot(point, text, color, textcolor)
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -4,23 +4,139 @@ from __future__ import division
 
 import Rhino
 from Rhino.Geometry import Point3d
+from Rhino.Geometry import Line
+from Rhino.Geometry import Polyline
+from System.Drawing.Color import FromArgb
+
+import scriptcontext as sc
 
 import compas_rhino
 
+from compas.geometry import Point
+from compas.geometry import Rotation
+from compas.geometry import Scale
+from compas.geometry import Translation
 from compas.geometry import scale_vector
 from compas.geometry import add_vectors
 from compas.geometry import subtract_vectors
+from compas.geometry import transform_points
+from compas.geometry import distance_point_point
 
 from compas_rhino.objects import MeshObject
 
+from compas_ags.utilities import edge_chains
+from compas_ags.utilities import closest_segment
+from compas_ags.rhino.diagramconduit import DiagramConduit
+from compas_ags.rhino.diagramconduit import LabelConduit
+
 
 __all__ = ['DiagramObject']
 
 
+find_object = sc.doc.Objects.Find
+
+
+def _modify_object(guid, geometry=None, color=None):
+    """Modify the geometry and/or color of an existing Rhino object in place."""
+    if geometry is not None and not sc.doc.Objects.Replace(guid, geometry):
+        return False
+    if color is not None:
+        obj = find_object(guid)
+        if not obj:
+            return False
+        obj.Attributes.ObjectColor = FromArgb(*color)
+        return obj.CommitChanges()
+    return True
+
+
+def _update_point(guid, old, new):
+    xyz, color = new
+    geometry = Point3d(*xyz) if xyz != old[0] else None
+    return _modify_object(guid, geometry, color if color != old[1] else None)
+
+
+def _update_line(guid, old, new):
+    start, end, color, arrow = new
+    if arrow != old[3]:
+        return False
+    geometry = None
+    if start != old[0] or end != old[1]:
+        geometry = Line(Point3d(*start), Point3d(*end))
+    return _modify_object(guid, geometry, color if color != old[2] else None)
+
+
+def _update_polyline(guid, old, new):
+    edges, vertices, points, color = new
+    if edges != old[0]:
+        return False
+    geometry = None
+    if points != old[2]:
+        geometry = Polyline([Point3d(*point) for point in points])
+    return _modify_object(guid, geometry, color if color != old[3] else None)
+
+
+def _update_dot(guid, old, new):
+    xyz, text, color = new
+    geometry = None
+    if xyz != old[0] or text != old[1]:
+        obj = find_object(guid)
+        if not obj:
+            return False
+        geometry = obj.Geometry.Duplicate()
+        geometry.Point = Point3d(*xyz)
+        geometry.Text = text
+    return _modify_object(guid, geometry, color if color != old[2] else None)
+
+
 class DiagramObject(MeshObject):
     """A diagram object represents a form or force diagram in the Rhino view.
+
+    Notes
+    -----
+    Diagram objects keep track of the elements they have drawn,
+    and of the GUIDs of the corresponding Rhino objects.
+    Every element is described by the data needed to draw it:
+    its location, text, color, ...
+    When the object is drawn again, only the Rhino objects of elements that were added,
+    removed, or whose description changed are updated.
+    Changes in location, text or color are applied to the existing Rhino objects in place.
+    Everything is drawn from scratch only after the object was cleared,
+    or when it was moved to a different layer.
+
+    With the setting ``'render.batched'``, edges of the same color are drawn
+    as a small number of polylines (see :meth:`batch_elements`),
+    and the edges are identified from the segments of the polylines (see :meth:`edge_at`).
+
+    With the setting ``'render.conduit'``, no objects are added to the Rhino document.
+    Instead, the elements are drawn by a display conduit (see :class:`compas_ags.rhino.DiagramConduit`),
+    until they are added to the document explicitly with :meth:`bake`.
+    Elements drawn by the conduit cannot be selected.
+
+    With the setting ``'lod.labels'``, labels are drawn by a separate conduit
+    that only draws the labels of elements that are large enough on the screen
+    and of the elements with the largest forces (see :class:`compas_ags.rhino.LabelConduit`).
+    The threshold and the number of labels are controlled by the settings
+    ``'lod.minsize'``, ``'lod.maxlabels'`` and ``'lod.maxforces'``.
     """
 
+    ELEMENTS = {
+        'vertex': ('guid_vertex', _update_point),
+        'vertexlabel': ('guid_vertexlabel', _update_dot),
+        'edge': ('guid_edge', _update_line),
+        'edgebatch': ('guid_edgebatch', _update_polyline),
+        'edgelabel': ('guid_edgelabel', _update_dot),
+    }
+
+    def __init__(self, diagram, *args, **kwargs):
+        super(DiagramObject, self).__init__(diagram, *args, **kwargs)
+        self._drawn = {}
+        self._drawn_layer = None
+        self._key_guid = {}
+        self._guid_edgebatch = {}
+        self._elements = {}
+        self._conduit = None
+        self._labelconduit = None
+
     @property
     def diagram(self):
         """The diagram associated with the object."""
@@ -30,6 +146,341 @@ class DiagramObject(MeshObject):
     def diagram(self, diagram):
         self.mesh = diagram
 
+    @property
+    def conduit(self):
+        """:class:`compas_ags.rhino.DiagramConduit`: The conduit drawing the diagram if no objects are added to the document."""
+        if not self._conduit:
+            self._conduit = DiagramConduit()
+        return self._conduit
+
+    @property
+    def labelconduit(self):
+        """:class:`compas_ags.rhino.LabelConduit`: The conduit drawing the labels depending on the zoom level."""
+        if not self._labelconduit:
+            self._labelconduit = LabelConduit()
+        return self._labelconduit
+
+    @property
+    def guids(self):
+        # the parent class extends the list of other GUIDs in place
+        guids = list(self._guids)
+        for name in ('vertex', 'edge', 'edgebatch', 'face', 'vertexnormal', 'facenormal', 'vertexlabel', 'edgelabel', 'facelabel'):
+            guids += list(getattr(self, 'guid_' + name).keys())
+        return guids
+
+    @property
+    def guid_edgebatch(self):
+        """Map between Rhino object GUIDs and the keys of batches of edges."""
+        return self._guid_edgebatch
+
+    @guid_edgebatch.setter
+    def guid_edgebatch(self, values):
+        self._guid_edgebatch = dict(values)
+
+    def clear(self):
+        """Clear all Rhino objects associated with this diagram object."""
+        super(DiagramObject, self).clear()
+        self._drawn = {}
+        self._drawn_layer = None
+        self._key_guid = {}
+        self._guid_edgebatch = {}
+        if self._conduit:
+            self._conduit.disable()
+            self._conduit.clear()
+        if self._labelconduit:
+            self._labelconduit.disable()
+            self._labelconduit.update([])
+
+    # ==========================================================================
+    # Drawing
+    # ==========================================================================
+
+    def _create_vertex(self, keys, elements):
+        return self.artist.draw_vertices(vertices=keys, color={key: elements[key][1] for key in keys})
+
+    def _create_vertexlabel(self, keys, elements):
+        text = {key: elements[key][1] for key in keys}
+        color = {key: elements[key][2] for key in keys}
+        keys[:] = list(text)
+        return self.artist.draw_vertexlabels(text=text, color=color)
+
+    def _create_edge(self, keys, elements):
+        return self.artist.draw_edges(edges=keys, color={key: elements[key][2] for key in keys})
+
+    def _create_edgebatch(self, keys, elements):
+        return self.artist.draw_edgechains([elements[key][1] for key in keys], color=[elements[key][3] for key in keys])
+
+    def _create_edgelabel(self, keys, elements):
+        # the keys of edge labels are pairs of the kind of label and the edge
+        # the labels are drawn per kind, because one edge can have multiple labels
+        kinds = {}
+        for kind, edge in keys:
+            kinds.setdefault(kind, []).append(edge)
+        keys[:] = []
+        guids = []
+        for kind, edges in kinds.items():
+            text = {edge: elements[kind, edge][1] for edge in edges}
+            color = {edge: elements[kind, edge][2] for edge in edges}
+            keys += [(kind, edge) for edge in text]
+            guids += self.artist.draw_edgelabels(text=text, color=color)
+        return guids
+
+    def label_force(self, edge):
+        """The force in an edge, used to select the labels of the largest forces.
+
+        Parameters
+        ----------
+        edge : tuple
+            The identifier of the edge.
+
+        Returns
+        -------
+        float
+        """
+        return self.diagram.edge_attribute(edge, 'f') or 0.0
+
+    def label_levels(self, elements):
+        """Describe the labels of a diagram for drawing them depending on the zoom level.
+
+        Parameters
+        ----------
+        elements : dict
+            Per type of element, a dict mapping element keys to their description.
+
+        Returns
+        -------
+        list
+            Per label, its location, text and color,
+            the size of its element and the magnitude of the force of its element.
+
+        Notes
+        -----
+        The size of an edge is its length.
+        The size of a vertex is the distance to its closest neighbor.
+        Vertices have no force.
+        """
+        vertex_xyz = self.artist.vertex_xyz
+        labels = []
+        for vertex, (xyz, text, color) in (elements.get('vertexlabel') or {}).items():
+            distances = [distance_point_point(vertex_xyz[vertex], vertex_xyz[nbr]) for nbr in self.diagram.vertex_neighbors(vertex)]
+            labels.append((xyz, text, color, min(distances) if distances else 0.0, 0.0))
+        for (kind, (u, v)), (xyz, text, color) in (elements.get('edgelabel') or {}).items():
+            size = distance_point_point(vertex_xyz[u], vertex_xyz[v])
+            labels.append((xyz, text, color, size, abs(self.label_force((u, v)))))
+        return labels
+
+    def batch_elements(self, elements):
+        """Combine the elements of a diagram into batches that are drawn as one Rhino object.
+
+        Edges without arrows are grouped per color, and decomposed into chains of consecutive edges
+        (see :func:`compas_ags.utilities.edge_chains`).
+        Every chain is drawn as one polyline.
+
+        Parameters
+        ----------
+        elements : dict
+            Per type of element, a dict mapping element keys to their description.
+
+        Returns
+        -------
+        dict
+            The elements, with batches instead of individual elements where possible.
+        """
+        elements = dict(elements)
+        edges = elements.get('edge')
+        if not edges:
+            return elements
+        elements['edge'] = {}
+        elements['edgebatch'] = {}
+        xyz = {}
+        groups = {}
+        for (u, v) in sorted(edges):
+            start, end, color, arrow = edges[u, v]
+            xyz[u] = start
+            xyz[v] = end
+            if arrow:
+                elements['edge'][u, v] = edges[u, v]
+            else:
+                groups.setdefault(color, []).append((u, v))
+        for color, group in groups.items():
+            for vertices, chain in edge_chains(group):
+                points = tuple(xyz[vertex] for vertex in vertices)
+                elements['edgebatch'][color, chain[0]] = tuple(chain), tuple(vertices), points, color
+        return elements
+
+    def draw_elements(self, elements):
+        """Synchronise the Rhino objects of the diagram with a description of its elements.
+
+        Parameters
+        ----------
+        elements : dict
+            Per type of element (see ``ELEMENTS``), a dict mapping element keys to their description.
+            The descriptions are tuples of location(s), text and color, as expected by the update functions
+            of the corresponding type.
+            Types of elements that are missing are not drawn.
+
+        Returns
+        -------
+        dict
+            Per type of element, the number of Rhino objects that were created, modified and deleted.
+
+        Notes
+        -----
+        Rhino objects of unchanged elements are left alone,
+        unless they were deleted from the Rhino document by other means.
+        Rhino objects of modified elements are updated in place,
+        or replaced if they cannot be updated in place.
+
+        If the setting ``'render.batched'`` is on,
+        the elements are combined into batches first (see :meth:`batch_elements`).
+
+        If the setting ``'lod.labels'`` is on,
+        the labels are drawn by the label conduit of the object instead (see :meth:`label_levels`).
+
+        If the setting ``'render.conduit'`` is on,
+        the Rhino objects are removed and the elements are drawn by the conduit of the object instead.
+        No statistics are returned in that case.
+        """
+        self._elements = elements
+        if self.settings.get('lod.labels'):
+            self.labelconduit.minsize = self.settings['lod.minsize']
+            self.labelconduit.maxlabels = self.settings['lod.maxlabels']
+            self.labelconduit.maxforces = self.settings['lod.maxforces']
+            self.labelconduit.update(self.label_levels(elements))
+            self.labelconduit.enable()
+            elements = dict(elements)
+            elements.pop('vertexlabel', None)
+            elements.pop('edgelabel', None)
+        elif self._labelconduit and self._labelconduit.Enabled:
+            self._labelconduit.disable()
+            self._labelconduit.update([])
+        if self.settings.get('render.conduit'):
+            if self._drawn or self._guids:
+                self.clear()
+            self.conduit.update(elements)
+            self.conduit.enable()
+            self.redraw()
+            return {}
+        if self._conduit and self._conduit.Enabled:
+            self._conduit.disable()
+            self._conduit.clear()
+        if self.settings.get('render.batched'):
+            elements = self.batch_elements(elements)
+        if self._drawn_layer != self.layer:
+            self.clear()
+        self._drawn_layer = self.layer
+        stats = {}
+        tracked = set()
+        for name, (attr, update) in self.ELEMENTS.items():
+            drawn = self._drawn.get(name, {})
+            current = elements.get(name) or {}
+            kept = {}
+            delete = []
+            create = []
+            modified = 0
+            for key, element in current.items():
+                if key in drawn:
+                    guid, old = drawn[key]
+                    if element == old:
+                        if find_object(guid):
+                            kept[key] = guid, element
+                            continue
+                    elif update and update(guid, old, element):
+                        kept[key] = guid, element
+                        modified += 1
+                        continue
+                    delete.append(guid)
+                create.append(key)
+            delete += [guid for key, (guid, old) in drawn.items() if key not in current]
+            compas_rhino.delete_objects(delete, purge=True)
+            if create:
+                guids = getattr(self, '_create_' + name)(create, current)
+                for key, guid in zip(create, guids):
+                    kept[key] = guid, current[key]
+            self._drawn[name] = kept
+            if name == 'edgelabel':
+                setattr(self, attr, [(guid, key[1]) for key, (guid, element) in kept.items()])
+            else:
+                setattr(self, attr, [(guid, key) for key, (guid, element) in kept.items()])
+            tracked.update(guid for guid, element in kept.values())
+            stats[name] = len(create), modified, len(delete)
+        # objects that were drawn outside of this mechanism, e.g. highlights
+        compas_rhino.delete_objects([guid for guid in self._guids if guid not in tracked], purge=True)
+        self._guids = []
+        self._key_guid = {}
+        self.redraw()
+        return stats
+
+    def bake(self):
+        """Add the elements of the most recent draw to the Rhino document.
+
+        Returns
+        -------
+        list
+            The GUIDs of the created Rhino objects.
+
+        Notes
+        -----
+        The baked objects are not tracked by the diagram object.
+        They are not updated or removed when the diagram is drawn again.
+        """
+        guids = []
+        for name in self.ELEMENTS:
+            elements = self._elements.get(name)
+            if elements:
+                guids += getattr(self, '_create_' + name)(list(elements), elements)
+        self.redraw()
+        return guids
+
+    def element_guid(self, name):
+        """The GUIDs of the Rhino objects of the drawn elements of one type, per element key.
+
+        Parameters
+        ----------
+        name : str
+            The type of element (see ``ELEMENTS``).
+
+        Returns
+        -------
+        dict
+
+        Notes
+        -----
+        The map is built at most once after every draw.
+        """
+        key_guid = self._key_guid.get(name)
+        if key_guid is None:
+            key_guid = {key: guid for key, (guid, element) in self._drawn.get(name, {}).items()}
+            self._key_guid[name] = key_guid
+        return key_guid
+
+    def view_coordinates(self, vertex_xyz):
+        """Transform diagram coordinates to coordinates in the Rhino view.
+
+        The transformation is the same as the one used for :attr:`vertex_xyz`,
+        but applied to arbitrary coordinates of the vertices, for example to draw a preview.
+
+        Parameters
+        ----------
+        vertex_xyz : dict
+            XYZ coordinates per vertex, in the coordinate system of the diagram.
+            If the object has an anchor, the anchor should be included.
+
+        Returns
+        -------
+        dict
+            XYZ coordinates per vertex, in the coordinate system of the view.
+        """
+        S = Scale.from_factors([self.scale] * 3)
+        R = Rotation.from_euler_angles(self.rotation)
+        T = Translation.from_vector(self.location)
+        X = T * R * S
+        if self.anchor is not None:
+            X = X * Translation.from_vector(Point(0, 0, 0) - Point(* vertex_xyz[self.anchor]))
+        vertices = list(vertex_xyz.keys())
+        points = transform_points([vertex_xyz[vertex] for vertex in vertices], X)
+        return dict(zip(vertices, points))
+
     def unselect(self):
         """Unselect all Rhino objects associated with this diagram object."""
         compas_rhino.rs.UnselectObjects(self.artist.guids)
@@ -55,10 +506,85 @@ class DiagramObject(MeshObject):
         tuple of int
             The identifier of the selected edge.
         """
-        curvefilter = compas_rhino.rs.filter.curve
-        guid = compas_rhino.rs.GetObject(message=message, preselect=True, select=True, filter=curvefilter)
-        if guid and guid in self.guid_edge:
+        go = Rhino.Input.Custom.GetObject()
+        go.SetCommandPrompt(message)
+        go.GeometryFilter = Rhino.DocObjects.ObjectType.Curve
+        go.Get()
+        if go.CommandResult() != Rhino.Commands.Result.Success:
+            return None
+        objref = go.Object(0)
+        return self.edge_at(objref.ObjectId, objref.SelectionPoint())
+
+    def select_edges(self, message="Select Edges."):
+        """Manually select edges in the Rhino view.
+
+        Returns
+        -------
+        list
+            The identifiers of the selected edges.
+
+        Notes
+        -----
+        If a batch of edges is selected with a window instead of a click,
+        all edges of the batch are selected.
+        """
+        go = Rhino.Input.Custom.GetObject()
+        go.SetCommandPrompt(message)
+        go.GeometryFilter = Rhino.DocObjects.ObjectType.Curve
+        go.GetMultiple(1, 0)
+        if go.CommandResult() != Rhino.Commands.Result.Success:
+            return []
+        edges = []
+        for objref in go.Objects():
+            guid = objref.ObjectId
+            edge = self.edge_at(guid, objref.SelectionPoint())
+            if edge:
+                edges.append(edge)
+            elif guid in self.guid_edgebatch:
+                edges += self.edges_of(guid)
+        return edges
+
+    def edges_of(self, guid):
+        """The edges represented by a Rhino object.
+
+        Parameters
+        ----------
+        guid : System.Guid
+            The GUID of the Rhino object.
+
+        Returns
+        -------
+        list
+        """
+        if guid in self.guid_edge:
+            return [self.guid_edge[guid]]
+        if guid in self.guid_edgebatch:
+            element = self._drawn['edgebatch'][self.guid_edgebatch[guid]][1]
+            return list(element[0])
+        return []
+
+    def edge_at(self, guid, point=None):
+        """Identify the edge represented by a Rhino object at a location.
+
+        Parameters
+        ----------
+        guid : System.Guid
+            The GUID of the Rhino object.
+        point : :class:`Rhino.Geometry.Point3d`, optional
+            A point on the object, for example the point where the object was picked.
+            Required to identify an edge in a batch of edges.
+
+        Returns
+        -------
+        tuple or None
+            The identifier of the edge, or None if no edge could be identified.
+        """
+        if guid in self.guid_edge:
             return self.guid_edge[guid]
+        if guid in self.guid_edgebatch and point is not None and point.IsValid:
+            edges, vertices, points, color = self._drawn['edgebatch'][self.guid_edgebatch[guid]][1]
+            return edges[closest_segment(list(point), points)]
+        return None
 
     def move(self):
         """Move the entire diagram.
@@ -97,7 +623,7 @@ class DiagramObject(MeshObject):
         self.location = add_vectors(self.location, translation)
         return True
 
-    def move_vertex(self, vertex, constraint=None, allow_off=None):
+    def move_vertex(self, vertex, constraint=None, allow_off=None, preview=None):
         """Move one vertex of the diagram and update the data structure to the new geometry.
 
         Parameters
@@ -109,6 +635,10 @@ class DiagramObject(MeshObject):
         ----------------
         constraint : :class:`Rhino.Geometry.GeometryBase`, optional
         allow_off : bool, optional
+        preview : :class:`compas_ags.rhino.ReciprocalPreview`, optional
+            A live preview of the reciprocal diagram.
+            The displacement of the vertex is submitted to the preview for every frame of the move operation,
+            and the most recent solution of the preview is drawn.
 
         Returns
         -------
@@ -120,6 +650,9 @@ class DiagramObject(MeshObject):
             sp = e.CurrentPoint
             for ep in nbrs:
                 e.Display.DrawDottedLine(sp, ep, color)
+            if preview:
+                preview.submit({vertex: scale_vector(subtract_vectors(list(sp), xyz0), 1 / self.scale)})
+                preview.draw(e.Display)
 
         color = Rhino.ApplicationSettings.AppearanceSettings.FeedbackColor
         diagram = self.diagram
@@ -130,6 +663,10 @@ class DiagramObject(MeshObject):
         else:
             nbrs = [Point3d(* vertex_xyz[nbr]) for nbr in diagram.vertex_neighbors(vertex)]
 
+        xyz0 = vertex_xyz[vertex]
+        if preview:
+            preview.reset()
+
         gp = Rhino.Input.Custom.GetPoint()
         gp.SetCommandPrompt('Point to move to?')
         if constraint:
@@ -140,7 +677,6 @@ class DiagramObject(MeshObject):
             return False
 
         point = list(gp.Point())
-        xyz0 = vertex_xyz[vertex]
         dxyz0 = subtract_vectors(point, xyz0)
         dxyz = scale_vector(dxyz0, 1 / self.scale)
         xyz = diagram.vertex_attributes(vertex, 'xyz')
@@ -148,13 +684,17 @@ class DiagramObject(MeshObject):
         diagram.vertex_attributes(vertex, 'xyz', xyz)
         return True
 
-    def move_vertices(self, vertices):
+    def move_vertices(self, vertices, preview=None):
         """Move a selection of vertices of the diagram and update the data structure to the new geometry.
 
         Parameters
         ----------
         vertices : list
             The identifiers of the vertices.
+        preview : :class:`compas_ags.rhino.ReciprocalPreview`, optional
+            A live preview of the reciprocal diagram.
+            The displacement of the vertices is submitted to the preview for every frame of the move operation,
+            and the most recent solution of the preview is drawn.
 
         Returns
         -------
@@ -169,6 +709,10 @@ class DiagramObject(MeshObject):
                 e.Display.DrawDottedLine(a + vector, b + vector, color)
             for a, b in connectors:
                 e.Display.DrawDottedLine(a + vector, b, color)
+            if preview:
+                dxyz = scale_vector(list(vector), 1 / self.scale)
+                preview.submit({vertex: dxyz for vertex in vertices})
+                preview.draw(e.Display)
 
         diagram = self.diagram
         vertex_xyz = self.artist.vertex_xyz
@@ -197,6 +741,8 @@ class DiagramObject(MeshObject):
             return False
         start = gp.Point()
 
+        if preview:
+            preview.reset()
         gp.SetCommandPrompt('Point to move to?')
         gp.SetBasePoint(start, False)
         gp.DrawLineFromPoint(start, True)
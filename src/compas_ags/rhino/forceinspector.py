@@ -10,9 +10,7 @@ from Rhino.Geometry import Line
 from compas_rhino.conduits import BaseConduit
 from compas_rhino.ui import Mouse
 
-from compas.geometry import length_vector
-from compas.geometry import cross_vectors
-from compas.geometry import subtract_vectors
+from compas_ags.utilities import DiagramIndex
 
 
 __all__ = [
@@ -38,6 +36,23 @@ class ForceDiagramInspector(BaseConduit):
     @force_vertex_xyz.setter
     def force_vertex_xyz(self, vertex_xyz):
         self._force_vertex_xyz = vertex_xyz
+        self._index = None
+
+    @property
+    def index(self):
+        """:class:`compas_ags.utilities.DiagramIndex`: Spatial index of the inspected diagram.
+
+        The index is rebuilt when the coordinates of the vertices are replaced,
+        or after it was invalidated explicitly.
+        """
+        if not self._index or self._index.is_stale(self.force_vertex_xyz):
+            self._index = DiagramIndex(self.force_vertex_xyz, self.force_edges)
+            self._vertex_index = {vertex: index for index, vertex in enumerate(self.force_vertex_xyz)}
+        return self._index
+
+    def invalidate(self):
+        """Invalidate the spatial index after modifying the coordinates of the vertices in place."""
+        self._index = None
 
     def enable(self):
         """Enable the conduit."""
@@ -81,7 +96,7 @@ class ForceDiagramInspector(BaseConduit):
 
 
 class ForceDiagramVertexInspector(ForceDiagramInspector):
-    """Inspect diagram topology at the vertices.
+    """Inspect diagram topology at the vertices, and the correspondence of the edges.
 
     Parameters
     ----------
@@ -99,6 +114,8 @@ class ForceDiagramVertexInspector(ForceDiagramInspector):
         linecolor = linecolor or (255, 255, 0)
         self._form_vertex_xyz = None
         self._force_vertex_xyz = None
+        self._index = None
+        self._vertex_index = None
         self.form = force.dual
         self.force = force
         self.tol = tol
@@ -107,6 +124,7 @@ class ForceDiagramVertexInspector(ForceDiagramInspector):
         self.linecolor = FromArgb(*linecolor)
         self.mouse = Mouse(self)
         self.force_edges = list(self.force.ordered_edges(self.form))
+        self.force_edge_index = {edge: index for index, edge in enumerate(self.force_edges)}
         self.form_edges = list(self.form.edges())
         self.force_vertex_edges = {}
         for edge in self.force_edges:
@@ -127,24 +145,34 @@ class ForceDiagramVertexInspector(ForceDiagramInspector):
     def DrawForeground(self, e):
         draw_dot = e.Display.DrawDot
         draw_arrows = e.Display.DrawArrows
-        a = self.mouse.p1
-        b = self.mouse.p2
-        ab = subtract_vectors(b, a)
-        Lab = length_vector(ab)
-        if not Lab:
+        a = list(self.mouse.p1)
+        b = list(self.mouse.p2)
+        if a == b:
             return
-        for index, vertex in enumerate(self.force_vertex_xyz):
+        index = self.index
+        vertex = index.vertex_on_ray(a, b, self.tol)
+        if vertex is not None:
             c = self.force_vertex_xyz[vertex]
-            D = length_vector(cross_vectors(subtract_vectors(a, c), subtract_vectors(b, c)))
-            if D / Lab < self.tol:
-                point = Point3d(*c)
-                draw_dot(point, str(index), self.dotcolor, self.textcolor)
-                lines = List[Line](len(self.force_vertex_edges[vertex]))
-                for u, v in self.force_vertex_edges[vertex]:
-                    lines.Add(Line(Point3d(* self.force_vertex_xyz[u]), Point3d(* self.force_vertex_xyz[v])))
-                draw_arrows(lines, self.linecolor)
-                lines = List[Line](len(self.form_face_edges[vertex]))
-                for u, v in self.form_face_edges[vertex]:
-                    lines.Add(Line(Point3d(* self.form_vertex_xyz[u]), Point3d(* self.form_vertex_xyz[v])))
-                draw_arrows(lines, self.linecolor)
-                break
+            point = Point3d(*c)
+            draw_dot(point, str(self._vertex_index[vertex]), self.dotcolor, self.textcolor)
+            lines = List[Line](len(self.force_vertex_edges[vertex]))
+            for u, v in self.force_vertex_edges[vertex]:
+                lines.Add(Line(Point3d(* self.force_vertex_xyz[u]), Point3d(* self.force_vertex_xyz[v])))
+            draw_arrows(lines, self.linecolor)
+            lines = List[Line](len(self.form_face_edges[vertex]))
+            for u, v in self.form_face_edges[vertex]:
+                lines.Add(Line(Point3d(* self.form_vertex_xyz[u]), Point3d(* self.form_vertex_xyz[v])))
+            draw_arrows(lines, self.linecolor)
+            return
+        edge = index.edge_on_ray(a, b, self.tol)
+        if edge is not None:
+            # the form edges and the ordered force edges correspond by index
+            i = self.force_edge_index[edge]
+            u, v = edge
+            point = Point3d(* [0.5 * (p + q) for p, q in zip(self.force_vertex_xyz[u], self.force_vertex_xyz[v])])
+            draw_dot(point, str(i), self.dotcolor, self.textcolor)
+            lines = List[Line](2)
+            lines.Add(Line(Point3d(* self.force_vertex_xyz[u]), Point3d(* self.force_vertex_xyz[v])))
+            u, v = self.form_edges[i]
+            lines.Add(Line(Point3d(* self.form_vertex_xyz[u]), Point3d(* self.form_vertex_xyz[v])))
+            draw_arrows(lines, self.linecolor)
@@ -21,6 +21,14 @@ class ForceObject(DiagramObject):
         'show.forcelabels': False,
         'show.forcecolors': True,
 
+        'render.batched': False,
+        'render.conduit': False,
+
+        'lod.labels': False,
+        'lod.minsize': 40,
+        'lod.maxlabels': 200,
+        'lod.maxforces': 10,
+
         'color.vertices': (0, 0, 0),
         'color.vertexlabels': (255, 255, 255),
         'color.vertices:is_fixed': (0, 255, 255),
@@ -59,14 +67,19 @@ class ForceObject(DiagramObject):
     def inspector_off(self):
         self.inspector.disable()
 
+    def label_force(self, edge):
+        """The force in the dual edge of an edge, used to select the labels of the largest forces."""
+        return self.diagram.dual_edge_force(edge)
+
     def draw(self):
         """Draw the diagram.
 
         The visible components, display properties and visual style of the diagram
         can be fully customised using the configuration items in the settings dict.
 
-        The method will clear the drawing layer and any objects it has drawn in a previous call,
-        and keep track of any newly created objects using their GUID.
+        The method keeps track of the objects it has drawn using their GUID,
+        and only updates the objects of vertices and edges that changed since the previous call
+        (see :meth:`DiagramObject.draw_elements`).
 
         Parameters
         ----------
@@ -77,11 +90,14 @@ class ForceObject(DiagramObject):
         None
 
         """
-        self.clear()
         if not self.visible:
+            self.clear()
             return
 
-        self.artist.vertex_xyz = self.vertex_xyz
+        vertex_xyz = self.vertex_xyz
+        self.artist.vertex_xyz = vertex_xyz
+        xyz = {vertex: tuple(vertex_xyz[vertex]) for vertex in self.diagram.vertices()}
+        elements = {}
 
         # vertices
         if self.settings['show.vertices']:
@@ -89,8 +105,7 @@ class ForceObject(DiagramObject):
             color = {}
             color.update({vertex: self.settings['color.vertices'] for vertex in vertices})
             color.update({vertex: self.settings['color.vertices:is_fixed'] for vertex in self.diagram.vertices_where({'is_fixed': True})})
-            guids = self.artist.draw_vertices(color=color)
-            self.guid_vertex = zip(guids, vertices)
+            elements['vertex'] = {vertex: (xyz[vertex], tuple(color[vertex])) for vertex in vertices}
 
             # vertex labels
             if self.settings['show.vertexlabels']:
@@ -98,8 +113,7 @@ class ForceObject(DiagramObject):
                 color = {}
                 color.update({vertex: self.settings['color.vertexlabels'] for vertex in vertices})
                 color.update({vertex: self.settings['color.vertices:is_fixed'] for vertex in self.diagram.vertices_where({'is_fixed': True})})
-                guids = self.artist.draw_vertexlabels(text=text, color=color)
-                self.guid_vertexlabel = zip(guids, vertices)
+                elements['vertexlabel'] = {vertex: (xyz[vertex], str(text[vertex]), tuple(color[vertex])) for vertex in vertices}
 
         # edges
         if self.settings['show.edges']:
@@ -121,65 +135,26 @@ class ForceObject(DiagramObject):
                     elif self.diagram.dual_edge_force(edge) < - tol:
                         color[edge] = self.settings['color.compression']
 
-            guids = self.artist.draw_edges(edges=edges, color=color)
-            self.guid_edge = zip(guids, edges)
-
-            guid_edgelabel = []
+            elements['edge'] = {(u, v): (xyz[u], xyz[v], tuple(color[u, v]), None) for u, v in edges}
+            midpoint = {(u, v): tuple(0.5 * (a + b) for a, b in zip(xyz[u], xyz[v])) for u, v in edges}
+            elements['edgelabel'] = {}
 
             # edge labels
+            # the labels have the same color as the edges
             if self.settings['show.edgelabels']:
                 edge_index = self.diagram.edge_index(self.diagram.dual)
                 edge_index.update({(v, u): index for (u, v), index in edge_index.items()})
-                text = {edge: edge_index[edge] for edge in edges}
-                color = {}
-                color.update({edge: self.settings['color.edges'] for edge in edges})
-                color.update({edge: self.settings['color.edges:is_external'] for edge in self.diagram.edges_where_dual({'is_external': True})})
-                color.update({edge: self.settings['color.edges:is_load'] for edge in self.diagram.edges_where_dual({'is_load': True})})
-                color.update({edge: self.settings['color.edges:is_reaction'] for edge in self.diagram.edges_where_dual({'is_reaction': True})})
-                color.update({edge: self.settings['color.edges:is_ind'] for edge in self.diagram.edges_where_dual({'is_ind': True})})
-
-                # force colors
-                if self.settings['show.forcecolors']:
-                    tol = self.settings['tol.forces']
-                    for edge in self.diagram.edges_where_dual({'is_external': False}):
-                        if self.diagram.dual_edge_force(edge) > + tol:
-                            color[edge] = self.settings['color.tension']
-                        elif self.diagram.dual_edge_force(edge) < - tol:
-                            color[edge] = self.settings['color.compression']
-
-                guids = self.artist.draw_edgelabels(text=text, color=color)
-                guid_edgelabel += zip(guids, edges)
+                for edge in edges:
+                    elements['edgelabel']['edge', edge] = midpoint[edge], str(edge_index[edge]), tuple(color[edge])
 
             # force labels
+            # the labels have the same color as the edges
             if self.settings['show.forcelabels']:
-                text = {}
                 for edge in edges:
                     f = self.diagram.dual_edge_force(edge)
-                    text[edge] = "{:.4g}kN".format(abs(f))
+                    elements['edgelabel']['force', edge] = midpoint[edge], "{:.4g}kN".format(abs(f)), tuple(color[edge])
 
-                color = {}
-                color.update({edge: self.settings['color.edges'] for edge in edges})
-                color.update({edge: self.settings['color.edges:is_external'] for edge in self.diagram.edges_where_dual({'is_external': True})})
-                color.update({edge: self.settings['color.edges:is_load'] for edge in self.diagram.edges_where_dual({'is_load': True})})
-                color.update({edge: self.settings['color.edges:is_reaction'] for edge in self.diagram.edges_where_dual({'is_reaction': True})})
-                color.update({edge: self.settings['color.edges:is_ind'] for edge in self.diagram.edges_where_dual({'is_ind': True})})
-
-                # force colors
-                if self.settings['show.forcecolors']:
-                    tol = self.settings['tol.forces']
-                    for edge in self.diagram.edges_where_dual({'is_external': False}):
-                        if self.diagram.dual_edge_force(edge) > + tol:
-                            color[edge] = self.settings['color.tension']
-                        elif self.diagram.dual_edge_force(edge) < - tol:
-                            color[edge] = self.settings['color.compression']
-
-                guids = self.artist.draw_edgelabels(text=text, color=color)
-
-                guid_edgelabel += zip(guids, edges)
-
-            self.guid_edgelabel = guid_edgelabel
-
-        self.redraw()
+        self.draw_elements(elements)
 
     def draw_highlight_edge(self, edge):
 
@@ -208,7 +183,7 @@ class ForceObject(DiagramObject):
             elif f < - tol:
                 color[edge] = self.settings['color.compression']
 
-        guid_edgelabel = self.artist.draw_edgelabels(text=text, color=color)
-        self.guid_edgelabel = zip(guid_edgelabel, edge)
+        # the highlight is removed the next time the diagram is drawn
+        self._guids += self.artist.draw_edgelabels(text=text, color=color)
 
         self.redraw()
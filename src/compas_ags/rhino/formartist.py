@@ -7,6 +7,7 @@ import compas_rhino
 from functools import partial
 from math import fabs
 from compas_ags.rhino.diagramartist import DiagramArtist
+from compas_ags.utilities import pipe_mesh
 from compas.utilities import color_to_colordict
 
 colordict = partial(color_to_colordict, colorformat='rgb', normalize=False)
@@ -42,6 +43,31 @@ class FormArtist(DiagramArtist):
         self.scale_forces = 0.01
         self.tol_forces = 0.001
 
+    def edge_arrow(self, edge, leaves):
+        """Determine the position of the arrow head of an edge.
+
+        Parameters
+        ----------
+        edge : tuple of int
+            The identifier of the edge.
+        leaves : set
+            The leaves of the diagram.
+
+        Returns
+        -------
+        str or None
+            ``'start'`` or ``'end'`` for loads and reactions,
+            None for edges without an arrow.
+        """
+        if not self.diagram.edge_attribute(edge, 'is_external'):
+            return None
+        f = self.diagram.edge_attribute(edge, 'f')
+        if f > 0:
+            return 'start' if edge[0] in leaves else 'end'
+        if f < 0:
+            return 'start' if edge[1] in leaves else 'end'
+        return None
+
     def draw_edges(self, edges=None, color=None):
         """Draw a selection of edges.
 
@@ -60,19 +86,13 @@ class FormArtist(DiagramArtist):
             The GUIDs of the created Rhino objects.
 
         """
-        leaves = set(self.diagram.leaves())
+        leaves = self.diagram.leaf_set()
         edges = edges or list(self.diagram.edges())
         vertex_xyz = self.vertex_xyz
         edge_color = colordict(color, edges, default=self.color_edges)
         lines = []
         for edge in edges:
-            arrow = None
-            if self.diagram.edge_attribute(edge, 'is_external'):
-                f = self.diagram.edge_attribute(edge, 'f')
-                if f > 0:
-                    arrow = 'start' if edge[0] in leaves else 'end'
-                elif f < 0:
-                    arrow = 'start' if edge[1] in leaves else 'end'
+            arrow = self.edge_arrow(edge, leaves)
             lines.append({
                 'start': vertex_xyz[edge[0]],
                 'end': vertex_xyz[edge[1]],
@@ -81,7 +101,7 @@ class FormArtist(DiagramArtist):
                 'arrow': arrow})
         return compas_rhino.draw_lines(lines, layer=self.layer, clear=False, redraw=False)
 
-    def draw_forcepipes(self, color_compression=None, color_tension=None, scale=None, tol=None):
+    def draw_forcepipes(self, color_compression=None, color_tension=None, scale=None, tol=None, edges=None):
         """Draw the forces in the internal edges as pipes with color and thickness matching the force value.
 
         Parameters
@@ -90,6 +110,9 @@ class FormArtist(DiagramArtist):
         color_tension
         scale
         tol
+        edges : list, optional
+            A selection of internal edges.
+            The default is ``None``, in which case all internal edges are considered.
 
         Returns
         -------
@@ -101,19 +124,49 @@ class FormArtist(DiagramArtist):
         scale = scale or self.scale_forces
         tol = tol or self.tol_forces
         vertex_xyz = self.vertex_xyz
-        edges = []
+        if edges is None:
+            edges = self.diagram.edges_where({'is_external': False})
         pipes = []
-        for edge in self.diagram.edges_where({'is_external': False}):
+        for edge in edges:
             force = self.diagram.edge_attribute(edge, 'f')
             if not force:
                 continue
             radius = fabs(scale * force)
             if radius < tol:
                 continue
-            edges.append(edge)
             color = color_tension if force > 0 else color_compression
             pipes.append({'points': [vertex_xyz[edge[0]], vertex_xyz[edge[1]]],
                           'color': color,
                           'radius': radius,
                           'name': "{}.force.{}-{}".format(self.diagram.name, *edge)})
         return compas_rhino.draw_pipes(pipes, layer=self.layer, clear=False, redraw=False)
+
+    def draw_forcemesh(self, pipes, color, sides=8, name='forces'):
+        """Draw a collection of force pipes as one mesh.
+
+        Parameters
+        ----------
+        pipes : list
+            Per pipe, the XYZ coordinates of its start and end, and its radius.
+        color : tuple
+            The color of the mesh.
+        sides : int, optional
+            The number of sides of every pipe.
+            Default is ``8``.
+        name : str, optional
+            The name of the mesh, after the name of the diagram.
+
+        Returns
+        -------
+        GUID
+            The GUID of the created Rhino object.
+
+        Notes
+        -----
+        The faces of pipe ``i`` are faces ``i * sides`` to ``(i + 1) * sides - 1`` of the mesh.
+        """
+        vertices, faces = pipe_mesh(pipes, sides=sides)
+        return compas_rhino.draw_mesh(vertices, faces,
+                                      name="{}.{}".format(self.diagram.name, name),
+                                      color=color,
+                                      layer=self.layer, clear=False, redraw=False)
@@ -2,6 +2,10 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
+from math import fabs
+
+import scriptcontext as sc
+
 import compas_rhino
 from compas_ags.rhino.diagramobject import DiagramObject
 from compas_ags.rhino.forminspector import FormDiagramVertexInspector
@@ -10,10 +14,23 @@ from compas_ags.rhino.forminspector import FormDiagramVertexInspector
 __all__ = ['FormObject']
 
 
+find_object = sc.doc.Objects.Find
+
+
 class FormObject(DiagramObject):
     """A form object represents a form diagram in the Rhino model space.
+
+    Notes
+    -----
+    With the setting ``'render.batched'``, all tension pipes and all compression pipes
+    are drawn as one mesh each.
+    The edge of a pipe is identified from the faces of the mesh (see :meth:`edge_at`).
     """
 
+    ELEMENTS = dict(DiagramObject.ELEMENTS, force=('guid_force', None), forcemesh=('guid_forcemesh', None))
+
+    FORCEMESH_SIDES = 8
+
     SETTINGS = {
         'show.vertices': True,
         'show.edges': True,
@@ -23,6 +40,14 @@ class FormObject(DiagramObject):
         'show.forcelabels': True,
         'show.forcepipes': False,
 
+        'render.batched': False,
+        'render.conduit': False,
+
+        'lod.labels': False,
+        'lod.minsize': 40,
+        'lod.maxlabels': 200,
+        'lod.maxforces': 10,
+
         'color.vertices': (0, 0, 0),
         'color.vertexlabels': (255, 255, 255),
         'color.vertices:is_fixed': (0, 255, 255),
@@ -48,6 +73,7 @@ class FormObject(DiagramObject):
         if settings:
             self.settings.update(settings)
         self._guid_force = {}
+        self._guid_forcemesh = {}
         self._inspector = None
 
     @property
@@ -69,6 +95,7 @@ class FormObject(DiagramObject):
     def guids(self):
         guids = super(FormObject, self).guids
         guids += list(self.guid_force.keys())
+        guids += list(self.guid_forcemesh.keys())
         return guids
 
     @property
@@ -80,10 +107,75 @@ class FormObject(DiagramObject):
     def guid_force(self, values):
         self._guid_force = dict(values)
 
+    @property
+    def guid_forcemesh(self):
+        """Map between Rhino object GUIDs and the keys of the meshes of force pipes."""
+        return self._guid_forcemesh
+
+    @guid_forcemesh.setter
+    def guid_forcemesh(self, values):
+        self._guid_forcemesh = dict(values)
+
     def clear(self):
         super(FormObject, self).clear()
         compas_rhino.delete_objects(self.guids, purge=True)
         self._guid_force = {}
+        self._guid_forcemesh = {}
+
+    def _create_force(self, keys, elements):
+        return self.artist.draw_forcepipes(
+            color_compression=self.settings['color.compression'],
+            color_tension=self.settings['color.tension'],
+            scale=self.settings['scale.forces'],
+            tol=self.settings['tol.forces'],
+            edges=keys)
+
+    def _create_forcemesh(self, keys, elements):
+        guids = []
+        for key in keys:
+            edges, pipes, color = elements[key]
+            guids.append(self.artist.draw_forcemesh(pipes, color, sides=self.FORCEMESH_SIDES, name=key))
+        return guids
+
+    def batch_elements(self, elements):
+        """Combine the elements of the diagram into batches that are drawn as one Rhino object.
+
+        In addition to the edges (see :meth:`DiagramObject.batch_elements`),
+        the force pipes are combined into one mesh for tension and one for compression.
+        """
+        elements = super(FormObject, self).batch_elements(elements)
+        forces = elements.get('force')
+        if not forces:
+            return elements
+        elements['force'] = {}
+        elements['forcemesh'] = {}
+        color_key = {tuple(self.settings['color.tension']): 'tension', tuple(self.settings['color.compression']): 'compression'}
+        groups = {}
+        for edge in sorted(forces):
+            start, end, radius, color = forces[edge]
+            groups.setdefault(color, []).append(edge)
+        for color, edges in groups.items():
+            pipes = tuple(forces[edge][:3] for edge in edges)
+            elements['forcemesh'][color_key.get(color, 'forces')] = tuple(edges), pipes, color
+        return elements
+
+    def edge_at(self, guid, point=None):
+        """Identify the edge represented by a Rhino object at a location.
+
+        In addition to edges (see :meth:`DiagramObject.edge_at`),
+        the edges of force pipes are identified from the face of the mesh closest to the point.
+        """
+        edge = super(FormObject, self).edge_at(guid, point)
+        if edge:
+            return edge
+        if guid in self.guid_force:
+            return self.guid_force[guid]
+        if guid in self.guid_forcemesh and point is not None and point.IsValid:
+            edges = self._drawn['forcemesh'][self.guid_forcemesh[guid]][1][0]
+            meshpoint = find_object(guid).Geometry.ClosestMeshPoint(point, 0.0)
+            if meshpoint:
+                return edges[meshpoint.FaceIndex // self.FORCEMESH_SIDES]
+        return None
 
     def draw(self):
         """Draw the form diagram.
@@ -92,8 +184,9 @@ class FormObject(DiagramObject):
         drawn by this method can be fully customised using the configuration items
         in the settings dict: ``FormArtist.settings``.
 
-        The method will clear the scene of any objects it has previously drawn
-        and keep track of any newly created objects using their GUID.
+        The method keeps track of the objects it has drawn using their GUID,
+        and only updates the objects of vertices and edges that changed since the previous call
+        (see :meth:`DiagramObject.draw_elements`).
 
         Parameters
         ----------
@@ -104,11 +197,14 @@ class FormObject(DiagramObject):
         None
 
         """
-        self.clear()
         if not self.visible:
+            self.clear()
             return
 
-        self.artist.vertex_xyz = self.vertex_xyz
+        vertex_xyz = self.vertex_xyz
+        self.artist.vertex_xyz = vertex_xyz
+        xyz = {vertex: tuple(vertex_xyz[vertex]) for vertex in self.diagram.vertices()}
+        elements = {}
 
         # vertices
         if self.settings['show.vertices']:
@@ -116,8 +212,7 @@ class FormObject(DiagramObject):
             color = {}
             color.update({vertex: self.settings['color.vertices'] for vertex in vertices})
             color.update({vertex: self.settings['color.vertices:is_fixed'] for vertex in self.diagram.vertices_where({'is_fixed': True})})
-            guids = self.artist.draw_vertices(color=color)
-            self.guid_vertex = zip(guids, vertices)
+            elements['vertex'] = {vertex: (xyz[vertex], tuple(color[vertex])) for vertex in vertices}
 
             # vertex labels
             if self.settings['show.vertexlabels']:
@@ -125,8 +220,7 @@ class FormObject(DiagramObject):
                 color = {}
                 color.update({vertex: self.settings['color.vertexlabels'] for vertex in vertices})
                 color.update({vertex: self.settings['color.vertices:is_fixed'] for vertex in self.diagram.vertices_where({'is_fixed': True})})
-                guids = self.artist.draw_vertexlabels(text=text, color=color)
-                self.guid_vertexlabel = zip(guids, vertices)
+                elements['vertexlabel'] = {vertex: (xyz[vertex], str(text[vertex]), tuple(color[vertex])) for vertex in vertices}
 
         # edges
         if self.settings['show.edges']:
@@ -147,72 +241,42 @@ class FormObject(DiagramObject):
                     elif self.diagram.edge_attribute(edge, 'f') < - tol:
                         color[edge] = self.settings['color.compression']
 
-            guids = self.artist.draw_edges(color=color)
-            self.guid_edge = zip(guids, edges)
-
-            guid_edgelabel = []
+            leaves = self.diagram.leaf_set()
+            elements['edge'] = {(u, v): (xyz[u], xyz[v], tuple(color[u, v]), self.artist.edge_arrow((u, v), leaves)) for u, v in edges}
+            midpoint = {(u, v): tuple(0.5 * (a + b) for a, b in zip(xyz[u], xyz[v])) for u, v in edges}
+            elements['edgelabel'] = {}
 
             # edge labels
+            # the labels have the same color as the edges
             if self.settings['show.edgelabels']:
-                text = {edge: index for index, edge in enumerate(edges)}
-                color = {}
-                color.update({edge: self.settings['color.edges'] for edge in edges})
-                color.update({edge: self.settings['color.edges:is_external'] for edge in self.diagram.edges_where({'is_external': True})})
-                color.update({edge: self.settings['color.edges:is_load'] for edge in self.diagram.edges_where({'is_load': True})})
-                color.update({edge: self.settings['color.edges:is_reaction'] for edge in self.diagram.edges_where({'is_reaction': True})})
-                color.update({edge: self.settings['color.edges:is_ind'] for edge in self.diagram.edges_where({'is_ind': True})})
-
-                # force colors
-                if self.settings['show.forcecolors']:
-                    tol = self.settings['tol.forces']
-                    for edge in self.diagram.edges_where({'is_external': False}):
-                        if self.diagram.edge_attribute(edge, 'f') > + tol:
-                            color[edge] = self.settings['color.tension']
-                        elif self.diagram.edge_attribute(edge, 'f') < - tol:
-                            color[edge] = self.settings['color.compression']
-
-                guids = self.artist.draw_edgelabels(text=text, color=color)
-                guid_edgelabel += zip(guids, edges)
+                for index, edge in enumerate(edges):
+                    elements['edgelabel']['edge', edge] = midpoint[edge], str(index), tuple(color[edge])
 
             # force labels
             if self.settings['show.forcelabels']:
-                text = {}
-                for index, edge in enumerate(self.diagram.edges_where({'is_external': True})):
-                    f = self.diagram.edge_attribute(edge, 'f')
-                    if f != 0.0:
-                        text[edge] = "{:.4g}kN".format(abs(f))
                 color = {}
-                # color.update({edge: self.settings['color.edges'] for edge in self.diagram.edges()})
                 color.update({edge: self.settings['color.edges:is_external'] for edge in self.diagram.edges_where({'is_external': True})})
                 color.update({edge: self.settings['color.edges:is_load'] for edge in self.diagram.edges_where({'is_load': True})})
                 color.update({edge: self.settings['color.edges:is_reaction'] for edge in self.diagram.edges_where({'is_reaction': True})})
                 color.update({edge: self.settings['color.edges:is_ind'] for edge in self.diagram.edges_where({'is_ind': True})})
-
-                # # force colors
-                # if self.settings['show.forcecolors']:
-                #     tol = self.settings['tol.forces']
-                #     for edge in self.diagram.edges_where({'is_external': False}):
-                #         if self.diagram.edge_attribute(edge, 'f') > + tol:
-                #             color[edge] = self.settings['color.tension']
-                #         elif self.diagram.edge_attribute(edge, 'f') < - tol:
-                #             color[edge] = self.settings['color.compression']
-
-                guids = self.artist.draw_edgelabels(text=text, color=color)
-                guid_edgelabel += zip(guids, edges)
-
-            self.guid_edgelabel = guid_edgelabel
+                for edge in self.diagram.edges_where({'is_external': True}):
+                    f = self.diagram.edge_attribute(edge, 'f')
+                    if f != 0.0:
+                        elements['edgelabel']['force', edge] = midpoint[edge], "{:.4g}kN".format(abs(f)), tuple(color[edge])
 
         # force pipes
         if self.settings['show.forcepipes']:
-            guids = self.artist.draw_forcepipes(
-                color_compression=self.settings['color.compression'],
-                color_tension=self.settings['color.tension'],
-                scale=self.settings['scale.forces'],
-                tol=self.settings['tol.forces'])
-
-            self.guid_force = zip(guids, edges)
-
-        self.redraw()
+            scale = self.settings['scale.forces'] or self.artist.scale_forces
+            tol = self.settings['tol.forces'] or self.artist.tol_forces
+            elements['force'] = {}
+            for edge in self.diagram.edges_where({'is_external': False}):
+                f = self.diagram.edge_attribute(edge, 'f')
+                if not f or fabs(scale * f) < tol:
+                    continue
+                color = self.settings['color.tension'] if f > 0 else self.settings['color.compression']
+                elements['force'][edge] = xyz[edge[0]], xyz[edge[1]], fabs(scale * f), tuple(color)
+
+        self.draw_elements(elements)
 
     def draw_highlight_edge(self, edge):
 
@@ -238,7 +302,7 @@ class FormObject(DiagramObject):
             elif f < - tol:
                 color[edge] = self.settings['color.compression']
 
-        guid_edgelabel = self.artist.draw_edgelabels(text=text, color=color)
-        self.guid_edgelabel = zip(guid_edgelabel, edge)
+        # the highlight is removed the next time the diagram is drawn
+        self._guids += self.artist.draw_edgelabels(text=text, color=color)
 
         self.redraw()
@@ -0,0 +1,187 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import System
+from System.Collections.Generic import List
+from System.Drawing.Color import FromArgb
+
+import Rhino
+from Rhino.Geometry import Point3d
+from Rhino.Geometry import Line
+
+import scriptcontext as sc
+
+from compas_ags.utilities import LatestJobWorker
+
+
+__all__ = ['ReciprocalPreview']
+
+
+class ReciprocalPreview(object):
+    """Live preview of the form diagram while vertices of the force diagram are moved.
+
+    Parameters
+    ----------
+    form : :class:`compas_ags.rhino.FormObject`
+        The form diagram object.
+    force : :class:`compas_ags.rhino.ForceObject`
+        The force diagram object.
+    proxy : :class:`compas.rpc.Proxy`
+        A proxy for the AGS server.
+    kmax : int, optional
+        The maximum number of iterations of the solver.
+        Default is ``100``.
+    color : tuple, optional
+        The color of the preview lines.
+        Default is ``(255, 0, 255)``.
+
+    Attributes
+    ----------
+    worker : :class:`compas_ags.utilities.LatestJobWorker`
+        The worker solving for the form diagram in the background.
+
+    Notes
+    -----
+    The diagrams are registered with the server once (see :func:`compas_ags.ags.register_diagrams_proxy`),
+    after which every solve only transfers the coordinates of the vertices of the force diagram,
+    and returns the coordinates of the vertices of the form diagram (see :func:`compas_ags.ags.session_update_form_proxy`).
+
+    Coordinates are submitted to the worker from the dynamic draw callback of the move operation,
+    which never waits for a solve to complete.
+    Requests that are superseded before the worker gets to them are dropped,
+    and the preview always shows the most recent solution that is available.
+    When a new solution is available, the views are redrawn such that it is shown
+    even if the cursor does not move.
+
+    The proxy should not be used for anything else while the preview is open.
+    The diagrams themselves are not modified.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        with ReciprocalPreview(form, force, proxy) as preview:
+            force.move_vertices(vertices, preview=preview)
+
+    """
+
+    def __init__(self, form, force, proxy, kmax=100, color=None):
+        self.form = form
+        self.force = force
+        self.proxy = proxy
+        self.kmax = kmax
+        self.color = FromArgb(*(color or (255, 0, 255)))
+        self.vertex_index = force.diagram.vertex_index()
+        self.form_vertices = list(form.diagram.vertices())
+        self.form_edges = list(form.diagram.edges())
+        self.xy = None
+        self._z = {vertex: form.diagram.vertex_attribute(vertex, 'z') for vertex in self.form_vertices}
+        self._package = proxy.package
+        self._lines = None
+        self._sequence = None
+        self._start = 0
+        self._submitted = None
+        self.worker = LatestJobWorker(self._solve, name='AGS preview', callback=self._redraw)
+        self.reset()
+        proxy.package = 'compas_ags.ags'
+        self.key = proxy.register_diagrams_proxy(form.diagram.data, force.diagram.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _solve(self, xy):
+        return self.proxy.session_update_form_proxy(self.key, xy, self.kmax)[0]
+
+    def _redraw(self, sequence, result):
+        Rhino.RhinoApp.InvokeOnUiThread(System.Action(sc.doc.Views.Redraw))
+
+    def reset(self):
+        """Reset the preview at the start of a move operation.
+
+        The current coordinates of the force diagram become the reference for the submitted displacements,
+        and solutions of earlier requests are no longer shown.
+        """
+        self.xy = [c for xy in self.force.diagram.vertices_attributes('xy') for c in xy]
+        self._start = self.worker.submitted
+        self._submitted = None
+
+    def submit(self, vertex_vector):
+        """Submit a displacement of vertices of the force diagram to the solver.
+
+        Parameters
+        ----------
+        vertex_vector : dict
+            Displacement vectors of the moved vertices, in the coordinate system of the force diagram.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Submitting the same displacement as the previous one has no effect.
+        This is the case when the views are redrawn to show a new solution, without the cursor moving.
+        """
+        if vertex_vector == self._submitted:
+            return
+        self._submitted = vertex_vector
+        xy = self.xy[:]
+        for vertex, vector in vertex_vector.items():
+            index = self.vertex_index[vertex]
+            xy[2 * index] += vector[0]
+            xy[2 * index + 1] += vector[1]
+        self.worker.submit(xy)
+
+    def lines(self):
+        """The lines of the most recently solved form diagram, in the Rhino view.
+
+        Returns
+        -------
+        :class:`System.Collections.Generic.List` of :class:`Rhino.Geometry.Line` or None
+            None if no solution is available yet.
+        """
+        result = self.worker.result()
+        if not result or result[0] <= self._start:
+            return None
+        sequence, xy = result
+        if sequence != self._sequence:
+            vertex_xyz = {vertex: [xy[2 * index], xy[2 * index + 1], self._z[vertex]] for index, vertex in enumerate(self.form_vertices)}
+            vertex_xyz = self.form.view_coordinates(vertex_xyz)
+            lines = List[Line](len(self.form_edges))
+            for u, v in self.form_edges:
+                lines.Add(Line(Point3d(* vertex_xyz[u]), Point3d(* vertex_xyz[v])))
+            self._lines = lines
+            self._sequence = sequence
+        return self._lines
+
+    def draw(self, display):
+        """Draw the most recently solved form diagram.
+
+        Parameters
+        ----------
+        display : :class:`Rhino.Display.DisplayPipeline`
+            The display pipeline of the dynamic draw callback.
+        """
+        lines = self.lines()
+        if lines:
+            display.DrawLines(lines, self.color)
+
+    def close(self):
+        """Stop the solver and release the diagrams on the server."""
+        self.worker.close()
+        try:
+            self.proxy.release_diagrams_proxy(self.key)
+        finally:
+            self.proxy.package = self._package
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -3,9 +3,14 @@ from __future__ import absolute_import
 from __future__ import division
 
 from uuid import uuid4
+from copy import deepcopy
 
 import compas_rhino
 from compas_ags.rhino.diagramobject import DiagramObject
+from compas_ags.utilities import History
+from compas_ags.utilities import diagram_snapshot
+from compas_ags.utilities import diagram_restore
+from compas_ags.utilities import diagram_patch
 import scriptcontext as sc
 
 __all__ = ['Scene']
@@ -19,6 +24,9 @@ class Scene(object):
     objects : dict
         Mapping between GUIDs and diagram objects added to the scene.
         The GUIDs are automatically generated and assigned.
+    history : :class:`compas_ags.utilities.History`
+        The undo history of the scene.
+        None if the scene has no database to store the history in.
 
     Examples
     --------
@@ -42,10 +50,9 @@ class Scene(object):
 
     """
 
-    def __init__(self, db=None, depth=10, settings=None):
-        self._current = -1
-        self._depth = depth
+    def __init__(self, db=None, budget=64 * 1024 ** 2, settings=None, writebehind=True):
         self._db = db
+        self.history = History(db, budget, writebehind=writebehind) if db is not None else None
         self.objects = {}
         self.settings = settings or {}
 
@@ -135,7 +142,11 @@ class Scene(object):
         compas_rhino.rs.Redraw()
 
     def redraw(self):
-        """Redraw the entire scene."""
+        """Redraw the entire scene.
+
+        Objects that were drawn before only update the Rhino objects of the elements
+        of their diagrams that changed since.
+        """
         compas_rhino.rs.EnableRedraw(False)
         try:
             for guid in self.objects:
@@ -146,42 +157,118 @@ class Scene(object):
         compas_rhino.rs.Redraw()
 
     def update(self):
-        """Redraw all objects in the scene."""
-        self.clear()
+        """Redraw all objects in the scene.
+
+        Only the Rhino objects of elements that changed are updated.
+        To draw everything from scratch, clear the scene first.
+        """
         self.redraw()
 
-    def save(self):
-        if not self._db:
-            return
-        states = self._db['states']
-        if self._current < -1:
-            del states[self._current + 1:]
-        self._current = -1
-        state = []
+    # ==========================================================================
+    # History
+    # ==========================================================================
+
+    def state(self):
+        """Capture the current state of the objects in the scene.
+
+        Returns
+        -------
+        dict
+            The properties and a snapshot of the diagram of every object, per GUID.
+        """
+        state = {}
         for guid, obj in self.objects.items():
-            # the definition of a state should be formalised
-            # this is equivalent to the data schema of data objects
-            # the scene has a state schema
-            # whether or not to store a state could be the responsibility of the caller...
-            state.append({
+            state[guid] = {
                 'object': {
                     'name': obj.name,
                     'layer': obj.layer,
                     'visible': obj.visible,
-                    'settings': obj.settings,
+                    'settings': deepcopy(obj.settings),
                     'anchor': obj.anchor,
                     'location': list(obj.location),
                     'scale': obj.scale,
                 },
-                'diagram': {
-                    'type': type(obj.diagram),
-                    'data': obj.diagram.to_data(),
-                },
-            })
-        states.append(state)
-        if len(states) > self._depth:
-            del states[0]
-        self._db['states'] = states
+                'diagram': diagram_snapshot(obj.diagram),
+            }
+        return state
+
+    def _set_properties(self, obj, properties):
+        obj.name = properties['name']
+        obj.layer = properties['layer']
+        obj.visible = properties['visible']
+        obj.settings.update(deepcopy(properties['settings']))
+        obj.anchor = properties['anchor']
+        obj.location = properties['location']
+        obj.scale = properties['scale']
+
+    def _restore(self, state):
+        for guid in list(self.objects.keys()):
+            if guid not in state or type(self.objects[guid].diagram) is not state[guid]['diagram']['type']:
+                self.objects[guid].clear()
+                del self.objects[guid]
+        for guid, data in state.items():
+            obj = self.objects.get(guid)
+            if obj:
+                diagram_restore(obj.diagram, data['diagram'])
+            else:
+                diagram = data['diagram']['type']()
+                diagram_restore(diagram, data['diagram'])
+                properties = data['object']
+                obj = DiagramObject.build(diagram, scene=self,
+                                          name=properties['name'],
+                                          layer=properties['layer'],
+                                          visible=properties['visible'],
+                                          settings=deepcopy(properties['settings']))
+                self.objects[guid] = obj
+            self._set_properties(obj, data['object'])
+        form = None
+        force = None
+        for obj in self.objects.values():
+            if obj.name == 'Form':
+                form = obj
+            elif obj.name == 'Force':
+                force = obj
+        if form and force:
+            form.diagram.dual = force.diagram
+            force.diagram.dual = form.diagram
+
+    def _patch(self, delta, new):
+        for guid, data in delta.items():
+            obj = self.objects[guid]
+            if 'diagram' in data:
+                diagram_patch(obj.diagram, data['diagram'], new)
+            if 'object' in data:
+                self._set_properties(obj, data['object'][1 if new else 0])
+
+    def _apply(self, steps):
+        compas_rhino.rs.EnableRedraw(False)
+        try:
+            for step in steps:
+                if step[0] == 'keyframe':
+                    self._restore(step[1])
+                else:
+                    self._patch(step[1], step[2])
+            self.history.sync(self.state())
+        finally:
+            compas_rhino.rs.EnableRedraw(True)
+        self.redraw()
+
+    def save(self):
+        """Record the current state of the scene in the undo history.
+
+        Only the attributes that changed since the previously recorded state are stored,
+        unless the objects in the scene or the topology of their diagrams changed.
+        With write-behind enabled, the state is only captured in memory,
+        and compared, serialised and written to the database on a background thread.
+        An error raised while writing a previously saved state is raised here,
+        or by :meth:`undo` and :meth:`redo`.
+        """
+        if not self.history:
+            return
+        if self.history.writebehind:
+            self.history.submit(self.state())
+        elif not self.history.record(self.state()):
+            return
 
         # Insert custom undo/redo event
         def undo_redo(sender, e):
@@ -198,73 +285,37 @@ class Scene(object):
     def undo(self):
         """Undo scene updates.
 
+        The diagrams of the objects in the scene are patched in place.
+
         Returns
         -------
         bool
             False if there is nothing (more) to undo.
             True if undo was successful.
         """
-        if not self._db:
+        if not self.history:
             return
-        if self._current <= - self._depth:
+        steps = self.history.undo()
+        if not steps:
             return False
-        if len(self._db['states']) < 2:
-            return False
-        self.purge()
-        self._current -= 1
-        state = self._db['states'][self._current]
-        form = None
-        force = None
-        for data in state:
-            diagram = data['diagram']['type'].from_data(data['diagram']['data'])
-            guid = self.add(diagram, name=data['object']['name'], layer=data['object']['layer'], visible=data['object']['visible'], settings=data['object']['settings'])
-            obj = self.find(guid)
-            obj.anchor = data['object']['anchor']
-            obj.location = data['object']['location']
-            obj.scale = data['object']['scale']
-            if obj.name == 'Form':
-                form = obj
-            elif obj.name == 'Force':
-                force = obj
-        if form and force:
-            form.diagram.dual = force.diagram
-            force.diagram.dual = form.diagram
-        self.redraw()
+        self._apply(steps)
         return True
 
     def redo(self):
         """Redo scene updates.
 
+        The diagrams of the objects in the scene are patched in place.
+
         Returns
         -------
         bool
             False if there is nothing (more) to redo.
             True if redo was successful.
         """
-        if not self._db:
+        if not self.history:
             return
-        if len(self._db['states']) < 2:
-            return False
-        if self._current >= -1:
+        steps = self.history.redo()
+        if not steps:
             return False
-        self.purge()
-        self._current += 1
-        state = self._db['states'][self._current]
-        form = None
-        force = None
-        for data in state:
-            diagram = data['diagram']['type'].from_data(data['diagram']['data'])
-            guid = self.add(diagram, name=data['object']['name'], layer=data['object']['layer'], visible=data['object']['visible'], settings=data['object']['settings'])
-            obj = self.find(guid)
-            obj.anchor = data['object']['anchor']
-            obj.location = data['object']['location']
-            obj.scale = data['object']['scale']
-            if obj.name == 'Form':
-                form = obj
-            elif obj.name == 'Force':
-                force = obj
-        if form and force:
-            form.diagram.dual = force.diagram
-            force.diagram.dual = form.diagram
-        self.redraw()
+        self._apply(steps)
         return True
@@ -0,0 +1,354 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import threading
+
+from functools import partial
+from time import time
+
+import System
+import Rhino
+
+from compas_ags.utilities import LatestJobWorker
+
+
+__all__ = ['AutoUpdateScheduler']
+
+
+EVICTED = 'No diagrams are registered under this key'
+
+
+def invoke_on_ui_thread(func, *args):
+    """Run a function on the UI thread of Rhino, without waiting for it."""
+    Rhino.RhinoApp.InvokeOnUiThread(System.Action(partial(func, *args)))
+
+
+class AutoUpdateScheduler(object):
+    """Debounced automatic update of the diagrams of a scene after edits.
+
+    Parameters
+    ----------
+    scene : :class:`compas_ags.rhino.Scene`
+        The scene with the form and force diagrams.
+    proxy : :class:`compas.rpc.Proxy`
+        A proxy for the AGS server that is used by the scheduler only.
+    delay : float, optional
+        The time window in seconds within which edits are combined into one update.
+        Default is ``0.3``.
+    dispatch : callable, optional
+        The function used to run the update of the scene on the UI thread:
+        ``dispatch(func, *args)``.
+        Default is :func:`invoke_on_ui_thread`.
+    callback : callable, optional
+        A function called on the UI thread after the diagrams were updated,
+        with the name of the diagram that was edited as argument.
+
+    Attributes
+    ----------
+    requested : int
+        The number of requested updates.
+    executed : int
+        The number of equilibrium solves that were run.
+    applied : int
+        The number of solves of which the result was applied to the scene.
+    discarded : int
+        The number of solves of which the result was discarded,
+        because the diagrams were edited again while they were running.
+
+    Notes
+    -----
+    Every call to :meth:`request` (re)starts a timer.
+    Only when no further updates are requested within ``delay`` seconds,
+    one equilibrium solve is run on the server, on a background thread.
+    The result is applied to the diagrams and the scene is redrawn on the UI thread.
+
+    The diagrams are registered with the server (see :func:`compas_ags.ags.register_diagrams_proxy`),
+    such that every solve only transfers the coordinates of the vertices, the force densities
+    and the independent edges, and reuses the matrices and factorisations cached in the session on the server
+    (see :func:`compas_ags.ags.session_update_q_proxy`, :func:`compas_ags.ags.session_update_force_proxy`
+    and :func:`compas_ags.ags.session_update_form_proxy`).
+    The diagrams are only registered again after their topology or their supports were modified,
+    or if the session was evicted from the server.
+
+    An update requested while a solve is waiting cancels that solve,
+    and an update requested while a solve is running invalidates its result,
+    such that only the most recent state of the diagrams is ever applied.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        scheduler = AutoUpdateScheduler(scene, Proxy())
+
+        while True:
+            vertices = form.select_vertices()
+            if not vertices:
+                break
+            if form.move_vertices(vertices):
+                scheduler.request('form')
+
+        scheduler.flush()
+        scene.save()
+
+    """
+
+    def __init__(self, scene, proxy, delay=0.3, dispatch=None, callback=None):
+        self.scene = scene
+        self.proxy = proxy
+        self.delay = delay
+        self.dispatch = dispatch or invoke_on_ui_thread
+        self.callback = callback
+        self.requested = 0
+        self.executed = 0
+        self.applied = 0
+        self.discarded = 0
+        self._source = None
+        self._generation = 0
+        self._current = 0
+        self._deadline = None
+        self._closed = False
+        self._timer = None
+        self._condition = threading.Condition()
+        self._signature = None
+        self._registration = None
+        self._key = None
+        self._registered = None
+        self.worker = LatestJobWorker(self._solve, name='AGS autoupdate', callback=self._solved)
+
+    @property
+    def skipped(self):
+        """int: The number of requested updates that were combined with later ones instead of being solved separately."""
+        return self.requested - self.executed
+
+    @property
+    def error(self):
+        """Exception or None: The error raised by the last solve on the background thread that failed."""
+        return self.worker.error
+
+    @property
+    def cancelled(self):
+        """int: The number of solves that were cancelled before they started, or of which the result was discarded."""
+        return self.worker.dropped + self.discarded
+
+    def _diagrams(self):
+        form = self.scene.find_by_name('Form')
+        force = self.scene.find_by_name('Force')
+        if not form or not force:
+            return None, None
+        return form[0].diagram, force[0].diagram
+
+    # ==========================================================================
+    # UI thread
+    # ==========================================================================
+
+    def request(self, source='form'):
+        """Request an update of the diagrams after an edit.
+
+        Parameters
+        ----------
+        source : {'form', 'force'}, optional
+            The diagram that was edited.
+            If the form diagram was edited, the force densities of the dependent edges
+            and the force diagram are updated.
+            If the force diagram was edited, the form diagram is updated.
+            If both were edited within the same time window, the most recently edited diagram is used.
+
+        Returns
+        -------
+        None
+        """
+        with self._condition:
+            self.requested += 1
+            self._generation += 1
+            self._source = source
+            self._deadline = time() + self.delay
+            if not self._timer or not self._timer.is_alive():
+                self._closed = False
+                self._timer = threading.Thread(target=self._wait, name='AGS autoupdate timer')
+                self._timer.daemon = True
+                self._timer.start()
+            self._condition.notify_all()
+        self.worker.cancel()
+
+    def pending(self):
+        """Verify if edits were made of which the result was not applied yet.
+
+        Returns
+        -------
+        bool
+        """
+        return self._current != self._generation
+
+    def flush(self):
+        """Apply all requested updates immediately.
+
+        This method should be called on the UI thread,
+        for example at the end of a command, before the state of the scene is saved.
+
+        Returns
+        -------
+        bool
+            True if an update was applied.
+
+        Raises
+        ------
+        Exception
+            Any error raised by the solver.
+        """
+        with self._condition:
+            self._deadline = None
+            generation = self._generation
+            source = self._source
+        self.worker.cancel()
+        self.worker.wait()
+        if self._current == generation:
+            return False
+        result = self.worker.result()
+        if result and result[1][0] == generation:
+            # solved, but not applied yet
+            return self._apply(result[1])
+        form, force = self._diagrams()
+        if not form:
+            return False
+        return self._apply(self._solve(*self._job(generation, source, form, force)))
+
+    def close(self):
+        """Cancel all updates, stop the background threads and release the diagrams on the server."""
+        with self._condition:
+            self._deadline = None
+            self._closed = True
+            self._condition.notify_all()
+        if self._timer:
+            self._timer.join()
+            self._timer = None
+        self.worker.close()
+        if self._key:
+            self.proxy.package = 'compas_ags.ags'
+            self.proxy.release_diagrams_proxy(self._key)
+            self._key = None
+            self._registered = None
+
+    def _job(self, generation, source, form, force):
+        # the arguments of a solve, collected on the UI thread
+        # the data of the diagrams is only collected for registration if the topology or the supports changed
+        signature = (id(form), id(force), form.topology_version, force.topology_version, form.fixed(), form.fixed_x(), form.fixed_y())
+        if signature != self._signature:
+            self._signature = signature
+            self._registration = signature, form.data, force.data
+        xy = [c for point in form.vertices_attributes('xy') for c in point]
+        _xy = [c for point in force.vertices_attributes('xy') for c in point]
+        q = form.edges_attribute('q')
+        ind = set(form.ind())
+        ind = [index for index, edge in enumerate(form.edges()) if edge in ind]
+        return generation, source, self._registration, xy, q, ind, _xy
+
+    def _start(self):
+        with self._condition:
+            generation = self._generation
+            source = self._source
+            if self._deadline is not None:
+                # the diagrams were edited again after the timer expired
+                return
+        if self._current == generation:
+            return
+        form, force = self._diagrams()
+        if not form:
+            return
+        self.worker.submit(*self._job(generation, source, form, force))
+
+    def _apply(self, result):
+        generation, source, xy, _xy, q, forces, lengths, angles = result
+        if generation != self._generation:
+            self.discarded += 1
+            return False
+        if generation == self._current:
+            # already applied by flush
+            return False
+        form, force = self._diagrams()
+        if not form:
+            return False
+        edges = list(form.edges())
+        if xy is not None:
+            for index, vertex in enumerate(form.vertices()):
+                form.vertex_attributes(vertex, 'xy', xy[2 * index:2 * index + 2])
+        if _xy is not None:
+            for index, vertex in enumerate(force.vertices()):
+                force.vertex_attributes(vertex, 'xy', _xy[2 * index:2 * index + 2])
+        for index, edge in enumerate(edges):
+            form.edge_attributes(edge, ['q', 'f', 'l'], [q[index], forces[index], lengths[index]])
+        if angles is not None:
+            # the angle deviations of the force diagram are those of the dual edges in the form diagram
+            edge_index = form.edge_index()
+            for index, edge in enumerate(edges):
+                form.edge_attribute(edge, 'a', angles[index])
+            for edge in force.edges():
+                index = edge_index[force.dual_edge(edge)]
+                force.edge_attributes(edge, ['a', 'l'], [angles[index], abs(forces[index])])
+        self._current = generation
+        self.applied += 1
+        self.scene.update()
+        if self.callback:
+            self.callback(source)
+        return True
+
+    # ==========================================================================
+    # Background threads
+    # ==========================================================================
+
+    def _wait(self):
+        while True:
+            with self._condition:
+                while self._deadline is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                remaining = self._deadline - time()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._deadline = None
+            self.dispatch(self._start)
+
+    def _register(self, registration):
+        signature, formdata, forcedata = registration
+        if self._key:
+            self.proxy.release_diagrams_proxy(self._key)
+            self._key = None
+        self._key = self.proxy.register_diagrams_proxy(formdata, forcedata)
+        self._registered = signature
+
+    def _solve(self, generation, source, registration, xy, q, ind, _xy):
+        with self._condition:
+            self.executed += 1
+        self.proxy.package = 'compas_ags.ags'
+        if self._registered != registration[0]:
+            self._register(registration)
+        try:
+            return self._update(generation, source, xy, q, ind, _xy)
+        except Exception as error:
+            # only a session that was evicted from the server after being idle for too long is registered again
+            # the server reports the KeyError of registered_session as the message of an RPCServerError
+            if EVICTED not in str(error):
+                raise
+            self._register(registration)
+            return self._update(generation, source, xy, q, ind, _xy)
+
+    def _update(self, generation, source, xy, q, ind, _xy):
+        if source == 'force':
+            xy, q, forces, lengths, angles = self.proxy.session_update_form_proxy(self._key, _xy=_xy, xy=xy)
+            return generation, source, xy, None, q, forces, lengths, angles
+        q, forces, lengths = self.proxy.session_update_q_proxy(self._key, xy=xy, q=q, ind=ind)
+        _xy = self.proxy.session_update_force_proxy(self._key, _xy=_xy)
+        return generation, source, None, _xy, q, forces, lengths, None
+
+    def _solved(self, sequence, result):
+        self.dispatch(self._apply, result)
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
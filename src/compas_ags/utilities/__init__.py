@@ -13,10 +13,71 @@ compas_ags.utilities
     compute_force_drawinglocation
     compute_form_forcescale
 
+
+Sessions
+========
+
+.. autosummary::
+    :toctree: generated/
+
+    SessionFile
+    save_session
+    read_session_header
+
+
+History
+=======
+
+.. autosummary::
+    :toctree: generated/
+
+    History
+    diagram_snapshot
+    diagram_restore
+    diagram_patch
+    snapshot_delta
+
+
+Spatial Indexing
+================
+
+.. autosummary::
+    :toctree: generated/
+
+    UniformGrid
+    DiagramIndex
+    distance_line_segment
+
+
+Scheduling
+==========
+
+.. autosummary::
+    :toctree: generated/
+
+    LatestJobWorker
+    BackgroundProxy
+
+
+Batching
+========
+
+.. autosummary::
+    :toctree: generated/
+
+    edge_chains
+    pipe_mesh
+    closest_segment
+
 """
 from __future__ import absolute_import
 
 from .displaysettings import *  # noqa: F401 F403
 from .equilibrium import *  # noqa: F401 F403
+from .sessionfile import *  # noqa: F401 F403
+from .history import *  # noqa: F401 F403
+from .spatial import *  # noqa: F401 F403
+from .scheduling import *  # noqa: F401 F403
+from .batching import *  # noqa: F401 F403
 
 __all__ = [name for name in dir() if not name.startswith('_')]
@@ -0,0 +1,170 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from math import cos
+from math import sin
+from math import pi
+from math import sqrt
+
+from compas.geometry import closest_point_on_segment
+from compas.geometry import distance_point_point_sqrd
+
+
+__all__ = [
+    'edge_chains',
+    'pipe_mesh',
+    'closest_segment',
+]
+
+
+def edge_chains(edges):
+    """Decompose a collection of edges into chains of consecutive edges.
+
+    Parameters
+    ----------
+    edges : list
+        The edges, as pairs of vertex identifiers.
+
+    Returns
+    -------
+    list
+        Per chain, the list of its vertices and the list of its edges.
+        Edge ``i`` of a chain connects vertices ``i`` and ``i + 1`` of the chain,
+        and is returned as it was given, regardless of its orientation in the chain.
+
+    Notes
+    -----
+    Every edge is part of exactly one chain.
+    Chains start from vertices with an odd number of remaining edges where possible,
+    which keeps the number of chains close to the minimum.
+    The result only depends on the order of the edges.
+
+    Examples
+    --------
+    >>> edge_chains([(0, 1), (1, 2), (2, 3)])
+    [([0, 1, 2, 3], [(0, 1), (1, 2), (2, 3)])]
+    >>> len(edge_chains([(0, 1), (0, 2), (0, 3)]))
+    2
+
+    """
+    adjacency = {}
+    vertices = []
+    for index, (u, v) in enumerate(edges):
+        for a, b in ((u, v), (v, u)):
+            if a not in adjacency:
+                adjacency[a] = {}
+                vertices.append(a)
+            adjacency[a][index] = b
+    chains = []
+    # first only start from vertices with an odd number of remaining edges
+    # the remaining edges then form closed loops
+    for odd in (True, False):
+        for start in vertices:
+            if odd and not len(adjacency[start]) % 2:
+                continue
+            if not adjacency[start]:
+                continue
+            chain = [start]
+            chain_edges = []
+            vertex = start
+            while adjacency[vertex]:
+                index = min(adjacency[vertex])
+                other = adjacency[vertex].pop(index)
+                adjacency[other].pop(index, None)
+                chain.append(other)
+                chain_edges.append(edges[index])
+                vertex = other
+            chains.append((chain, chain_edges))
+    return chains
+
+
+def pipe_mesh(pipes, sides=8):
+    """Construct one mesh for a collection of pipes.
+
+    Parameters
+    ----------
+    pipes : list
+        Per pipe, the XYZ coordinates of its start and end, and its radius.
+    sides : int, optional
+        The number of sides of every pipe.
+        Default is ``8``.
+
+    Returns
+    -------
+    tuple
+        The XYZ coordinates of the vertices and the faces of the mesh.
+        Faces ``i * sides`` to ``(i + 1) * sides - 1`` belong to pipe ``i``.
+
+    Examples
+    --------
+    >>> vertices, faces = pipe_mesh([([0, 0, 0], [1, 0, 0], 0.1)], sides=4)
+    >>> len(vertices), len(faces)
+    (8, 4)
+
+    """
+    vertices = []
+    faces = []
+    angles = [2 * pi * i / sides for i in range(sides)]
+    for start, end, radius in pipes:
+        dx, dy, dz = end[0] - start[0], end[1] - start[1], end[2] - start[2]
+        length = sqrt(dx ** 2 + dy ** 2 + dz ** 2) or 1.0
+        dx, dy, dz = dx / length, dy / length, dz / length
+        # a vector that is not parallel to the axis
+        ax, ay, az = (1.0, 0.0, 0.0) if abs(dx) < 0.9 else (0.0, 1.0, 0.0)
+        ux, uy, uz = dy * az - dz * ay, dz * ax - dx * az, dx * ay - dy * ax
+        norm = sqrt(ux ** 2 + uy ** 2 + uz ** 2)
+        ux, uy, uz = ux / norm, uy / norm, uz / norm
+        vx, vy, vz = dy * uz - dz * uy, dz * ux - dx * uz, dx * uy - dy * ux
+        offset = len(vertices)
+        for point in (start, end):
+            for angle in angles:
+                c = radius * cos(angle)
+                s = radius * sin(angle)
+                vertices.append([point[0] + c * ux + s * vx,
+                                 point[1] + c * uy + s * vy,
+                                 point[2] + c * uz + s * vz])
+        for i in range(sides):
+            j = (i + 1) % sides
+            faces.append([offset + i, offset + j, offset + sides + j, offset + sides + i])
+    return vertices, faces
+
+
+def closest_segment(point, points):
+    """Find the segment of a polyline closest to a point.
+
+    Parameters
+    ----------
+    point : list
+        XYZ coordinates of the point.
+    points : list
+        XYZ coordinates of the points of the polyline.
+
+    Returns
+    -------
+    int
+        The index of the segment.
+
+    Examples
+    --------
+    >>> closest_segment([1.5, 0.1, 0], [[0, 0, 0], [1, 0, 0], [2, 0, 0]])
+    1
+
+    """
+    best = None
+    index = None
+    for i in range(len(points) - 1):
+        closest = closest_point_on_segment(point, (points[i], points[i + 1]))
+        distance = distance_point_point_sqrd(point, closest)
+        if best is None or distance < best:
+            best = distance
+            index = i
+    return index
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,567 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import pickle
+import threading
+
+from time import time
+from copy import deepcopy
+
+from compas_ags.diagrams import pack_topology
+from compas_ags.diagrams import unpack_topology
+
+
+__all__ = [
+    'History',
+    'diagram_snapshot',
+    'diagram_restore',
+    'diagram_patch',
+    'snapshot_delta',
+]
+
+
+TABLES = ('vertex', 'edge', 'face')
+
+BUDGET = 64 * 1024 ** 2
+
+INTERVAL = 20
+
+
+# ==============================================================================
+# snapshots and deltas
+# ==============================================================================
+
+
+def _tables(diagram):
+    return {'vertex': diagram.vertex, 'edge': diagram.edgedata, 'face': diagram.facedata}
+
+
+def _meta(diagram):
+    return {
+        'attributes': diagram.attributes,
+        'dva': diagram.default_vertex_attributes,
+        'dea': diagram.default_edge_attributes,
+        'dfa': diagram.default_face_attributes,
+        'max_vertex': diagram._max_vertex,
+        'max_face': diagram._max_face,
+    }
+
+
+def diagram_snapshot(diagram):
+    """Take a snapshot of the data of a diagram.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+
+    Returns
+    -------
+    dict
+        The snapshot, with the topology of the diagram in binary format,
+        and copies of its attributes and of the attribute dicts of its vertices, edges and faces.
+
+    Notes
+    -----
+    Only the attribute dicts are copied, not the attribute values.
+    Values that are changed in place (for example lists) must be replaced instead.
+
+    The packed topology is cached on the diagram (see :meth:`compas_ags.diagrams.Diagram.view`)
+    and only packed again after the topology was modified,
+    such that a snapshot of a diagram of which only attributes changed, such as the coordinates,
+    costs no more than copying the attribute dicts.
+    """
+    diagram.flush_columns()
+    snapshot = {
+        'type': type(diagram),
+        'meta': deepcopy(_meta(diagram)),
+        'topology': diagram.view('history_topology', lambda: pack_topology(diagram, attributes=False), attributes=()),
+    }
+    for name, table in _tables(diagram).items():
+        snapshot[name] = {key: dict(attr) for key, attr in table.items()}
+    return snapshot
+
+
+def diagram_restore(diagram, snapshot):
+    """Restore the data of a diagram in place from a snapshot.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    snapshot : dict
+        A snapshot created by :func:`diagram_snapshot`.
+
+    Returns
+    -------
+    None
+    """
+    meta = deepcopy(snapshot['meta'])
+    for name in ('attributes', 'dva', 'dea', 'dfa'):
+        target = _meta(diagram)[name]
+        target.clear()
+        target.update(meta[name])
+    diagram._max_vertex = meta['max_vertex']
+    diagram._max_face = meta['max_face']
+    unpack_topology(diagram, snapshot['topology'])
+    for name, table in _tables(diagram).items():
+        for key, attr in snapshot[name].items():
+            table[key] = dict(attr)
+    diagram.invalidate()
+
+
+def diagram_patch(diagram, delta, new=True):
+    """Patch the data of a diagram in place with a delta.
+
+    Parameters
+    ----------
+    diagram : :class:`compas_ags.diagrams.Diagram`
+        The diagram.
+    delta : dict
+        A delta of a diagram computed by :func:`snapshot_delta`.
+    new : bool, optional
+        If True, the diagram is patched to the new state of the delta.
+        If False, to the old state.
+        Default is ``True``.
+
+    Returns
+    -------
+    None
+    """
+    side = 1 if new else 0
+    if delta.get('meta'):
+        meta = deepcopy(delta['meta'][side])
+        for name in ('attributes', 'dva', 'dea', 'dfa'):
+            target = _meta(diagram)[name]
+            target.clear()
+            target.update(meta[name])
+        diagram._max_vertex = meta['max_vertex']
+        diagram._max_face = meta['max_face']
+    for name, table in _tables(diagram).items():
+        for key, values in delta.get(name, {}).items():
+            value = values[side]
+            if value is None:
+                table.pop(key, None)
+            elif key in table:
+                table[key].clear()
+                table[key].update(value)
+            else:
+                table[key] = dict(value)
+    diagram.invalidate()
+
+
+def snapshot_delta(old, new):
+    """Compute the difference between two snapshots of a diagram with the same topology.
+
+    Parameters
+    ----------
+    old : dict
+        The old snapshot.
+    new : dict
+        The new snapshot.
+
+    Returns
+    -------
+    dict or None
+        The old and new attribute dicts of the vertices, edges and faces that changed,
+        and the old and new diagram attributes if they changed.
+        None if the topology of the snapshots is different.
+    """
+    if old['type'] is not new['type'] or old['topology'] != new['topology']:
+        return None
+    delta = {}
+    if old['meta'] != new['meta']:
+        delta['meta'] = (old['meta'], new['meta'])
+    for name in TABLES:
+        a = old[name]
+        b = new[name]
+        changes = {}
+        for key, attr in b.items():
+            if a.get(key) != attr:
+                changes[key] = (a.get(key), attr)
+        for key in a:
+            if key not in b:
+                changes[key] = (a[key], None)
+        if changes:
+            delta[name] = changes
+    return delta
+
+
+def _state_delta(old, new):
+    """Compute the difference between two states, or None if a keyframe is required."""
+    if old is None or set(old) != set(new):
+        return None
+    delta = {}
+    for key in new:
+        a = old[key]
+        b = new[key]
+        diagram = snapshot_delta(a['diagram'], b['diagram'])
+        if diagram is None:
+            return None
+        entry = {}
+        if diagram:
+            entry['diagram'] = diagram
+        if a['object'] != b['object']:
+            entry['object'] = (a['object'], b['object'])
+        if entry:
+            delta[key] = entry
+    return delta
+
+
+# ==============================================================================
+# history
+# ==============================================================================
+
+
+class History(object):
+    """Delta-based undo history of the states of a collection of diagram objects.
+
+    Parameters
+    ----------
+    db : dict-like, optional
+        Storage of the serialised history entries, for example a ``shelve`` database.
+        Default is an in-memory dict.
+    budget : int, optional
+        The maximum number of bytes of the serialised history entries.
+        Default is ``64 MB``.
+    interval : int, optional
+        The maximum number of deltas between two keyframes.
+        Default is ``20``.
+    writebehind : bool, optional
+        If True, states submitted with :meth:`submit` are compared, serialised and written
+        on a background thread.
+        Default is ``False``.
+
+    Attributes
+    ----------
+    error : Exception or None
+        The error raised on the background thread that was not yet re-raised by :meth:`flush`.
+
+    Notes
+    -----
+    A state is a dict mapping object keys to dicts with the properties of the objects (``'object'``)
+    and a snapshot of their diagram (``'diagram'``, see :func:`diagram_snapshot`).
+
+    The first state, states with a different set of objects or with a diagram with a different topology
+    than the previous state, and every ``interval`` states are stored as full keyframes.
+    All other states are stored as deltas with the old and new values of the changed attributes only.
+    When the history exceeds its budget, the oldest keyframe and its deltas are discarded.
+
+    The history does not modify any objects itself.
+    :meth:`undo` and :meth:`redo` return the steps needed to reach the target state,
+    which have to be applied by the owner of the objects.
+    Every step is either ``('keyframe', state)`` or ``('delta', delta, new)``,
+    where ``delta`` maps object keys to deltas of the object properties (``'object'``) and of the diagram (``'diagram'``),
+    and ``new`` indicates whether the new or old side of the delta should be applied.
+
+    With write-behind enabled, :meth:`submit` only queues the state and returns immediately.
+    The states queued while the background thread is busy are taken from the queue together,
+    but every state is still compared, serialised and written as its own entry,
+    since every call to :meth:`submit` corresponds to one undo step of the owner;
+    only the synchronisation of the database is shared by the states of a batch.
+    :meth:`undo`, :meth:`redo`, :meth:`record` and :meth:`clear` wait for all queued states
+    to be written first (see :meth:`flush`), so they never operate on a partially written history.
+    An error raised while writing a state on the background thread is re-raised by the next call to
+    :meth:`flush` or :meth:`submit`.
+    A state that fails to be written is not recorded, and the history is left as it was before.
+    """
+
+    def __init__(self, db=None, budget=BUDGET, interval=INTERVAL, writebehind=False):
+        self.db = db if db is not None else {}
+        self.budget = budget
+        self.interval = interval
+        self.writebehind = writebehind
+        self.entries = []
+        self.current = -1
+        self.state = None
+        self.error = None
+        self._counter = 0
+        self._pending = []
+        self._busy = False
+        self._closed = False
+        self._worker = None
+        self._condition = threading.Condition()
+
+    @property
+    def size(self):
+        """int: The total number of bytes of the serialised history entries."""
+        return sum(entry['size'] for entry in self.entries)
+
+    def can_undo(self):
+        return self.current > 0
+
+    def can_redo(self):
+        return self.current < len(self.entries) - 1
+
+    # --------------------------------------------------------------------------
+    # Storage
+    # --------------------------------------------------------------------------
+
+    def _write(self, data):
+        key = 'entry.{}'.format(self._counter)
+        self._counter += 1
+        self.db[key] = data
+        return key
+
+    def _read(self, index):
+        return pickle.loads(self.db[self.entries[index]['key']])
+
+    def _delete(self, entries):
+        for entry in entries:
+            if entry['key'] in self.db:
+                del self.db[entry['key']]
+
+    def _trim(self):
+        size = self.size
+        while size > self.budget:
+            keyframes = [index for index, entry in enumerate(self.entries) if entry['kind'] == 'keyframe']
+            if len(keyframes) < 2 or keyframes[1] > self.current:
+                break
+            stop = keyframes[1]
+            self._delete(self.entries[:stop])
+            size -= sum(entry['size'] for entry in self.entries[:stop])
+            del self.entries[:stop]
+            self.current -= stop
+
+    def clear(self):
+        """Remove all entries from the history."""
+        self.flush()
+        self._delete(self.entries)
+        self.entries = []
+        self.current = -1
+        self.state = None
+
+    # --------------------------------------------------------------------------
+    # Recording
+    # --------------------------------------------------------------------------
+
+    def record(self, state):
+        """Record a new state.
+
+        Parameters
+        ----------
+        state : dict
+            The state.
+
+        Returns
+        -------
+        bool
+            True if the state was recorded.
+            False if it was identical to the current state.
+        """
+        self.flush()
+        return self._record(state)
+
+    def _record(self, state, empty=False):
+        # the entry is serialised and stored before the entries after the current one are discarded
+        # such that the history is unchanged if either fails
+        delta = _state_delta(self.state, state)
+        if delta is not None and not delta and not empty:
+            self.state = state
+            return False
+        since = 0
+        for entry in reversed(self.entries[:self.current + 1]):
+            if entry['kind'] == 'keyframe':
+                break
+            since += 1
+        if delta is None or self.current < 0 or since >= self.interval:
+            kind, body = 'keyframe', state
+        else:
+            kind, body = 'delta', delta
+        data = pickle.dumps(body, 2)
+        key = self._write(data)
+        self._delete(self.entries[self.current + 1:])
+        del self.entries[self.current + 1:]
+        self.entries.append({'key': key, 'kind': kind, 'size': len(data)})
+        self.current = len(self.entries) - 1
+        self.state = state
+        self._trim()
+        return True
+
+    # --------------------------------------------------------------------------
+    # Write-behind
+    # --------------------------------------------------------------------------
+
+    def submit(self, state):
+        """Queue a state to be recorded on the background thread.
+
+        Parameters
+        ----------
+        state : dict
+            The state.
+            The state should not be modified after it is submitted.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Contrary to :meth:`record`, a state identical to the previous state is recorded as an empty delta,
+        such that every submitted state corresponds to exactly one history entry.
+        If write-behind is disabled, the state is recorded immediately.
+
+        An error raised while writing a previously submitted state is re-raised,
+        and the state is not queued.
+        """
+        if not self.writebehind:
+            self.flush()
+            self._record(state, empty=True)
+            return
+        self._raise()
+        with self._condition:
+            self._pending.append(state)
+            if not self._worker or not self._worker.is_alive():
+                self._closed = False
+                self._worker = threading.Thread(target=self._run, name='AGS history')
+                self._worker.daemon = True
+                self._worker.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until all queued states are written.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum time to wait, in seconds.
+            By default, there is no limit.
+
+        Returns
+        -------
+        bool
+            True if all queued states were written.
+
+        Raises
+        ------
+        Exception
+            The error raised while writing a queued state on the background thread, if any.
+            The states queued after the failed state are still written.
+        """
+        with self._condition:
+            if timeout is None:
+                while self._pending or self._busy:
+                    self._condition.wait()
+            else:
+                end = time() + timeout
+                while self._pending or self._busy:
+                    remaining = end - time()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            done = not self._pending and not self._busy
+        self._raise()
+        return done
+
+    def _raise(self):
+        with self._condition:
+            error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Write all queued states and stop the background thread."""
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            if self._worker:
+                self._worker.join()
+                self._worker = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                states = self._pending
+                self._pending = []
+                self._busy = True
+            try:
+                for state in states:
+                    try:
+                        self._record(state, empty=True)
+                    except Exception as error:
+                        self.error = self.error or error
+                if hasattr(self.db, 'sync'):
+                    self.db.sync()
+            except Exception as error:
+                self.error = self.error or error
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def sync(self, state):
+        """Set the state the next recorded state will be compared with.
+
+        Parameters
+        ----------
+        state : dict
+            The current state, after applying the steps returned by :meth:`undo` or :meth:`redo`.
+        """
+        self.state = state
+
+    # --------------------------------------------------------------------------
+    # Navigation
+    # --------------------------------------------------------------------------
+
+    def undo(self):
+        """Move one state back in the history.
+
+        Returns
+        -------
+        list or None
+            The steps to apply to reach the previous state.
+            None if there is nothing (more) to undo.
+        """
+        self.flush()
+        if not self.can_undo():
+            return None
+        entry = self.entries[self.current]
+        if entry['kind'] == 'delta':
+            steps = [('delta', self._read(self.current), False)]
+        else:
+            start = self.current - 1
+            while self.entries[start]['kind'] != 'keyframe':
+                start -= 1
+            steps = [('keyframe', self._read(start))]
+            for index in range(start + 1, self.current):
+                steps.append(('delta', self._read(index), True))
+        self.current -= 1
+        self.state = None
+        return steps
+
+    def redo(self):
+        """Move one state forward in the history.
+
+        Returns
+        -------
+        list or None
+            The steps to apply to reach the next state.
+            None if there is nothing (more) to redo.
+        """
+        self.flush()
+        if not self.can_redo():
+            return None
+        self.current += 1
+        entry = self.entries[self.current]
+        if entry['kind'] == 'delta':
+            steps = [('delta', self._read(self.current), True)]
+        else:
+            steps = [('keyframe', self._read(self.current))]
+        self.state = None
+        return steps
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,366 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import threading
+
+from time import time
+
+
+__all__ = [
+    'LatestJobWorker',
+    'BackgroundProxy',
+]
+
+
+class LatestJobWorker(object):
+    """Run jobs on a background thread, skipping all jobs that are superseded before they start.
+
+    Parameters
+    ----------
+    func : callable
+        The function computing the result of a job.
+    name : str, optional
+        The name of the background thread.
+    callback : callable, optional
+        A function called on the background thread with the sequence number and the result
+        of every job that completes successfully.
+
+    Attributes
+    ----------
+    submitted : int
+        The number of submitted jobs.
+    completed : int
+        The number of jobs that were run.
+    dropped : int
+        The number of jobs that were replaced by a newer job before they could start.
+    error : Exception or None
+        The error raised by the last job that failed.
+
+    Notes
+    -----
+    At most one job is waiting at any time.
+    Submitting a job while another one is waiting cancels the waiting job,
+    such that the background thread always continues with the newest job.
+    A job that is already running is never interrupted,
+    but its result is superseded by the result of the next job.
+
+    Submitting a job never blocks on a running job,
+    which makes the worker suitable for use in callbacks that have to return quickly,
+    such as the dynamic draw callbacks of Rhino.
+
+    Examples
+    --------
+    >>> worker = LatestJobWorker(lambda x: x ** 2)
+    >>> worker.submit(3)
+    1
+    >>> worker.wait()
+    True
+    >>> worker.result()
+    (1, 9)
+    >>> worker.close()
+
+    """
+
+    def __init__(self, func, name='AGS worker', callback=None):
+        self.func = func
+        self.name = name
+        self.callback = callback
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.error = None
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self._result = None
+        self._worker = None
+        self._condition = threading.Condition()
+
+    def submit(self, *args, **kwargs):
+        """Submit a job, cancelling the job that is waiting, if any.
+
+        Parameters
+        ----------
+        args : list
+            Positional arguments for the function of the worker.
+        kwargs : dict
+            Named arguments for the function of the worker.
+
+        Returns
+        -------
+        int
+            The sequence number of the job.
+        """
+        with self._condition:
+            if self._pending:
+                self.dropped += 1
+            self.submitted += 1
+            self._pending = self.submitted, args, kwargs
+            if not self._worker or not self._worker.is_alive():
+                self._closed = False
+                self._worker = threading.Thread(target=self._run, name=self.name)
+                self._worker.daemon = True
+                self._worker.start()
+            self._condition.notify_all()
+            return self.submitted
+
+    def cancel(self):
+        """Cancel the job that is waiting, if any.
+
+        Returns
+        -------
+        bool
+            True if a job was cancelled.
+        """
+        with self._condition:
+            if not self._pending:
+                return False
+            self._pending = None
+            self.dropped += 1
+            self._condition.notify_all()
+            return True
+
+    def result(self):
+        """The result of the most recently completed job.
+
+        Returns
+        -------
+        tuple or None
+            The sequence number of the job and its result,
+            or None if no job has completed successfully yet.
+        """
+        return self._result
+
+    def wait(self, timeout=None):
+        """Wait until the worker is idle.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum time to wait, in seconds.
+            By default, there is no limit.
+
+        Returns
+        -------
+        bool
+            True if no job is waiting or running.
+        """
+        with self._condition:
+            if timeout is None:
+                while self._pending or self._busy:
+                    self._condition.wait()
+            else:
+                end = time() + timeout
+                while self._pending or self._busy:
+                    remaining = end - time()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            return not self._pending and not self._busy
+
+    def close(self, cancel=True):
+        """Stop the background thread.
+
+        Parameters
+        ----------
+        cancel : bool, optional
+            If True, the job that is waiting is cancelled.
+            Otherwise it is run first.
+            Default is ``True``.
+        """
+        if cancel:
+            self.cancel()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._worker:
+            self._worker.join()
+            self._worker = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                sequence, args, kwargs = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                result = self.func(*args, **kwargs)
+            except Exception as error:
+                self.error = error
+            else:
+                self._result = sequence, result
+                if self.callback:
+                    try:
+                        self.callback(sequence, result)
+                    except Exception as error:
+                        self.error = error
+            finally:
+                with self._condition:
+                    self.completed += 1
+                    self._busy = False
+                    self._condition.notify_all()
+
+
+class BackgroundProxy(object):
+    """A proxy for a server that is started and warmed up on a background thread.
+
+    Parameters
+    ----------
+    factory : callable, optional
+        A function without arguments creating the actual proxy.
+        Default is :class:`compas.rpc.Proxy`.
+    preload : list of str, optional
+        The names of the modules that are imported on the server after it was started
+        (see :func:`compas_ags.ags.preload_modules_proxy`).
+    name : str, optional
+        The name of the background thread.
+    callback : callable, optional
+        A function called on the background thread with the background proxy,
+        once the server was started and warmed up, or once starting it failed.
+
+    Attributes
+    ----------
+    package : str or None
+        The base package for the requested functionality.
+    timings : dict
+        The time it took to start the server, to import every preloaded module,
+        and to complete the start up in total, in seconds.
+    error : Exception or None
+        The error raised while starting the server, if any.
+
+    Notes
+    -----
+    The background proxy can be used instead of the actual proxy.
+    Creating it returns immediately.
+    The first time a function of the server is requested,
+    the background proxy waits until the server is ready.
+    Once it is, all requests are passed on to the actual proxy.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        proxy = BackgroundProxy(preload=['numpy', 'scipy', 'compas_ags.ags'])
+
+        # do something else
+
+        proxy.package = 'compas_ags.ags.graphstatics'
+        formdata = proxy.form_update_q_from_qind_proxy(formdata)
+
+    """
+
+    def __init__(self, factory=None, preload=None, name='AGS server', callback=None):
+        self.factory = factory
+        self.preload = list(preload or [])
+        self.name = name
+        self.callback = callback
+        self.package = None
+        self.timings = {}
+        self.error = None
+        self._proxy = None
+        self._event = threading.Event()
+        self._thread = threading.Thread(target=self._start, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        proxy = self.proxy
+        proxy.package = self.package
+        return getattr(proxy, name)
+
+    @property
+    def proxy(self):
+        """:class:`compas.rpc.Proxy`: The actual proxy, once the server is ready.
+
+        Accessing the proxy waits until the server is ready,
+        and raises the error that occurred while starting it, if any.
+        """
+        self._event.wait()
+        if self.error:
+            raise self.error
+        return self._proxy
+
+    def ready(self):
+        """Verify if the server was started and warmed up successfully.
+
+        Returns
+        -------
+        bool
+        """
+        return self._event.is_set() and not self.error
+
+    def wait(self, timeout=None):
+        """Wait until the server was started and warmed up, or starting it failed.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum time to wait, in seconds.
+            By default, there is no limit.
+
+        Returns
+        -------
+        bool
+            True if the server is ready.
+        """
+        self._event.wait(timeout)
+        return self.ready()
+
+    def connect(self, preload=None):
+        """Create another background proxy for the same server.
+
+        Parameters
+        ----------
+        preload : list of str, optional
+            The names of the modules to import on the server.
+
+        Returns
+        -------
+        :class:`BackgroundProxy`
+            A proxy that is created once this proxy is ready,
+            such that the server is only started once.
+        """
+        def factory():
+            self.wait()
+            return self._create()
+
+        return BackgroundProxy(factory, preload=preload, name=self.name)
+
+    def _create(self):
+        if self.factory:
+            return self.factory()
+        from compas.rpc import Proxy
+        return Proxy()
+
+    def _start(self):
+        t0 = time()
+        try:
+            proxy = self._create()
+            self.timings['server'] = time() - t0
+            if self.preload:
+                proxy.package = 'compas_ags.ags'
+                self.timings.update(proxy.preload_modules_proxy(self.preload))
+                proxy.package = None
+            self._proxy = proxy
+        except Exception as error:
+            self.error = error
+        finally:
+            self.timings['total'] = time() - t0
+            self._event.set()
+        if self.callback:
+            self.callback(self)
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,332 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import json
+import hashlib
+import zipfile
+
+from compas.utilities import DataEncoder
+from compas.utilities import DataDecoder
+
+from compas_ags.diagrams import FormDiagram
+from compas_ags.diagrams import ForceDiagram
+from compas_ags.diagrams import diagram_to_sections
+from compas_ags.diagrams import diagram_from_sections
+
+
+__all__ = [
+    'SESSION_FORMAT',
+    'SESSION_VERSION',
+    'SessionFile',
+    'save_session',
+    'read_session_header',
+]
+
+
+SESSION_FORMAT = 'compas_ags.session'
+
+SESSION_VERSION = 2
+
+DIAGRAMS = {'form': FormDiagram, 'force': ForceDiagram}
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _headers(archive):
+    """Names of the headers in a session archive, from oldest to newest."""
+    return sorted(name for name in archive.namelist() if name.startswith('header.') and name.endswith('.json'))
+
+
+def _read_header(archive):
+    names = _headers(archive)
+    if not names:
+        raise ValueError('The archive is not an AGS session.')
+    header = json.loads(archive.read(names[-1]).decode('utf-8'))
+    if header.get('format') != SESSION_FORMAT:
+        raise ValueError('The archive is not an AGS session.')
+    if header['version'] > SESSION_VERSION:
+        raise ValueError('The session was written with a newer version of the format: {}'.format(header['version']))
+    return header
+
+
+# ==============================================================================
+# reading
+# ==============================================================================
+
+
+def read_session_header(filepath):
+    """Read the header of a session file without reading any of its diagrams.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the session file.
+
+    Returns
+    -------
+    dict
+        The header of the session.
+        For legacy JSON session files a header is constructed from the entire file.
+    """
+    with SessionFile(filepath) as session:
+        return session.header
+
+
+class SessionFile(object):
+    """Lazy reader of AGS session files.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the session file.
+
+    Attributes
+    ----------
+    header : dict
+        The header of the session, with the format version, a summary of the diagrams,
+        and the names of the chunks containing their data.
+    legacy : bool
+        True if the file is a legacy JSON session file.
+
+    Notes
+    -----
+    A session file is a zip archive with the following members.
+
+    * ``header.<sequence>.json``: the session header.
+      The header with the highest sequence number is the current one.
+    * ``chunks/<sha1>``: compressed chunks of data, named after the hash of their content.
+      Every diagram is stored in separate chunks for its attributes, topology, geometry,
+      vertex attributes, edge attributes and face attributes
+      (see :func:`compas_ags.diagrams.diagram_to_sections`).
+      The scene state and an optional thumbnail are stored in chunks as well.
+
+    Chunks are only read when the data they contain is requested.
+    Legacy session files containing a single JSON blob are read as well,
+    but this requires parsing the entire file when it is opened.
+
+    Examples
+    --------
+    >>> import os
+    >>> import shutil
+    >>> import tempfile
+    >>> import compas_ags
+    >>> from compas_ags.diagrams import FormGraph
+    >>> from compas_ags.diagrams import FormDiagram
+    >>> form = FormDiagram.from_graph(FormGraph.from_obj(compas_ags.get('paper/gs_form_force.obj')))
+    >>> filepath = os.path.join(tempfile.mkdtemp(), 'session.ags')
+    >>> chunks = save_session(filepath, {'form': form})
+    >>> with SessionFile(filepath) as session:
+    ...     session.has_diagram('force')
+    ...     loaded = session.diagram('form')
+    False
+    >>> loaded.number_of_edges() == form.number_of_edges()
+    True
+    >>> shutil.rmtree(os.path.dirname(filepath))
+
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.legacy = not zipfile.is_zipfile(filepath)
+        self._archive = None
+        self._data = None
+        self._diagrams = {}
+        if self.legacy:
+            with open(filepath, 'r') as f:
+                self._data = json.load(f, cls=DataDecoder)
+            self.header = {
+                'format': SESSION_FORMAT,
+                'version': 0,
+                'diagrams': {name: {'chunks': {}} for name, data in self._data['data'].items() if data},
+                'scene': None,
+                'thumbnail': None,
+            }
+        else:
+            self._archive = zipfile.ZipFile(filepath, 'r')
+            self.header = _read_header(self._archive)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the underlying archive."""
+        if self._archive:
+            self._archive.close()
+            self._archive = None
+
+    def has_diagram(self, name):
+        """Verify that the session contains a diagram.
+
+        Parameters
+        ----------
+        name : {'form', 'force'}
+            The name of the diagram.
+
+        Returns
+        -------
+        bool
+        """
+        return name in self.header['diagrams']
+
+    def diagram(self, name):
+        """Load a diagram of the session.
+
+        Parameters
+        ----------
+        name : {'form', 'force'}
+            The name of the diagram.
+
+        Returns
+        -------
+        :class:`compas_ags.diagrams.Diagram` or None
+            The diagram, or None if the session does not contain the diagram.
+            The diagram is loaded on first request only.
+        """
+        if name in self._diagrams:
+            return self._diagrams[name]
+        if not self.has_diagram(name):
+            return None
+        cls = DIAGRAMS[name]
+        if self.legacy:
+            diagram = cls.from_data(self._data['data'][name])
+        else:
+            chunks = self.header['diagrams'][name]['chunks']
+            diagram = cls()
+            diagram_from_sections(diagram, {section: self._archive.read(chunk) for section, chunk in chunks.items()})
+        self._diagrams[name] = diagram
+        return diagram
+
+    def scene(self):
+        """Load the scene state of the session.
+
+        Returns
+        -------
+        dict
+            The scene state per diagram.
+        """
+        if self.legacy:
+            return self._data.get('scene') or {}
+        if not self.header.get('scene'):
+            return {}
+        return json.loads(self._archive.read(self.header['scene']).decode('utf-8'), cls=DataDecoder)
+
+    def thumbnail(self):
+        """Read the thumbnail image of the session.
+
+        Returns
+        -------
+        bytes or None
+            The image data, or None if the session has no thumbnail.
+        """
+        if self.legacy or not self.header.get('thumbnail'):
+            return None
+        return self._archive.read(self.header['thumbnail'])
+
+
+# ==============================================================================
+# writing
+# ==============================================================================
+
+
+def save_session(filepath, diagrams, scene=None, thumbnail=None):
+    """Save diagrams and scene state to a session file.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the session file.
+    diagrams : dict
+        The diagrams of the session per name (``'form'``, ``'force'``).
+    scene : dict, optional
+        The scene state per diagram.
+    thumbnail : bytes, optional
+        Image data of a thumbnail of the session.
+
+    Returns
+    -------
+    list
+        The names of the chunks that were written.
+        Chunks with the same content as chunks already in the file are not written again.
+
+    Notes
+    -----
+    If the file already is a session file, only a new header and the chunks that changed
+    are appended to the archive.
+    The archive is rewritten entirely if it contains more data that is no longer used
+    than data that is still used.
+    """
+    chunks = {}
+    header = {
+        'format': SESSION_FORMAT,
+        'version': SESSION_VERSION,
+        'diagrams': {},
+        'scene': None,
+        'thumbnail': None,
+    }
+    for name, diagram in diagrams.items():
+        if diagram is None:
+            continue
+        summary = {
+            'vertices': diagram.number_of_vertices(),
+            'edges': diagram.number_of_edges(),
+            'faces': diagram.number_of_faces(),
+            'chunks': {},
+        }
+        for section, payload in diagram_to_sections(diagram):
+            chunk = 'chunks/' + _digest(payload)
+            chunks[chunk] = payload
+            summary['chunks'][section] = chunk
+        header['diagrams'][name] = summary
+    if scene:
+        payload = json.dumps(scene, cls=DataEncoder).encode('utf-8')
+        header['scene'] = 'chunks/' + _digest(payload)
+        chunks[header['scene']] = payload
+    if thumbnail:
+        header['thumbnail'] = 'chunks/' + _digest(thumbnail)
+        chunks[header['thumbnail']] = thumbnail
+
+    mode = 'w'
+    sequence = 0
+    existing = set()
+    if os.path.exists(filepath) and zipfile.is_zipfile(filepath):
+        try:
+            with zipfile.ZipFile(filepath, 'r') as archive:
+                old = _read_header(archive)
+                sizes = {info.filename: info.compress_size for info in archive.infolist()}
+        except ValueError:
+            pass
+        else:
+            used = sum(sizes.get(chunk, 0) for chunk in chunks)
+            stale = sum(size for name, size in sizes.items() if name.startswith('chunks/') and name not in chunks)
+            if stale <= used:
+                mode = 'a'
+                sequence = old['sequence'] + 1
+                existing = set(sizes)
+    header['sequence'] = sequence
+
+    written = []
+    with zipfile.ZipFile(filepath, mode) as archive:
+        for chunk, payload in chunks.items():
+            if chunk in existing:
+                continue
+            info = zipfile.ZipInfo(chunk)
+            info.compress_type = zipfile.ZIP_STORED if chunk == header['thumbnail'] else zipfile.ZIP_DEFLATED
+            archive.writestr(info, payload)
+            written.append(chunk)
+        archive.writestr(zipfile.ZipInfo('header.{:06d}.json'.format(sequence)), json.dumps(header).encode('utf-8'))
+    return written
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,409 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from math import floor
+from math import sqrt
+
+
+__all__ = [
+    'UniformGrid',
+    'DiagramIndex',
+    'distance_line_segment',
+]
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _sub(a, b):
+    return a[0] - b[0], a[1] - b[1], a[2] - b[2]
+
+
+def _distance_line_point(a, d, c):
+    # squared distance between a point and a line through a with unit direction d
+    w = _sub(c, a)
+    t = _dot(w, d)
+    return max(_dot(w, w) - t * t, 0.0)
+
+
+def distance_line_segment(a, b, p, q):
+    """Compute the distance between an infinite line and a line segment.
+
+    Parameters
+    ----------
+    a : list
+        XYZ coordinates of a point on the line.
+    b : list
+        XYZ coordinates of another point on the line.
+    p : list
+        XYZ coordinates of the start of the segment.
+    q : list
+        XYZ coordinates of the end of the segment.
+
+    Returns
+    -------
+    float
+        The shortest distance between the line and the segment.
+    """
+    d = _sub(b, a)
+    length = sqrt(_dot(d, d))
+    if not length:
+        raise ValueError('The points defining the line are identical.')
+    d = d[0] / length, d[1] / length, d[2] / length
+    w = _sub(p, a)
+    e = _sub(q, p)
+    ed = _dot(e, d)
+    wd = _dot(w, d)
+    A = _dot(e, e) - ed * ed
+    B = _dot(w, e) - wd * ed
+    t = 0.0
+    if A > 1e-12:
+        t = min(max(- B / A, 0.0), 1.0)
+    x = p[0] + t * e[0], p[1] + t * e[1], p[2] + t * e[2]
+    return sqrt(_distance_line_point(a, d, x))
+
+
+class UniformGrid(object):
+    """A uniform grid over the XY plane for proximity queries.
+
+    Parameters
+    ----------
+    cellsize : float
+        The size of the (square) cells of the grid.
+
+    Attributes
+    ----------
+    cells : dict
+        The items in every non-empty cell, per cell index ``(i, j)``.
+
+    Notes
+    -----
+    Points are stored in one cell, segments in every cell they cross.
+    Queries only visit the cells overlapping the query region,
+    which is constant time for regions that are small compared to the cell size.
+
+    Examples
+    --------
+    >>> grid = UniformGrid(1.0)
+    >>> grid.insert_point('a', [0.5, 0.5])
+    >>> grid.insert_segment('b', [0.0, 0.0], [3.0, 0.0])
+    >>> sorted(grid.query_box(0.0, 0.0, 0.9, 0.9))
+    ['a', 'b']
+
+    """
+
+    def __init__(self, cellsize):
+        if not cellsize > 0:
+            raise ValueError('The cell size should be positive: {}'.format(cellsize))
+        self.cellsize = cellsize
+        self.cells = {}
+
+    @classmethod
+    def from_points(cls, points, density=1.0):
+        """Construct an empty grid sized for a collection of points.
+
+        Parameters
+        ----------
+        points : list
+            XY(Z) coordinates of points.
+        density : float, optional
+            The average number of points per cell.
+            Default is ``1.0``.
+
+        Returns
+        -------
+        :class:`UniformGrid`
+        """
+        points = list(points)
+        if not points:
+            return cls(1.0)
+        xmin = min(point[0] for point in points)
+        xmax = max(point[0] for point in points)
+        ymin = min(point[1] for point in points)
+        ymax = max(point[1] for point in points)
+        dx = xmax - xmin
+        dy = ymax - ymin
+        area = dx * dy
+        if not area:
+            area = max(dx, dy) ** 2
+        cellsize = sqrt(density * area / len(points))
+        return cls(cellsize or 1.0)
+
+    def cell(self, x, y):
+        """Find the index of the cell containing a point.
+
+        Parameters
+        ----------
+        x : float
+        y : float
+
+        Returns
+        -------
+        tuple of int
+        """
+        return int(floor(x / self.cellsize)), int(floor(y / self.cellsize))
+
+    def segment_cells(self, a, b):
+        """Find the indices of all cells crossed by a segment.
+
+        Parameters
+        ----------
+        a : list
+            XY(Z) coordinates of the start of the segment.
+        b : list
+            XY(Z) coordinates of the end of the segment.
+
+        Returns
+        -------
+        list of tuple
+        """
+        if a[0] > b[0]:
+            a, b = b, a
+        cellsize = self.cellsize
+        ax, ay = a[0], a[1]
+        bx, by = b[0], b[1]
+        dx = bx - ax
+        dy = by - ay
+        i0, j0 = self.cell(ax, ay)
+        i1, j1 = self.cell(bx, by)
+        if i0 == i1:
+            return [(i0, j) for j in range(min(j0, j1), max(j0, j1) + 1)]
+        cells = []
+        for i in range(i0, i1 + 1):
+            x0 = max(i * cellsize, ax)
+            x1 = min((i + 1) * cellsize, bx)
+            y0 = ay + (x0 - ax) * dy / dx
+            y1 = ay + (x1 - ax) * dy / dx
+            if y0 > y1:
+                y0, y1 = y1, y0
+            for j in range(int(floor(y0 / cellsize)), int(floor(y1 / cellsize)) + 1):
+                cells.append((i, j))
+        return cells
+
+    def insert_point(self, item, point):
+        """Insert an item at a point.
+
+        Parameters
+        ----------
+        item : hashable
+        point : list
+            XY(Z) coordinates.
+        """
+        self.cells.setdefault(self.cell(point[0], point[1]), []).append(item)
+
+    def insert_segment(self, item, a, b):
+        """Insert an item along a segment.
+
+        Parameters
+        ----------
+        item : hashable
+        a : list
+            XY(Z) coordinates of the start of the segment.
+        b : list
+            XY(Z) coordinates of the end of the segment.
+        """
+        for cell in self.segment_cells(a, b):
+            self.cells.setdefault(cell, []).append(item)
+
+    def query_box(self, xmin, ymin, xmax, ymax):
+        """Find the items in the cells overlapping a box.
+
+        Parameters
+        ----------
+        xmin : float
+        ymin : float
+        xmax : float
+        ymax : float
+
+        Returns
+        -------
+        set
+            The candidate items.
+            Items stored in the cells overlapping the box are not necessarily inside the box.
+        """
+        i0, j0 = self.cell(xmin, ymin)
+        i1, j1 = self.cell(xmax, ymax)
+        cells = self.cells
+        items = set()
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(cells):
+            # the box is larger than the occupied part of the grid
+            for (i, j), stored in cells.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    items.update(stored)
+            return items
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                if (i, j) in cells:
+                    items.update(cells[i, j])
+        return items
+
+    def query_point(self, point, radius):
+        """Find the items in the cells within a distance from a point.
+
+        Parameters
+        ----------
+        point : list
+            XY(Z) coordinates.
+        radius : float
+
+        Returns
+        -------
+        set
+            The candidate items.
+        """
+        x, y = point[0], point[1]
+        return self.query_box(x - radius, y - radius, x + radius, y + radius)
+
+
+class DiagramIndex(object):
+    """A spatial index of the vertices and edges of a planar diagram, for picking with a view ray.
+
+    Parameters
+    ----------
+    vertex_xyz : dict
+        The coordinates of the vertices, per vertex.
+    edges : list, optional
+        The edges to index.
+
+    Notes
+    -----
+    The vertices and edges are stored in uniform grids (:class:`UniformGrid`) in the plane of the diagram.
+    A ray is intersected with that plane,
+    and only the vertices and edges near the intersection point are tested.
+    If the diagram is not planar, or the ray is (nearly) parallel to the plane of the diagram,
+    all vertices and edges are tested instead.
+
+    Examples
+    --------
+    >>> index = DiagramIndex({0: [0, 0, 0], 1: [1, 0, 0]}, [(0, 1)])
+    >>> index.vertex_on_ray([0.01, 0, 1], [0.01, 0, -1], 0.1)
+    0
+    >>> index.edge_on_ray([0.5, 0.05, 1], [0.5, 0.05, -1], 0.1)
+    (0, 1)
+
+    """
+
+    def __init__(self, vertex_xyz, edges=None):
+        self.vertex_xyz = vertex_xyz
+        self.edges = list(edges or [])
+        self.size = len(vertex_xyz)
+        points = list(vertex_xyz.values())
+        self.vertex_grid = UniformGrid.from_points(points)
+        self.edge_grid = UniformGrid(self.vertex_grid.cellsize)
+        z = [point[2] for point in points] or [0.0]
+        self.z = 0.5 * (min(z) + max(z))
+        self.thickness = max(z) - min(z)
+        for vertex, xyz in vertex_xyz.items():
+            self.vertex_grid.insert_point(vertex, xyz)
+        for index, (u, v) in enumerate(self.edges):
+            self.edge_grid.insert_segment(index, vertex_xyz[u], vertex_xyz[v])
+
+    def is_stale(self, vertex_xyz):
+        """Verify if the index was built for a different set of coordinates.
+
+        Parameters
+        ----------
+        vertex_xyz : dict
+            The current coordinates of the vertices.
+
+        Returns
+        -------
+        bool
+            True if the coordinates are a different dict than the one the index was built for,
+            or if vertices were added or removed since.
+
+        Notes
+        -----
+        Changes to the coordinates of individual vertices in the same dict are not detected.
+        Such changes require the index to be rebuilt explicitly.
+        """
+        return vertex_xyz is not self.vertex_xyz or len(vertex_xyz) != self.size
+
+    def _candidates(self, a, b, tol):
+        # the intersection of the ray with the plane of the diagram and the search radius around it
+        # a point in the plane at a distance r from the intersection is at least r * |dz| from the ray
+        dz = (b[2] - a[2]) / sqrt(_dot(_sub(b, a), _sub(b, a)))
+        if self.thickness > tol or abs(dz) < 1e-3:
+            return None
+        t = (self.z - a[2]) / (b[2] - a[2])
+        point = a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])
+        return point, tol / abs(dz) + self.thickness
+
+    def vertex_on_ray(self, a, b, tol):
+        """Find the vertex closest to a ray, within a tolerance.
+
+        Parameters
+        ----------
+        a : list
+            XYZ coordinates of the start of the ray.
+        b : list
+            XYZ coordinates of another point on the ray.
+        tol : float
+            The maximum distance between the vertex and the ray.
+
+        Returns
+        -------
+        hashable or None
+            The identifier of the vertex, or None if no vertex is within the tolerance.
+        """
+        d = _sub(b, a)
+        length = sqrt(_dot(d, d))
+        if not length:
+            return None
+        d = d[0] / length, d[1] / length, d[2] / length
+        candidates = self._candidates(a, b, tol)
+        if candidates is None:
+            vertices = self.vertex_xyz.keys()
+        else:
+            vertices = self.vertex_grid.query_point(*candidates)
+        tol2 = tol ** 2
+        best = None
+        for vertex in vertices:
+            distance = _distance_line_point(a, d, self.vertex_xyz[vertex])
+            if distance < tol2:
+                best = vertex
+                tol2 = distance
+        return best
+
+    def edge_on_ray(self, a, b, tol):
+        """Find the edge closest to a ray, within a tolerance.
+
+        Parameters
+        ----------
+        a : list
+            XYZ coordinates of the start of the ray.
+        b : list
+            XYZ coordinates of another point on the ray.
+        tol : float
+            The maximum distance between the edge and the ray.
+
+        Returns
+        -------
+        tuple or None
+            The identifier of the edge, or None if no edge is within the tolerance.
+        """
+        if a == b:
+            return None
+        candidates = self._candidates(a, b, tol)
+        if candidates is None:
+            indices = range(len(self.edges))
+        else:
+            indices = self.edge_grid.query_point(*candidates)
+        best = None
+        for index in indices:
+            u, v = self.edges[index]
+            distance = distance_line_segment(a, b, self.vertex_xyz[u], self.vertex_xyz[v])
+            if distance < tol:
+                best = self.edges[index]
+                tol = distance
+        return best
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
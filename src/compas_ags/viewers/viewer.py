@@ -146,7 +146,7 @@ class Viewer(object):
         # edges
 
         if edges_on:
-            leaves = set(self.form.leaves())
+            leaves = self.form.leaf_set()
 
             _lines = []
             _arrows = []
@@ -332,7 +332,7 @@ class Viewer(object):
 
         # edges
         if edges_on:
-            leaves = set(self.form.leaves())
+            leaves = self.form.leaf_set()
             _arrows = []
             for (u, v), attr in self.force.edges(True):
                 sp, ep = self.force.edge_coordinates(u, v, 'xy')
@@ -1,11 +1,36 @@
 import os
 import subprocess
+import threading
 import compas
 
 HERE = os.path.dirname(os.path.realpath(__file__))
 
 
-def Browser():
+def Browser(wait=True):
+    """Open the front page of AGS.
+
+    Parameters
+    ----------
+    wait : bool, optional
+        If False, the front page is extracted and launched on a background thread,
+        and the function returns immediately.
+        Default is ``True``.
+
+    Returns
+    -------
+    :class:`threading.Thread` or None
+        The background thread, if the function does not wait.
+    """
+    if wait:
+        _launch()
+        return None
+    thread = threading.Thread(target=_launch, name='AGS browser')
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def _launch():
     from zipfile import ZipFile
 
     if compas.MONO:
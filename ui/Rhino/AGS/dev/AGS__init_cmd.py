@@ -6,14 +6,17 @@ import os
 import errno
 import shelve
 
+from time import time
+
 import scriptcontext as sc
 
 import compas
 import compas_rhino
 
-from compas.rpc import Proxy
 from compas_ags.rhino import Scene
+from compas_ags.rhino import AutoUpdateScheduler
 from compas_ags.web import Browser
+from compas_ags.utilities import BackgroundProxy
 from compas_ags.activate import check
 from compas_ags.activate import activate
 
@@ -32,12 +35,32 @@ SETTINGS = {
     'AGS': {
         'autoupdate': True,
         'max_deviation': 0.1,
+        'preview': True,
     }
 }
 
+PRELOAD = ['numpy', 'scipy', 'scipy.sparse', 'compas_ags.ags']
+
+
+def print_timings(title, timings):
+    print("{}: {}".format(title, ", ".join("{} {:.2f}s".format(name, seconds) for name, seconds in timings)))
+
+
+def server_ready(proxy):
+    if proxy.error:
+        print("AGS server could not be started: {}".format(proxy.error))
+        return
+    timings = [('server', proxy.timings['server'])]
+    timings += [(name, proxy.timings[name]) for name in PRELOAD if name in proxy.timings]
+    timings += [('total', proxy.timings['total'])]
+    print_timings("AGS server ready", timings)
+
 
 def RunCommand(is_interactive):
 
+    timings = []
+    t0 = time()
+
     if check():
         print("Current plugin is already activated")
     else:
@@ -48,6 +71,13 @@ def RunCommand(is_interactive):
             compas_rhino.rs.MessageBox("Someting wrong during re-activation", 0, "Error")
         return
 
+    timings.append(('activation', time() - t0))
+    t = time()
+
+    # the server is started on a background thread
+    # and commands using the proxy wait until it is ready
+    proxy = BackgroundProxy(preload=PRELOAD, callback=server_ready)
+
     shelvepath = os.path.join(compas.APPTEMP, 'AGS', '.history')
     if not os.path.exists(os.path.dirname(shelvepath)):
         try:
@@ -57,26 +87,36 @@ def RunCommand(is_interactive):
                 raise
 
     db = shelve.open(shelvepath, 'n')
-    db['states'] = []
 
-    scene = Scene(db, 20, SETTINGS)
+    scene = Scene(db, settings=SETTINGS)
     scene.purge()
 
+    timings.append(('scene', time() - t))
+    t = time()
+
     sc.sticky["AGS"] = {
-        'proxy': Proxy(),
+        'proxy': proxy,
         'system': {
             "session.dirname": CWD,
             "session.filename": None,
             "session.extension": 'ags'
         },
         'scene': scene,
+        'scheduler': AutoUpdateScheduler(scene, proxy.connect()),
     }
 
     scene.update()
 
+    timings.append(('draw', time() - t))
+    t = time()
+
     # would be useful to add a notification about the cloud: new / reconnect
     # compas_rhino.display_message("AGS has started.")
-    Browser()
+    Browser(wait=False)
+
+    timings.append(('browser', time() - t))
+    timings.append(('total', time() - t0))
+    print_timings("AGS started", timings)
 
 
 # ==============================================================================
@@ -18,6 +18,10 @@ def RunCommand(is_interactive):
     if not proxy:
         return
 
+    scheduler = sc.sticky['AGS'].get('scheduler')
+    if scheduler:
+        scheduler.close()
+
     scene.purge()
     proxy.stop_server()
     proxy.start_server()
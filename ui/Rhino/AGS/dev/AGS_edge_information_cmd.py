@@ -3,6 +3,7 @@ from __future__ import absolute_import
 from __future__ import division
 
 
+import Rhino
 import compas_rhino
 import scriptcontext as sc
 find_object = sc.doc.Objects.Find
@@ -41,25 +42,31 @@ def RunCommand(is_interactive):
     force.settings['show.edgelabels'] = False
     scene.update()
 
-    curvefilter = compas_rhino.rs.filter.curve
-
     edge_index = form.diagram.edge_index()
 
     while True:
-        guid = compas_rhino.rs.GetObject(message="Select an edge in Form or Force Diagrams", preselect=True, select=True, filter=curvefilter)
-
-        if not guid:
+        go = Rhino.Input.Custom.GetObject()
+        go.SetCommandPrompt("Select an edge in Form or Force Diagrams")
+        go.GeometryFilter = Rhino.DocObjects.ObjectType.Curve
+        go.Get()
+        if go.CommandResult() != Rhino.Commands.Result.Success:
             break
-        elif guid not in form.guid_edge and guid not in force.guid_edge:
+
+        # the point is needed to identify edges drawn in batches
+        objref = go.Object(0)
+        guid = objref.ObjectId
+        point = objref.SelectionPoint()
+        edge_form = form.edge_at(guid, point)
+        edge_force = force.edge_at(guid, point)
+
+        if not edge_form and not edge_force:
             compas_rhino.display_message("Edge does not belog to form or force diagram.")
             break
 
-        if guid in form.guid_edge:
-            edge_form = form.guid_edge[guid]
+        if edge_form:
             index = edge_index[edge_form]
             edge_force = list(force.diagram.ordered_edges(form.diagram))[index]
-        if guid in force.guid_edge:
-            edge_force = force.guid_edge[guid]
+        else:
             edge_form = force.diagram.dual_edge(edge_force)
             index = edge_index[edge_form]
 
@@ -74,13 +81,15 @@ def RunCommand(is_interactive):
             elif f < - tol:
                 state = 'in compression'
 
-        key2guid = {form.guid_edge[guid]: guid for guid in form.guid_edge}
-        key2guid.update({(v, u): key2guid[(u, v)] for u, v in key2guid})
-        find_object(key2guid[edge_form]).Select(True)
-        key2guid = {force.guid_edge[guid]: guid for guid in force.guid_edge}
-        key2guid.update({(v, u): key2guid[(u, v)] for u, v in key2guid})
-        if abs(f) > tol:
-            find_object(key2guid[edge_force]).Select(True)
+        # edges drawn in batches have no object of their own
+        key2guid = form.element_guid('edge')
+        guid = key2guid.get(edge_form) or key2guid.get((edge_form[1], edge_form[0]))
+        if guid:
+            find_object(guid).Select(True)
+        key2guid = force.element_guid('edge')
+        guid = key2guid.get(edge_force) or key2guid.get((edge_force[1], edge_force[0]))
+        if guid and abs(f) > tol:
+            find_object(guid).Select(True)
 
         form.draw_highlight_edge(edge_form)
         force.draw_highlight_edge(edge_force)
@@ -6,6 +6,7 @@ import scriptcontext as sc
 
 import compas_rhino
 import AGS_form_check_deviation_cmd
+from compas_ags.rhino import ReciprocalPreview
 from compas_ags.utilities.equilibrium import check_deviations
 
 
@@ -20,6 +21,7 @@ def RunCommand(is_interactive):
 
     proxy = sc.sticky['AGS']['proxy']
     scene = sc.sticky['AGS']['scene']
+    scheduler = sc.sticky['AGS'].get('scheduler')
 
     objects = scene.find_by_name('Form')
     if not objects:
@@ -49,16 +51,33 @@ def RunCommand(is_interactive):
 
     scene.update()
 
-    while True:
-        vertices = force.select_vertices()
-        if not vertices:
-            break
-
-        if force.move_vertices(vertices):
-            scene.update()
+    preview = None
+    if scene.settings['AGS'].get('preview'):
+        preview = ReciprocalPreview(form, force, proxy)
+
+    try:
+        while True:
+            vertices = force.select_vertices()
+            if not vertices:
+                break
+
+            if force.move_vertices(vertices, preview=preview):
+                if scheduler and scene.settings['AGS']['autoupdate']:
+                    # combine quick successive moves into one update
+                    # the scene is redrawn by the scheduler
+                    scheduler.request('force')
+                    continue
+                scene.update()
+    finally:
+        if preview:
+            preview.close()
+
+    if scheduler:
+        scheduler.flush()
 
     if scene.settings['AGS']['autoupdate']:
-        form.diagram.data = proxy.form_update_from_force_proxy(form.diagram.data, force.diagram.data)
+        if not scheduler:
+            form.diagram.data = proxy.form_update_from_force_proxy(form.diagram.data, force.diagram.data)
         if not check_deviations(form.diagram, force.diagram, tol=scene.settings['AGS']['max_deviation']):
             compas_rhino.display_message('Error: Invalid movement on force diagram nodes or insuficient constraints in the form diagram.')
             max_dev, limit = max(form.diagram.edges_attribute('a')), scene.settings['AGS']['max_deviation']
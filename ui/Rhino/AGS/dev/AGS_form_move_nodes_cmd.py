@@ -18,6 +18,7 @@ def RunCommand(is_interactive):
 
     proxy = sc.sticky['AGS']['proxy']
     scene = sc.sticky['AGS']['scene']
+    scheduler = sc.sticky['AGS'].get('scheduler')
 
     objects = scene.find_by_name('Form')
     if not objects:
@@ -45,11 +46,19 @@ def RunCommand(is_interactive):
             break
 
         if form.move_vertices(vertices):
+            if scheduler and scene.settings['AGS']['autoupdate']:
+                # combine quick successive moves into one update
+                # the scene is redrawn by the scheduler
+                scheduler.request('form')
+                continue
             if scene.settings['AGS']['autoupdate']:
                 form.diagram.data = proxy.form_update_q_from_qind_proxy(form.diagram.data)
                 force.diagram.data = proxy.force_update_from_form_proxy(force.diagram.data, form.diagram.data)
             scene.update()
 
+    if scheduler:
+        scheduler.flush()
+
     form.settings['show.edgelabels'] = False
     form.settings['show.forcelabels'] = True
     force.settings['show.edgelabels'] = False
@@ -0,0 +1,40 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import scriptcontext as sc
+
+import compas_rhino
+
+
+__commandname__ = "AGS_scene_bake"
+
+
+def RunCommand(is_interactive):
+
+    if 'AGS' not in sc.sticky:
+        compas_rhino.display_message('AGS has not been initialised yet.')
+        return
+
+    scene = sc.sticky['AGS']['scene']
+    if not scene:
+        return
+
+    # add the diagrams as drawn in the views to the document
+    # also if they are drawn by a display conduit
+    guids = []
+    for name in ('Form', 'Force'):
+        objects = scene.find_by_name(name)
+        if objects:
+            guids += objects[0].bake()
+
+    print('Baked {} objects.'.format(len(guids)))
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    RunCommand(True)
@@ -3,16 +3,12 @@ from __future__ import absolute_import
 from __future__ import division
 
 import os
-import json
 
 import scriptcontext as sc
 
 import compas_rhino
 
-from compas.utilities import DataDecoder
-
-from compas_ags.diagrams import FormDiagram
-from compas_ags.diagrams import ForceDiagram
+from compas_ags.utilities import SessionFile
 
 
 __commandname__ = "AGS_session_load"
@@ -44,51 +40,55 @@ def RunCommand(is_interactive):
     system['session.dirname'] = dirname
     system['session.filename'] = filename
 
-    with open(filepath, "r") as f:
-        session = json.load(f, cls=DataDecoder)
+    with SessionFile(filepath) as session:
+
+        if not session.has_diagram('form'):
+            compas_rhino.display_message('The session file has no form diagram.')
+            return
 
-    if not session['data']['form']:
-        compas_rhino.display_message('The session file has no form diagram.')
+        state = session.scene()
+        formstate = state.get('form') or {}
+        forcestate = state.get('force') or {}
 
-    scene.clear()
+        scene.clear()
 
-    formdiagram = FormDiagram.from_data(session['data']['form'])
+        formdiagram = session.diagram('form')
 
-    form_id = scene.add(formdiagram, name='Form', layer='AGS::FormDiagram')
-    form = scene.find(form_id)
+        form_id = scene.add(formdiagram, name='Form', layer='AGS::FormDiagram')
+        form = scene.find(form_id)
 
-    if 'settings' in session['scene']['form']:
-        form.settings.update(session['scene']['form']['settings'])
+        if 'settings' in formstate:
+            form.settings.update(formstate['settings'])
 
-    if 'anchor' in session['scene']['form']:
-        form.anchor = session['scene']['form']['anchor']
+        if 'anchor' in formstate:
+            form.anchor = formstate['anchor']
 
-    if 'location' in session['scene']['form']:
-        form.location = session['scene']['form']['location']
+        if 'location' in formstate:
+            form.location = formstate['location']
 
-    if 'scale' in session['scene']['form']:
-        form.scale = session['scene']['form']['scale']
+        if 'scale' in formstate:
+            form.scale = formstate['scale']
 
-    if session['data']['force']:
-        forcediagram = ForceDiagram.from_data(session['data']['force'])
+        if session.has_diagram('force'):
+            forcediagram = session.diagram('force')
 
-        forcediagram.dual = formdiagram
-        formdiagram.dual = forcediagram
+            forcediagram.dual = formdiagram
+            formdiagram.dual = forcediagram
 
-        force_id = scene.add(forcediagram, name='Force', layer='AGS::ForceDiagram')
-        force = scene.find(force_id)
+            force_id = scene.add(forcediagram, name='Force', layer='AGS::ForceDiagram')
+            force = scene.find(force_id)
 
-        if 'settings' in session['scene']['force']:
-            force.settings.update(session['scene']['force']['settings'])
+            if 'settings' in forcestate:
+                force.settings.update(forcestate['settings'])
 
-        if 'anchor' in session['scene']['force']:
-            force.anchor = session['scene']['force']['anchor']
+            if 'anchor' in forcestate:
+                force.anchor = forcestate['anchor']
 
-        if 'location' in session['scene']['force']:
-            force.location = session['scene']['force']['location']
+            if 'location' in forcestate:
+                force.location = forcestate['location']
 
-        if 'scale' in session['scene']['form']:
-            force.scale = session['scene']['force']['scale']
+            if 'scale' in forcestate:
+                force.scale = forcestate['scale']
 
     scene.update()
     scene.save()
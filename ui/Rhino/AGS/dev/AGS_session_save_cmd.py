@@ -3,17 +3,31 @@ from __future__ import absolute_import
 from __future__ import division
 
 import os
-import json
+
+import System
 
 import scriptcontext as sc
 
 import compas_rhino
-from compas.utilities import DataEncoder
+
+from compas_ags.utilities import save_session
 
 
 __commandname__ = "AGS_session_save"
 
 
+def capture_thumbnail(width=320, height=240):
+    view = sc.doc.Views.ActiveView
+    if not view:
+        return None
+    bitmap = view.CaptureToBitmap(System.Drawing.Size(width, height))
+    if not bitmap:
+        return None
+    stream = System.IO.MemoryStream()
+    bitmap.Save(stream, System.Drawing.Imaging.ImageFormat.Png)
+    return bytes(bytearray(stream.ToArray()))
+
+
 def RunCommand(is_interactive):
 
     if 'AGS' not in sc.sticky:
@@ -39,17 +53,15 @@ def RunCommand(is_interactive):
 
     filepath = os.path.join(dirname, filename + '.' + system['session.extension'])
 
-    session = {
-        "data": {"form": None, "force": None},
-        "scene": {"form": None, "force": None}
-    }
+    diagrams = {"form": None, "force": None}
+    state = {"form": None, "force": None}
 
     objects = scene.find_by_name('Form')
     if objects:
         form = objects[0]
         if form:
-            session['data']['form'] = form.diagram.to_data()
-            session['scene']['form'] = {
+            diagrams['form'] = form.diagram
+            state['form'] = {
                 'settings': form.settings,
                 'anchor': form.anchor,
                 'location': form.location,
@@ -60,16 +72,15 @@ def RunCommand(is_interactive):
     if objects:
         force = objects[0]
         if force:
-            session['data']['force'] = force.diagram.to_data()
-            session['scene']['force'] = {
+            diagrams['force'] = force.diagram
+            state['force'] = {
                 'settings': force.settings,
                 'anchor': force.anchor,
                 'location': force.location,
                 'scale': force.scale
             }
 
-    with open(filepath, 'w+') as f:
-        json.dump(session, f, cls=DataEncoder)
+    save_session(filepath, diagrams, state, thumbnail=capture_thumbnail())
 
 
 # ==============================================================================